@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import json
+import os
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+
+try:
+    from hpfa.core.checkpoint import CheckpointLog
+except ImportError:  # hpfa not installed: local log below (same line format)
+    CheckpointLog = None
 
 
 # -----------------------------
@@ -84,7 +92,76 @@ class CanonEvent:
     epistemic: EpistemicStatus = EpistemicStatus.VALID
 
 
-@dataclass
+# -----------------------------
+# Frame flags (fixed set -> bitmask)
+# -----------------------------
+FLAG_MISSING_IDENTITY = 1 << 0
+FLAG_EPISTEMIC_UNVALIDATED = 1 << 1
+FLAG_EPISTEMIC_FALSIFIED = 1 << 2
+FLAG_UNKNOWN_EVENT_TYPE = 1 << 3
+FLAG_NO_POSSESSION_NON_RESTART = 1 << 4
+FLAG_CONTROLLED_OUTCOME_UNKNOWN = 1 << 5
+FLAG_SHOT_OUTCOME_UNKNOWN = 1 << 6
+FLAG_UNREACHABLE_STATE = 1 << 7
+FLAG_DEAD_BALL_UNEXPECTED_EVENT = 1 << 8
+FLAG_CONTROLLED_UNHANDLED = 1 << 9
+FLAG_SCRAMBLE_TIMEOUT = 1 << 10
+FLAG_SCRAMBLE = 1 << 11
+
+# bit -> flags["fail_closed"] value (at most one fail_closed bit per frame)
+_FAIL_CLOSED_LABELS: Tuple[Tuple[int, str], ...] = (
+    (FLAG_MISSING_IDENTITY, "MISSING_IDENTITY"),
+    (FLAG_EPISTEMIC_UNVALIDATED, f"EPISTEMIC_{EpistemicStatus.UNVALIDATED}"),
+    (FLAG_EPISTEMIC_FALSIFIED, f"EPISTEMIC_{EpistemicStatus.FALSIFIED}"),
+    (FLAG_UNKNOWN_EVENT_TYPE, "UNKNOWN_EVENT_TYPE"),
+    (FLAG_NO_POSSESSION_NON_RESTART, "NO_POSSESSION_NON_RESTART"),
+    (FLAG_CONTROLLED_OUTCOME_UNKNOWN, "CONTROLLED_OUTCOME_UNKNOWN"),
+    (FLAG_SHOT_OUTCOME_UNKNOWN, "SHOT_OUTCOME_UNKNOWN"),
+    (FLAG_UNREACHABLE_STATE, "UNREACHABLE_STATE"),
+)
+FAIL_CLOSED_MASK = sum(bit for bit, _ in _FAIL_CLOSED_LABELS)
+
+
+class _EmptyFlags(dict):
+    """Read-only empty flags dict shared by every unflagged frame."""
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("EMPTY_FLAGS is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    setdefault = update = pop = popitem = clear = _read_only
+
+
+EMPTY_FLAGS: Dict[str, Any] = _EmptyFlags()
+
+
+def _empty_flags() -> Dict[str, Any]:
+    return EMPTY_FLAGS
+
+
+def flags_from_bits(bits: int, event_type: EventType) -> Dict[str, Any]:
+    """Expand a frame bitmask into the legacy flags dict (EMPTY_FLAGS when no bit is set)."""
+    if not bits:
+        return EMPTY_FLAGS
+    flags: Dict[str, Any] = {}
+    if bits & FAIL_CLOSED_MASK:
+        for bit, label in _FAIL_CLOSED_LABELS:
+            if bits & bit:
+                flags["fail_closed"] = label
+                break
+    if bits & FLAG_DEAD_BALL_UNEXPECTED_EVENT:
+        flags["warn"] = "DEAD_BALL_UNEXPECTED_EVENT"
+    elif bits & FLAG_CONTROLLED_UNHANDLED:
+        flags["warn"] = f"CONTROLLED_UNHANDLED_{event_type}"
+    if bits & FLAG_SCRAMBLE_TIMEOUT:
+        flags["scramble_timeout"] = True
+    if bits & FLAG_SCRAMBLE:
+        flags["scramble_flag"] = True
+    return flags
+
+
+@dataclass(slots=True)
 class PossessionFrame:
     event_id: str
     state_before: PossessionState
@@ -96,7 +173,9 @@ class PossessionFrame:
     possessing_team_before: Optional[int]
     possessing_team_after: Optional[int]
 
-    flags: Dict[str, Any] = field(default_factory=dict)
+    # unflagged frames share EMPTY_FLAGS; flag_bits is the compact form of flags
+    flags: Dict[str, Any] = field(default_factory=_empty_flags)
+    flag_bits: int = 0
 
 
 @dataclass
@@ -117,6 +196,40 @@ class PossessionEngine:
     possessing_team_id: Optional[int] = None
     contested_count: int = 0
 
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-safe runtime state; restore(snapshot()) resumes without replay."""
+        return {
+            "engine": "possession_v0.1",
+            "scramble_timeout_events": self.scramble_timeout_events,
+            "state": self.state.value,
+            "possession_id": self.possession_id,
+            "possessing_team_id": self.possessing_team_id,
+            "contested_count": self.contested_count,
+        }
+
+    def restore(self, snap: Dict[str, Any]) -> None:
+        # fail-closed: validate everything before touching runtime state
+        if not isinstance(snap, dict) or snap.get("engine") != "possession_v0.1":
+            raise ValueError("POSSESSION_FAIL_CLOSED:snapshot_invalid")
+        if snap.get("state") not in PossessionState.__members__:
+            raise ValueError(f"POSSESSION_FAIL_CLOSED:snapshot_bad_state:{snap.get('state')}")
+        for k in ("scramble_timeout_events", "contested_count"):
+            v = snap.get(k)
+            if not isinstance(v, int) or isinstance(v, bool) or v < 0:
+                raise ValueError(f"POSSESSION_FAIL_CLOSED:snapshot_bad_{k}")
+        for k in ("possession_id", "possessing_team_id"):
+            v = snap.get(k)
+            if v is not None and (not isinstance(v, int) or isinstance(v, bool)):
+                raise ValueError(f"POSSESSION_FAIL_CLOSED:snapshot_bad_{k}")
+        if (snap["possession_id"] is None) != (snap["possessing_team_id"] is None):
+            raise ValueError("POSSESSION_FAIL_CLOSED:snapshot_possession_without_team")
+
+        self.scramble_timeout_events = snap["scramble_timeout_events"]
+        self.state = PossessionState(snap["state"])
+        self.possession_id = snap["possession_id"]
+        self.possessing_team_id = snap["possessing_team_id"]
+        self.contested_count = snap["contested_count"]
+
     def _new_possession(self, team_id: Optional[int]) -> None:
         if team_id is None:
             # fail-closed: cannot assign possession without team
@@ -127,119 +240,102 @@ class PossessionEngine:
         self.possessing_team_id = team_id
         self.contested_count = 0
 
+    def _ensure_possession(self, team_id: int) -> None:
+        # ensure we have a possession when entering controlled
+        if self.possession_id is None or self.possessing_team_id != team_id:
+            self._new_possession(team_id)
+
+    def _invalidate(self) -> None:
+        self.state = PossessionState.UNVALIDATED
+        self.possession_id = None
+        self.possessing_team_id = None
+
     def step(self, ev: CanonEvent) -> PossessionFrame:
         sb = self.state
         pid_b = self.possession_id
         team_b = self.possessing_team_id
+        bits = self._advance(ev)
+        return PossessionFrame(
+            ev.event_id,
+            sb,
+            self.state,
+            pid_b,
+            self.possession_id,
+            team_b,
+            self.possessing_team_id,
+            flags_from_bits(bits, ev.event_type) if bits else EMPTY_FLAGS,
+            bits,
+        )
 
-        flags: Dict[str, Any] = {}
-
+    def _advance(self, ev: CanonEvent) -> int:
+        """Apply one event to the runtime state; returns the frame flag bits (no allocation)."""
         # -----------------------------
         # FAIL-CLOSED: Identity gate
         # -----------------------------
         if ev.player_id is None or ev.team_id is None:
-            self.state = PossessionState.UNVALIDATED
-            self.possession_id = None
-            self.possessing_team_id = None
-            flags["fail_closed"] = "MISSING_IDENTITY"
-            return PossessionFrame(
-                event_id=ev.event_id,
-                state_before=sb,
-                state_after=self.state,
-                possession_id_before=pid_b,
-                possession_id_after=self.possession_id,
-                possessing_team_before=team_b,
-                possessing_team_after=self.possessing_team_id,
-                flags=flags,
-            )
+            self._invalidate()
+            return FLAG_MISSING_IDENTITY
 
         # -----------------------------
         # FAIL-CLOSED: Epistemic gate
         # -----------------------------
         # If upstream marked UNVALIDATED/FALSIFIED, we do not propagate possession.
-        if ev.epistemic in (EpistemicStatus.UNVALIDATED, EpistemicStatus.FALSIFIED):
-            self.state = PossessionState.UNVALIDATED
-            self.possession_id = None
-            self.possessing_team_id = None
-            flags["fail_closed"] = f"EPISTEMIC_{ev.epistemic}"
-            return PossessionFrame(
-                event_id=ev.event_id,
-                state_before=sb,
-                state_after=self.state,
-                possession_id_before=pid_b,
-                possession_id_after=self.possession_id,
-                possessing_team_before=team_b,
-                possessing_team_after=self.possessing_team_id,
-                flags=flags,
-            )
+        if ev.epistemic == EpistemicStatus.UNVALIDATED:
+            self._invalidate()
+            return FLAG_EPISTEMIC_UNVALIDATED
+        if ev.epistemic == EpistemicStatus.FALSIFIED:
+            self._invalidate()
+            return FLAG_EPISTEMIC_FALSIFIED
 
         # -----------------------------
         # UNKNOWN/MISSING event_type
         # -----------------------------
         if ev.event_type == EventType.UNKNOWN:
-            self.state = PossessionState.UNVALIDATED
-            self.possession_id = None
-            self.possessing_team_id = None
-            flags["fail_closed"] = "UNKNOWN_EVENT_TYPE"
-            return PossessionFrame(
-                event_id=ev.event_id,
-                state_before=sb,
-                state_after=self.state,
-                possession_id_before=pid_b,
-                possession_id_after=self.possession_id,
-                possessing_team_before=team_b,
-                possessing_team_after=self.possessing_team_id,
-                flags=flags,
-            )
+            self._invalidate()
+            return FLAG_UNKNOWN_EVENT_TYPE
 
         # -----------------------------
         # State machine
         # -----------------------------
-        # Helper: ensure we have a possession when entering controlled
-        def ensure_possession(team_id: int) -> None:
-            if self.possession_id is None or self.possessing_team_id != team_id:
-                self._new_possession(team_id)
+        state = self.state
 
         # NO_POSSESSION
-        if self.state == PossessionState.NO_POSSESSION:
+        if state == PossessionState.NO_POSSESSION:
             if ev.event_type == EventType.RESTART and ev.outcome == Outcome.SUCCESS:
                 self.state = PossessionState.CONTROLLED
-                ensure_possession(ev.team_id)
-            else:
-                # remain fail-closed conservative
-                self.state = PossessionState.UNVALIDATED
-                self.possession_id = None
-                self.possessing_team_id = None
-                flags["fail_closed"] = "NO_POSSESSION_NON_RESTART"
-            return self._frame(ev, sb, pid_b, team_b, flags)
+                self._ensure_possession(ev.team_id)
+                return 0
+            # remain fail-closed conservative
+            self._invalidate()
+            return FLAG_NO_POSSESSION_NON_RESTART
 
         # DEAD_BALL
-        if self.state == PossessionState.DEAD_BALL:
+        if state == PossessionState.DEAD_BALL:
             if ev.event_type == EventType.RESTART and ev.outcome == Outcome.SUCCESS:
                 self.state = PossessionState.CONTROLLED
-                ensure_possession(ev.team_id)
+                self._ensure_possession(ev.team_id)
             elif ev.event_type in (EventType.OUT, EventType.FOUL, EventType.OFFSIDE):
                 # stays dead ball; possession does not change until restart
                 self.state = PossessionState.DEAD_BALL
             else:
                 # conservative: dead ball only transitions on restart or dead-ball events
-                flags["warn"] = "DEAD_BALL_UNEXPECTED_EVENT"
-            return self._frame(ev, sb, pid_b, team_b, flags)
+                return FLAG_DEAD_BALL_UNEXPECTED_EVENT
+            return 0
 
         # UNVALIDATED
-        if self.state == PossessionState.UNVALIDATED:
+        if state == PossessionState.UNVALIDATED:
             # Only a valid restart can restore
             if ev.event_type == EventType.RESTART and ev.outcome == Outcome.SUCCESS:
                 self.state = PossessionState.CONTROLLED
-                ensure_possession(ev.team_id)
+                self._ensure_possession(ev.team_id)
             else:
                 self.possession_id = None
                 self.possessing_team_id = None
-            return self._frame(ev, sb, pid_b, team_b, flags)
+            return 0
 
         # CONTROLLED
-        if self.state == PossessionState.CONTROLLED:
-            ensure_possession(self.possessing_team_id or ev.team_id)
+        if state == PossessionState.CONTROLLED:
+            self._ensure_possession(self.possessing_team_id or ev.team_id)
 
             # PASS
             if ev.event_type == EventType.PASS:
@@ -250,10 +346,8 @@ class PossessionEngine:
                     self.contested_count = 0
                 else:
                     # outcome unknown -> fail-closed UNVALIDATED
-                    self.state = PossessionState.UNVALIDATED
-                    self.possession_id = None
-                    self.possessing_team_id = None
-                    flags["fail_closed"] = "CONTROLLED_OUTCOME_UNKNOWN"
+                    self._invalidate()
+                    return FLAG_CONTROLLED_OUTCOME_UNKNOWN
 
             # SHOT
             elif ev.event_type == EventType.SHOT:
@@ -272,10 +366,8 @@ class PossessionEngine:
                         self.state = PossessionState.CONTESTED
                         self.contested_count = 0
                 else:
-                    self.state = PossessionState.UNVALIDATED
-                    self.possession_id = None
-                    self.possessing_team_id = None
-                    flags["fail_closed"] = "SHOT_OUTCOME_UNKNOWN"
+                    self._invalidate()
+                    return FLAG_SHOT_OUTCOME_UNKNOWN
 
             # OUT/FOUL/OFFSIDE forces dead ball
             elif ev.event_type in (EventType.OUT, EventType.FOUL, EventType.OFFSIDE):
@@ -293,16 +385,17 @@ class PossessionEngine:
                     self.contested_count = 0
 
             else:
-                flags["warn"] = f"CONTROLLED_UNHANDLED_{ev.event_type}"
+                return FLAG_CONTROLLED_UNHANDLED
 
-            return self._frame(ev, sb, pid_b, team_b, flags)
+            return 0
 
         # CONTESTED
-        if self.state == PossessionState.CONTESTED:
+        if state == PossessionState.CONTESTED:
+            bits = 0
             # contested chain
             self.contested_count += 1
             if self.contested_count >= self.scramble_timeout_events:
-                flags["scramble_timeout"] = True
+                bits |= FLAG_SCRAMBLE_TIMEOUT
                 # stays contested; no forced end (per spec)
                 self.contested_count = self.scramble_timeout_events
 
@@ -322,7 +415,7 @@ class PossessionEngine:
                     self.state = PossessionState.CONTESTED
                 else:
                     # unknown tackle resolution -> epistemically INCONCLUSIVE, but possession engine marks contested
-                    flags["scramble_flag"] = True
+                    bits |= FLAG_SCRAMBLE
                     self.state = PossessionState.CONTESTED
 
             # Pass success during contested: treat as control establishment (same team)
@@ -336,29 +429,14 @@ class PossessionEngine:
 
             # Unknown outcome handling
             elif ev.outcome == Outcome.UNKNOWN and ev.event_type != EventType.SHOT:
-                flags["scramble_flag"] = True
+                bits |= FLAG_SCRAMBLE
                 # remain contested; no possession change
 
-            return self._frame(ev, sb, pid_b, team_b, flags)
+            return bits
 
         # fallback fail-closed
-        self.state = PossessionState.UNVALIDATED
-        self.possession_id = None
-        self.possessing_team_id = None
-        flags["fail_closed"] = "UNREACHABLE_STATE"
-        return self._frame(ev, sb, pid_b, team_b, flags)
-
-    def _frame(self, ev: CanonEvent, sb: PossessionState, pid_b: Optional[int], team_b: Optional[int], flags: Dict[str, Any]) -> PossessionFrame:
-        return PossessionFrame(
-            event_id=ev.event_id,
-            state_before=sb,
-            state_after=self.state,
-            possession_id_before=pid_b,
-            possession_id_after=self.possession_id,
-            possessing_team_before=team_b,
-            possessing_team_after=self.possessing_team_id,
-            flags=flags,
-        )
+        self._invalidate()
+        return FLAG_UNREACHABLE_STATE
 
 
 def simulate(events: List[CanonEvent], scramble_timeout_events: int = 5) -> List[PossessionFrame]:
@@ -367,3 +445,153 @@ def simulate(events: List[CanonEvent], scramble_timeout_events: int = 5) -> List
     for ev in events:
         out.append(pe.step(ev))
     return out
+
+
+# -----------------------------
+# Columnar frames (season-scale)
+# -----------------------------
+NONE_ID = -1  # None in the id columns; ids are non-negative provider ints
+
+STATES: Tuple[PossessionState, ...] = tuple(PossessionState)
+EVENT_TYPES: Tuple[EventType, ...] = tuple(EventType)
+_STATE_CODE: Dict[PossessionState, int] = {s: i for i, s in enumerate(STATES)}
+_EVENT_TYPE_CODE: Dict[EventType, int] = {e: i for i, e in enumerate(EVENT_TYPES)}
+
+
+def _opt_id(v: int) -> Optional[int]:
+    return None if v == NONE_ID else v
+
+
+class PossessionColumns:
+    """
+    One preallocated typed array per frame field (about 45 bytes per event:
+    37 in the typed arrays + the event_id list slot; ids are shared, not copied).
+    States / event types are codes into STATES / EVENT_TYPES; None ids are NONE_ID.
+    frame(i) rebuilds the PossessionFrame that step() would have returned.
+    """
+    __slots__ = (
+        "event_id", "event_type", "state_before", "state_after",
+        "possession_id_before", "possession_id_after",
+        "possessing_team_before", "possessing_team_after", "flag_bits",
+    )
+
+    def __init__(self, n: int) -> None:
+        self.event_id: List[str] = [""] * n
+        self.event_type = array("B", bytes(n))
+        self.state_before = array("B", bytes(n))
+        self.state_after = array("B", bytes(n))
+        self.possession_id_before = array("q", [NONE_ID]) * n
+        self.possession_id_after = array("q", [NONE_ID]) * n
+        self.possessing_team_before = array("q", [NONE_ID]) * n
+        self.possessing_team_after = array("q", [NONE_ID]) * n
+        self.flag_bits = array("H", bytes(2 * n))
+
+    def __len__(self) -> int:
+        return len(self.event_id)
+
+    def frame(self, i: int) -> PossessionFrame:
+        opt = _opt_id
+        bits = self.flag_bits[i]
+        return PossessionFrame(
+            self.event_id[i],
+            STATES[self.state_before[i]],
+            STATES[self.state_after[i]],
+            opt(self.possession_id_before[i]),
+            opt(self.possession_id_after[i]),
+            opt(self.possessing_team_before[i]),
+            opt(self.possessing_team_after[i]),
+            flags_from_bits(bits, EVENT_TYPES[self.event_type[i]]),
+            bits,
+        )
+
+
+def simulate_columns(events: Sequence[CanonEvent], scramble_timeout_events: int = 5) -> PossessionColumns:
+    """simulate() without per-event frame objects: writes straight into PossessionColumns."""
+    pe = PossessionEngine(scramble_timeout_events=scramble_timeout_events)
+    cols = PossessionColumns(len(events))
+    ev_id, ev_type = cols.event_id, cols.event_type
+    st_b, st_a = cols.state_before, cols.state_after
+    pid_b, pid_a = cols.possession_id_before, cols.possession_id_after
+    team_b, team_a = cols.possessing_team_before, cols.possessing_team_after
+    flag_bits = cols.flag_bits
+    state_code = _STATE_CODE
+    advance = pe._advance
+
+    sc = state_code[pe.state]
+    pid = NONE_ID
+    team = NONE_ID
+    for i, ev in enumerate(events):
+        code = _EVENT_TYPE_CODE.get(ev.event_type)
+        if code is None:
+            raise ValueError(f"POSSESSION_FAIL_CLOSED:bad_event_type:{ev.event_type!r}")
+        ev_id[i] = ev.event_id
+        ev_type[i] = code
+        st_b[i] = sc
+        pid_b[i] = pid
+        team_b[i] = team
+
+        flag_bits[i] = advance(ev)
+
+        sc = state_code[pe.state]
+        pid_v = pe.possession_id
+        team_v = pe.possessing_team_id
+        if (pid_v is not None and pid_v < 0) or (team_v is not None and team_v < 0):
+            raise ValueError(f"POSSESSION_FAIL_CLOSED:negative_id:{ev.event_id}")
+        pid = NONE_ID if pid_v is None else pid_v
+        team = NONE_ID if team_v is None else team_v
+        st_a[i] = sc
+        pid_a[i] = pid
+        team_a[i] = team
+    return cols
+
+
+# -----------------------------
+# Checkpoint log (append-only JSONL, hpfa.core.checkpoint format)
+# -----------------------------
+def append_checkpoint(path: str, offset: int, engine: PossessionEngine) -> None:
+    """One line per checkpoint: {"offset": events consumed, "snapshot": engine.snapshot()}."""
+    if CheckpointLog is not None:
+        CheckpointLog(path).append(offset, engine.snapshot())
+        return
+    data = (json.dumps({"offset": offset, "snapshot": engine.snapshot()}, sort_keys=True) + "\n").encode("utf-8")
+    with open(path, "a+b") as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data  # torn last line: do not glue this checkpoint onto it
+        f.write(data)
+
+
+def _last_checkpoint(path: str, block: int = 4096) -> Optional[Tuple[int, Dict[str, Any]]]:
+    # read backwards from EOF; torn (crash mid-write) lines are skipped
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.split(b"\n")
+            for raw in reversed(lines if pos == 0 else lines[1:]):
+                try:
+                    d = json.loads(raw.decode("utf-8"))
+                except Exception:
+                    continue
+                if isinstance(d, dict) and isinstance(d.get("offset"), int) and isinstance(d.get("snapshot"), dict):
+                    return d["offset"], d["snapshot"]
+            buf = lines[0] if pos > 0 else b""
+    return None
+
+
+def resume(path: str, scramble_timeout_events: int = 5) -> Tuple[PossessionEngine, int]:
+    """(engine, events already consumed) from the latest checkpoint; fresh engine at 0 if none."""
+    pe = PossessionEngine(scramble_timeout_events=scramble_timeout_events)
+    last = CheckpointLog(path).last() if CheckpointLog is not None else _last_checkpoint(path)
+    if last is None:
+        return pe, 0
+    pe.restore(last[1])
+    return pe, last[0]
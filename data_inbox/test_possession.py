@@ -1,6 +1,11 @@
+import os
+import random
+import tempfile
+
 from engine.possession import (
     CanonEvent, PossessionState, EpistemicStatus,
-    EventType, Outcome, ShotOutcome, simulate
+    EventType, Outcome, ShotOutcome, simulate,
+    append_checkpoint, resume, simulate_columns, EMPTY_FLAGS
 )
 
 events = [
@@ -49,4 +54,54 @@ assert frames[2].state_after == PossessionState.CONTESTED
 assert frames[3].state_after == PossessionState.CONTROLLED
 assert frames[5].state_after == PossessionState.DEAD_BALL
 assert frames[7].state_after == PossessionState.UNVALIDATED
+
+# Checkpoint/resume: crash after e4, resume from log, same frames as one pass
+ckpt = os.path.join(tempfile.mkdtemp(), "possession.ckpt.jsonl")
+pe, off = resume(ckpt, scramble_timeout_events=3)
+assert off == 0
+resumed = []
+for i, ev in enumerate(events[:4]):
+    resumed.append(pe.step(ev))
+    append_checkpoint(ckpt, i + 1, pe)
+pe2, off = resume(ckpt, scramble_timeout_events=3)
+assert off == 4
+resumed += [pe2.step(ev) for ev in events[off:]]
+assert resumed == frames
+
+# Torn last line (crash mid-write): skipped on resume, next checkpoint still readable
+with open(ckpt, "a", encoding="utf-8") as f:
+    f.write('{"offset": 9, "snap')
+pe3, off = resume(ckpt, scramble_timeout_events=3)
+assert off == 4
+pe3.step(events[4])
+append_checkpoint(ckpt, 5, pe3)
+assert resume(ckpt, scramble_timeout_events=3)[1] == 5
+
+# Columnar frames: same frames as simulate(), incl. every flag kind
+rng = random.Random(7)
+mix = []
+for i in range(3000):
+    q = {}
+    if rng.random() < 0.3:
+        q["GK_HOLDS"] = rng.random() < 0.5
+    if rng.random() < 0.3:
+        q["WON_BALL"] = rng.choice([True, False, None])
+    if rng.random() < 0.2:
+        q["WINNER_TEAM_ID"] = rng.choice([1, 2])
+    mix.append(CanonEvent(
+        event_id=f"r{i}",
+        team_id=None if rng.random() < 0.02 else rng.choice([1, 2]),
+        player_id=rng.choice([5, 6, 7]),
+        event_type=rng.choice(list(EventType)),
+        outcome=rng.choice(list(Outcome)),
+        shot_outcome=rng.choice(list(ShotOutcome)),
+        qualifiers=q,
+        epistemic=rng.choice([EpistemicStatus.VALID] * 20 + list(EpistemicStatus)),
+    ))
+ref = simulate(mix, scramble_timeout_events=3)
+cols = simulate_columns(mix, scramble_timeout_events=3)
+assert len(cols) == len(ref)
+assert [cols.frame(i) for i in range(len(cols))] == ref
+assert {k for f in ref for k in f.flags} == {"fail_closed", "warn", "scramble_timeout", "scramble_flag"}
+assert all(f.flags is EMPTY_FLAGS for f in ref if not f.flag_bits)
 print("✅ POSSESSION TESTS PASSED")
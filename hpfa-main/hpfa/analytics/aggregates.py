@@ -0,0 +1,95 @@
+"""
+Match aggregates — the per-team groupings every report builder starts from, computed once
+
+match_aggregates(md) -> MatchAggregates (memoized per MatchData object, weakly)
+  teams            sorted md.team labels (UNKNOWN_TEAM included)
+  rows             team -> row indices, file order
+  rows_by_time     team -> row indices stable-sorted by t_start (missing time as 0.0)
+  minute           int64 minute bucket per row (t_start // 60), -1 without time
+  per_minute       Counter minute -> events, all teams
+  team_minutes     team -> Counter minute -> events
+  touches          team -> Counter player -> events with a player, counted in
+                   rows_by_time order (Counter.most_common tie order = first touch)
+  xy_of            per row (x, y) in source units, None without both coordinates
+
+Row-wise Python objects (lists, Counters) on purpose: the builders are row-wise
+loops and their outputs (tie orders, float sums) must not change.
+One pass over the rows fills everything; hpfa_report all shares one instance
+between all builders of a match.
+"""
+
+from __future__ import annotations
+
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hpfa.io.match import MatchData
+
+
+@dataclass(frozen=True)
+class MatchAggregates:
+    teams: List[str]
+    rows: Dict[str, List[int]]
+    rows_by_time: Dict[str, List[int]]
+    minute: np.ndarray
+    per_minute: Counter
+    team_minutes: Dict[str, Counter]
+    touches: Dict[str, Counter]
+    xy_of: List[Optional[Tuple[float, float]]]
+
+
+def _build(md: MatchData) -> MatchAggregates:
+    t = md.t_start
+    ok = ~np.isnan(t)
+    minute = np.full(md.n, -1, dtype=np.int64)
+    minute[ok] = np.floor_divide(t[ok], 60.0).astype(np.int64)
+    t_sort = np.where(ok, t, 0.0)
+
+    rows: Dict[str, List[int]] = {}
+    per_minute: Counter = Counter()
+    team_minutes: Dict[str, Counter] = {}
+    for i, (team, m) in enumerate(zip(md.team.tolist(), minute.tolist())):
+        rows.setdefault(team, []).append(i)
+        if m >= 0:
+            per_minute[m] += 1
+            team_minutes.setdefault(team, Counter())[m] += 1
+
+    players = md.player.tolist()
+    rows_by_time: Dict[str, List[int]] = {}
+    touches: Dict[str, Counter] = {}
+    for team, r in rows.items():
+        idx = np.asarray(r, dtype=np.int64)
+        rows_by_time[team] = idx[np.argsort(t_sort[idx], kind="stable")].tolist()
+        c = touches[team] = Counter()
+        for i in rows_by_time[team]:
+            if players[i]:
+                c[players[i]] += 1
+        team_minutes.setdefault(team, Counter())
+
+    xy_of = [(x, y) if has else None for x, y, has in zip(md.x.tolist(), md.y.tolist(), md.has_xy.tolist())]
+    return MatchAggregates(
+        teams=sorted(rows),
+        rows=rows,
+        rows_by_time=rows_by_time,
+        minute=minute,
+        per_minute=per_minute,
+        team_minutes=team_minutes,
+        touches=touches,
+        xy_of=xy_of,
+    )
+
+
+# weak keys: an entry lives only as long as its MatchData (load_match drops replaced matches)
+_AGGREGATES: "weakref.WeakKeyDictionary[MatchData, MatchAggregates]" = weakref.WeakKeyDictionary()
+
+
+def match_aggregates(md: MatchData) -> MatchAggregates:
+    """Aggregates of md, built on first use; treat them as read-only (shared between builders)."""
+    agg = _AGGREGATES.get(md)
+    if agg is None:
+        agg = _AGGREGATES[md] = _build(md)
+    return agg
@@ -0,0 +1,88 @@
+"""
+Keyword families — one compiled matcher for action/code blobs (TR+EN)
+
+kw_mask(text) -> int bitmask of the families whose keywords occur in text
+  SHOT | TURNOVER | REGAIN | SETPIECE
+Matching is the report tools' rule: substring test on (text or "").strip().lower().
+
+All keywords of all families are one regex alternation, longest first, inside
+a lookahead so every start position is tried. At a position the longest
+keyword wins; every other keyword starting there is a prefix of it, so each
+keyword carries the families of all its prefixes and no family is lost to
+overlaps ("serbest vuruş" => SETPIECE | SHOT).
+
+Results are cached per distinct text: a match has a few hundred distinct
+action/code strings, so the per-event cost is one dict lookup.
+
+phase_proxy(mask): F5/F6 (set piece) > F3 (turnover) > F4 (regain) > OPEN.
+F1/F2 need ball ownership and stay "OPEN".
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, Mapping, Sequence
+
+import numpy as np
+
+SHOT = 1
+TURNOVER = 2
+REGAIN = 4
+SETPIECE = 8
+
+FAMILIES: Dict[int, Sequence[str]] = {
+    SHOT: ("şut", "shot", "vuruş", "kafa vuruş", "volley"),
+    TURNOVER: ("top kayb", "loss", "miscontrol", "bad control", "hata", "turnover"),
+    REGAIN: ("top kazan", "recovery", "interception", "tackle", "ball win", "kapma", "pas arası"),
+    SETPIECE: ("korner", "corner", "freekick", "serbest vuruş", "taç", "throw", "penalt", "penalty"),
+}
+
+
+class KeywordClassifier:
+    def __init__(self, families: Mapping[int, Iterable[str]] = FAMILIES) -> None:
+        own: Dict[str, int] = {}
+        for bit, kws in families.items():
+            for k in kws:
+                own[k] = own.get(k, 0) | bit
+        self._mask = {k: 0 for k in own}
+        for k in own:
+            for p, bit in own.items():
+                if k.startswith(p):
+                    self._mask[k] |= bit
+        alt = "|".join(re.escape(k) for k in sorted(own, key=lambda k: (-len(k), k)))
+        self._rx = re.compile(f"(?=({alt}))") if own else None
+        self._cache: Dict[Any, int] = {}
+
+    def mask(self, text: Any) -> int:
+        hit = self._cache.get(text)
+        if hit is None:
+            hit = 0
+            if self._rx is not None:
+                for m in self._rx.finditer((text or "").strip().lower()):
+                    hit |= self._mask[m.group(1)]
+            self._cache[text] = hit
+        return hit
+
+    def masks(self, texts: Iterable[Any]) -> np.ndarray:
+        return np.array([self.mask(t) for t in texts], dtype=np.int64)
+
+
+_DEFAULT = KeywordClassifier()
+
+
+def kw_mask(text: Any) -> int:
+    return _DEFAULT.mask(text)
+
+
+def kw_masks(texts: Iterable[Any]) -> np.ndarray:
+    return _DEFAULT.masks(texts)
+
+
+def phase_proxy(mask: int) -> str:
+    if mask & SETPIECE:
+        return "F5/F6"
+    if mask & TURNOVER:
+        return "F3"
+    if mask & REGAIN:
+        return "F4"
+    return "OPEN"
@@ -0,0 +1,101 @@
+"""
+Transition latency — "time to next X after Y" over one match (sorted arrays + searchsorted)
+
+For every Y event (from_mask) with a time, the first X event (to_mask) of the
+same group whose time is >= the Y time (> with inclusive=False):
+  dt      = t_X - t_Y   (NaN if no later X in the group)
+  to_row  = row of that X (-1 if none)
+
+The first X after Y is found by np.searchsorted on the group's sorted X times:
+O(n log n) per match instead of a scan of the X list per Y event. The answer is
+the first X in time, not the first X within a window; windows (e.g.
+turnover -> regain <= 30 s) are applied afterwards with within()/by_group(), as
+the report tools did.
+
+Rows with a NaN time never take part (as Y or as X). groups=None is one group.
+Ties keep file order (stable sort), so to_row is the earliest such X row.
+
+Used for turnover -> regain (report_v1/v2); any event-class pair (counter-press,
+recovery, ...) goes through the same call with other masks.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Latency:
+    from_rows: np.ndarray  # rows of the Y events (valid time), ascending
+    dt: np.ndarray  # float64, NaN if no X follows in the group
+    to_rows: np.ndarray  # row of the matched X, -1 if none
+    groups: np.ndarray  # group label per Y event
+
+    def within(self, lo: float = 0.0, hi: Optional[float] = None) -> np.ndarray:
+        """Mask over Y events with lo <= dt (<= hi); NaN (no X) is never inside."""
+        ok = self.dt >= lo
+        if hi is not None:
+            ok &= self.dt <= hi
+        return ok
+
+    def by_group(self, lo: float = 0.0, hi: Optional[float] = None) -> Dict[Hashable, np.ndarray]:
+        """Per-group dt distributions inside [lo, hi], Y events in row order; groups without Y events are absent."""
+        ok = self.within(lo, hi)
+        out: Dict[Hashable, np.ndarray] = {}
+        for g in dict.fromkeys(self.groups.tolist()):
+            out[g] = self.dt[ok & (self.groups == g)]
+        return out
+
+
+def _labels(groups: Any, n: int) -> np.ndarray:
+    if groups is None:
+        return np.zeros(n, dtype=np.int64)
+    g = np.asarray(groups)
+    if len(g) != n:
+        raise ValueError("LATENCY_FAIL_CLOSED:column_length_mismatch")
+    return g
+
+
+def next_event_latency(
+    times: Any,
+    from_mask: Any,
+    to_mask: Any,
+    groups: Any = None,
+    inclusive: bool = True,
+) -> Latency:
+    """Time from each from_mask event to the next to_mask event of the same group."""
+    t = np.asarray(times, dtype=np.float64)
+    n = len(t)
+    src = np.asarray(from_mask, dtype=bool)
+    dst = np.asarray(to_mask, dtype=bool)
+    if len(src) != n or len(dst) != n:
+        raise ValueError("LATENCY_FAIL_CLOSED:column_length_mismatch")
+    labels = _labels(groups, n)
+
+    valid = ~np.isnan(t)
+    from_rows = np.flatnonzero(src & valid)
+    dt = np.full(len(from_rows), np.nan)
+    to_rows = np.full(len(from_rows), -1, dtype=np.int64)
+    side = "left" if inclusive else "right"
+
+    # one sorted X array per group; Y events of the group search into it
+    _, inv = np.unique(labels, return_inverse=True)
+    from_g = inv[from_rows]
+    to_all = np.flatnonzero(dst & valid)
+    for g in np.unique(from_g).tolist():
+        xs = to_all[inv[to_all] == g]
+        if not len(xs):
+            continue
+        xs = xs[np.argsort(t[xs], kind="stable")]
+        tx = t[xs]
+        ys = np.flatnonzero(from_g == g)
+        ty = t[from_rows[ys]]
+        pos = np.searchsorted(tx, ty, side=side)
+        hit = pos < len(tx)
+        dt[ys[hit]] = tx[pos[hit]] - ty[hit]
+        to_rows[ys[hit]] = xs[pos[hit]]
+
+    return Latency(from_rows=from_rows, dt=dt, to_rows=to_rows, groups=labels[from_rows])
@@ -9,6 +9,9 @@ Fail-closed:
 HSR:
 - Ring3 dead-ball veto => exclude
 - Ring4 physics veto  => exclude
+
+Live use:
+- NASStream: ts-ordered push, sequences emitted when their chain closes
 """
 
 from __future__ import annotations
@@ -46,6 +49,19 @@ def _missing_fields(e: Dict[str, Any]) -> List[str]:
     return missing
 
 
+def _check_events(events: Any) -> Optional[str]:
+    """Fail-closed reason for a non-list / non-dict event / missing field, else None."""
+    if not isinstance(events, list):
+        return "NAS_FAIL_CLOSED:events_not_list"
+    for i, e in enumerate(events):
+        if not isinstance(e, dict):
+            return f"NAS_FAIL_CLOSED:event_not_dict:index={i}"
+        missing = _missing_fields(e)
+        if missing:
+            return f"NAS_FAIL_CLOSED:missing_{missing[0]}"
+    return None
+
+
 def _norm_float(x: Any) -> Optional[float]:
     if isinstance(x, (int, float)):
         return float(x)
@@ -64,6 +80,9 @@ def _norm_str(x: Any) -> Optional[str]:
     return None
 
 
+_BAD_FIELD_TYPE = "NAS_FAIL_CLOSED:bad_field_type"
+
+
 @dataclass(frozen=True)
 class NASSequence:
     start_ts: float
@@ -83,11 +102,187 @@ class NASResult:
     sequences: List[NASSequence]
 
 
+class NASStream:
+    """
+    Streaming NAS: events are pushed in timestamp order, a sequence is emitted
+    as soon as its chain closes (the first event that does not extend it).
+    State is the open chain only (plus the emitted sequences kept for close()).
+
+    close() returns exactly what NASDetector.evaluate() returns for the same
+    timestamp-ordered events.
+
+    Fail-closed (no emission afterwards; close() => UNVALIDATED):
+    - non-dict / missing fields => same reasons as evaluate() (index = push position)
+    - bad field type            => bad_field_type (a later missing field still wins, as in evaluate())
+    - timestamp going backwards => NAS_FAIL_CLOSED:out_of_order:index=<i>
+    """
+
+    def __init__(self, max_dt_s: float = 0.5, min_fail_count: int = 3) -> None:
+        self.max_dt_s = float(max_dt_s)
+        self.min_fail_count = int(min_fail_count)
+        self.sequences: List[NASSequence] = []
+        self._n = 0
+        self._last_ts: Optional[float] = None
+        self._reason: Optional[str] = None
+        self._closed = False
+        self._reset_chain()
+
+    def _reset_chain(self) -> None:
+        self._zone: Optional[str] = None
+        self._start_ts: Optional[float] = None
+        self._end_ts: Optional[float] = None
+        self._fail_count = 0
+        self._pressures: List[float] = []
+        self._event_ids: List[str] = []
+        self._prev_fail_ts: Optional[float] = None
+
+    def _start_chain(self, zone_id: str, ts: float, pressure: float, eid: str) -> None:
+        self._zone = zone_id
+        self._start_ts = ts
+        self._end_ts = ts
+        self._fail_count = 1
+        self._pressures = [pressure]
+        self._event_ids = [eid] if eid else []
+        self._prev_fail_ts = ts
+
+    def _flush(self) -> Optional[NASSequence]:
+        seq: Optional[NASSequence] = None
+        if self._zone is not None and self._start_ts is not None and self._end_ts is not None:
+            if self._fail_count >= self.min_fail_count:
+                p = self._pressures
+                seq = NASSequence(
+                    start_ts=self._start_ts,
+                    end_ts=self._end_ts,
+                    zone_id=self._zone,
+                    fail_count=self._fail_count,
+                    avg_pressure=sum(p) / len(p) if p else 0.0,
+                    max_pressure=max(p) if p else 0.0,
+                    event_ids=list(self._event_ids),
+                )
+                self.sequences.append(seq)
+        self._reset_chain()
+        return seq
+
+    @property
+    def failed(self) -> bool:
+        return self._reason is not None
+
+    def push(self, e: Dict[str, Any]) -> Optional[NASSequence]:
+        """Feed one event; returns the sequence its arrival closed, if any."""
+        if self._closed:
+            raise ValueError("NAS_FAIL_CLOSED:stream_closed")
+        i = self._n
+        self._n += 1
+        if self._reason is not None and self._reason != _BAD_FIELD_TYPE:
+            return None
+        if not isinstance(e, dict):
+            self._reason = f"NAS_FAIL_CLOSED:event_not_dict:index={i}"
+            return None
+        missing = _missing_fields(e)
+        if missing:
+            self._reason = f"NAS_FAIL_CLOSED:missing_{missing[0]}"
+            return None
+        if self._reason is not None:
+            return None
+        return self._consume(e, i)
+
+    def push_many(self, events: List[Dict[str, Any]]) -> List[NASSequence]:
+        out: List[NASSequence] = []
+        for e in events:
+            seq = self.push(e)
+            if seq is not None:
+                out.append(seq)
+        return out
+
+    def _consume(self, e: Dict[str, Any], i: int) -> Optional[NASSequence]:
+        # e is a dict with all required fields present
+        ts = _norm_float(e["event_start_time"])
+        phase = _norm_str(e["phase"])
+        state_id = _norm_str(e["state_id"])
+        action_type = _norm_str(e["action_type"])
+        outcome = _norm_str(e["outcome"])
+        pressure = _norm_float(e["pressure_level"])
+        hsr_flags = e["hsr_flags"]
+
+        # presence validated; now validate types deterministically
+        if ts is None or phase is None or state_id is None or action_type is None or outcome is None or pressure is None:
+            self._reason = _BAD_FIELD_TYPE
+            return None
+
+        if self._last_ts is not None and ts < self._last_ts:
+            self._reason = f"NAS_FAIL_CLOSED:out_of_order:index={i}"
+            return None
+        self._last_ts = ts
+
+        zone_id = str(e["zone_id"])
+
+        r3 = bool(hsr_flags.get("ring3_dead_ball_veto"))
+        r4 = bool(hsr_flags.get("ring4_physics_veto"))
+
+        # Hard gates (exclude); each also breaks the chain (scope boundary)
+        if phase not in ("DEFENSIVE", "TRANSITION"):
+            return self._flush()
+        if state_id == "DEAD_BALL" or r3:
+            return self._flush()
+        if r4:
+            return self._flush()
+        if outcome.upper() != "FAIL":
+            return self._flush()
+
+        # This is a qualifying FAIL
+        eid = _norm_str(e.get("event_id")) or ""
+
+        if self._zone is None:
+            self._start_chain(zone_id, ts, pressure, eid)
+            return None
+
+        # must match zone and dt constraint
+        if zone_id != self._zone:
+            seq = self._flush()
+            self._start_chain(zone_id, ts, pressure, eid)
+            return seq
+
+        if self._prev_fail_ts is None:
+            # should not happen; fail-closed
+            self._reason = "NAS_FAIL_CLOSED:internal_prev_ts_missing"
+            return None
+
+        if ts - self._prev_fail_ts > self.max_dt_s:
+            seq = self._flush()
+            self._start_chain(zone_id, ts, pressure, eid)
+            return seq
+
+        # extend chain
+        self._end_ts = ts
+        self._fail_count += 1
+        self._pressures.append(pressure)
+        if eid:
+            self._event_ids.append(eid)
+        self._prev_fail_ts = ts
+        return None
+
+    def close(self) -> NASResult:
+        """Flush the open chain and return the full result (no further pushes)."""
+        if not self._closed:
+            self._closed = True
+            if self._reason is None:
+                self._flush()
+        if self._reason is not None:
+            return NASResult(status="UNVALIDATED", reason=self._reason, nas_sequence_count=0, sequences=[])
+        return NASResult(
+            status="PASS",
+            reason="OK",
+            nas_sequence_count=len(self.sequences),
+            sequences=list(self.sequences),
+        )
+
+
 class NASDetector:
     """
     Deterministic NAS detector.
     Input: list of canonical-ish events (dicts).
     Output: NASResult (PASS even if 0 sequences, UNVALIDATED if missing fields prevent evaluation).
+    Batch front-end of NASStream (validate all, sort by ts, stream).
     """
 
     def __init__(self, max_dt_s: float = 0.5, min_fail_count: int = 3) -> None:
@@ -95,181 +290,23 @@ class NASDetector:
         self.min_fail_count = int(min_fail_count)
 
     def evaluate(self, events: List[Dict[str, Any]]) -> NASResult:
-        if not isinstance(events, list):
+        reason = _check_events(events)
+        if reason is not None:
             return NASResult(
                 status="UNVALIDATED",
-                reason="NAS_FAIL_CLOSED:events_not_list",
+                reason=reason,
                 nas_sequence_count=0,
                 sequences=[],
             )
 
-        # fail-closed if any event missing required fields
-        for i, e in enumerate(events):
-            if not isinstance(e, dict):
-                return NASResult(
-                    status="UNVALIDATED",
-                    reason=f"NAS_FAIL_CLOSED:event_not_dict:index={i}",
-                    nas_sequence_count=0,
-                    sequences=[],
-                )
-            missing = _missing_fields(e)
-            if missing:
-                return NASResult(
-                    status="UNVALIDATED",
-                    reason=f"NAS_FAIL_CLOSED:missing_{missing[0]}",
-                    nas_sequence_count=0,
-                    sequences=[],
-                )
-
         # Sort by time deterministically (stable)
         def _ts_key(e: Dict[str, Any]) -> float:
             ts = _norm_float(e.get("event_start_time"))
             return ts if ts is not None else 0.0
 
-        events_sorted = sorted(events, key=_ts_key)
-
-        sequences: List[NASSequence] = []
-
-        # Running chain state
-        chain_zone: Optional[str] = None
-        chain_start_ts: Optional[float] = None
-        chain_end_ts: Optional[float] = None
-        chain_fail_count: int = 0
-        chain_pressures: List[float] = []
-        chain_event_ids: List[str] = []
-        prev_fail_ts: Optional[float] = None
-
-        def _flush_chain() -> None:
-            nonlocal chain_zone, chain_start_ts, chain_end_ts, chain_fail_count, chain_pressures, chain_event_ids, prev_fail_ts
-            if chain_zone is not None and chain_start_ts is not None and chain_end_ts is not None:
-                if chain_fail_count >= self.min_fail_count:
-                    avg_p = sum(chain_pressures) / len(chain_pressures) if chain_pressures else 0.0
-                    max_p = max(chain_pressures) if chain_pressures else 0.0
-                    sequences.append(
-                        NASSequence(
-                            start_ts=chain_start_ts,
-                            end_ts=chain_end_ts,
-                            zone_id=chain_zone,
-                            fail_count=chain_fail_count,
-                            avg_pressure=avg_p,
-                            max_pressure=max_p,
-                            event_ids=list(chain_event_ids),
-                        )
-                    )
-            # reset
-            chain_zone = None
-            chain_start_ts = None
-            chain_end_ts = None
-            chain_fail_count = 0
-            chain_pressures = []
-            chain_event_ids = []
-            prev_fail_ts = None
-
-        for e in events_sorted:
-            ts = _norm_float(e["event_start_time"])
-            phase = _norm_str(e["phase"])
-            state_id = _norm_str(e["state_id"])
-            action_type = _norm_str(e["action_type"])
-            outcome = _norm_str(e["outcome"])
-            zone_id_raw = e["zone_id"]
-            pressure = _norm_float(e["pressure_level"])
-            hsr_flags = e["hsr_flags"]
-
-            # We already validated presence; now validate types deterministically
-            if ts is None or phase is None or state_id is None or action_type is None or outcome is None or pressure is None:
-                return NASResult(
-                    status="UNVALIDATED",
-                    reason="NAS_FAIL_CLOSED:bad_field_type",
-                    nas_sequence_count=0,
-                    sequences=[],
-                )
-
-            zone_id = str(zone_id_raw)
-
-            r3 = bool(hsr_flags.get("ring3_dead_ball_veto"))
-            r4 = bool(hsr_flags.get("ring4_physics_veto"))
-
-            # Hard gates (exclude)
-            if phase not in ("DEFENSIVE", "TRANSITION"):
-                # ignore but also break chain (scope boundary)
-                _flush_chain()
-                continue
-
-            if state_id == "DEAD_BALL" or r3:
-                _flush_chain()
-                continue
-
-            if r4:
-                _flush_chain()
-                continue
-
-            if outcome.upper() != "FAIL":
-                _flush_chain()
-                continue
-
-            # This is a qualifying FAIL
-            eid = _norm_str(e.get("event_id")) or ""
-
-            if chain_zone is None:
-                # start chain
-                chain_zone = zone_id
-                chain_start_ts = ts
-                chain_end_ts = ts
-                chain_fail_count = 1
-                chain_pressures = [pressure]
-                chain_event_ids = [eid] if eid else []
-                prev_fail_ts = ts
-                continue
-
-            # must match zone and dt constraint
-            if zone_id != chain_zone:
-                _flush_chain()
-                # start new
-                chain_zone = zone_id
-                chain_start_ts = ts
-                chain_end_ts = ts
-                chain_fail_count = 1
-                chain_pressures = [pressure]
-                chain_event_ids = [eid] if eid else []
-                prev_fail_ts = ts
-                continue
-
-            if prev_fail_ts is None:
-                # should not happen; fail-closed
-                return NASResult(
-                    status="UNVALIDATED",
-                    reason="NAS_FAIL_CLOSED:internal_prev_ts_missing",
-                    nas_sequence_count=0,
-                    sequences=[],
-                )
-
-            dt = ts - prev_fail_ts
-            if dt > self.max_dt_s:
-                _flush_chain()
-                # start new
-                chain_zone = zone_id
-                chain_start_ts = ts
-                chain_end_ts = ts
-                chain_fail_count = 1
-                chain_pressures = [pressure]
-                chain_event_ids = [eid] if eid else []
-                prev_fail_ts = ts
-                continue
-
-            # extend chain
-            chain_end_ts = ts
-            chain_fail_count += 1
-            chain_pressures.append(pressure)
-            if eid:
-                chain_event_ids.append(eid)
-            prev_fail_ts = ts
-
-        # flush final chain
-        _flush_chain()
-
-        return NASResult(
-            status="PASS",
-            reason="OK",
-            nas_sequence_count=len(sequences),
-            sequences=sequences,
-        )
+        stream = NASStream(max_dt_s=self.max_dt_s, min_fail_count=self.min_fail_count)
+        for i, e in enumerate(sorted(events, key=_ts_key)):
+            stream._consume(e, i)
+            if stream.failed:
+                break
+        return stream.close()
@@ -0,0 +1,280 @@
+"""
+NAS — vectorized evaluation over column arrays (season-scale studies)
+
+Same rules, same NASResult and same fail-closed reasons as
+NASDetector.evaluate (hpfa/analytics/nas.py); only the input shape differs.
+
+Columns (mapping or DataFrame; equal length):
+  event_start_time, phase, state_id, action_type, outcome, zone_id,
+  pressure_level, ring3_dead_ball_veto, ring4_physics_veto, [event_id]
+
+Vectorization:
+  - typed (numeric / bool / unicode) arrays are normalized in bulk;
+    object arrays and plain lists use the scalar _norm_* rules element-wise
+  - gating (phase, DEAD_BALL/ring3, ring4, FAIL) is one boolean mask
+  - chain starts = qualifying FAIL whose predecessor (sorted order) is not
+    a qualifying FAIL, or zone change, or dt > max_dt_s
+  - only sequences that reach min_fail_count are materialized; their
+    pressure sums run left-to-right in Python floats (bit-identical)
+
+Parameter sweeps (sweep_columns / sweep_events) reuse everything up to the
+inter-fail gaps and only re-cut chains per (max_dt_s, min_fail_count).
+
+Fail-closed:
+  - missing column          => NAS_FAIL_CLOSED:missing_<field> (evaluate()'s order)
+  - unequal column lengths  => NAS_FAIL_CLOSED:column_length_mismatch
+  - any un-normalizable cell => NAS_FAIL_CLOSED:bad_field_type
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from hpfa.analytics.nas import REQUIRED_FIELDS, NASResult, NASSequence, _check_events, _norm_float, _norm_str
+
+RING3 = "ring3_dead_ball_veto"
+RING4 = "ring4_physics_veto"
+
+# (column, reason suffix) in the order evaluate() reports missing fields
+COLUMNS: List[Tuple[str, str]] = [(k, k) for k in REQUIRED_FIELDS if k != "hsr_flags"] + [
+    (RING3, f"hsr_flags.{RING3}"),
+    (RING4, f"hsr_flags.{RING4}"),
+]
+
+
+def _unvalidated(reason: str) -> NASResult:
+    return NASResult(status="UNVALIDATED", reason=reason, nas_sequence_count=0, sequences=[])
+
+
+def _arr(x: Any) -> np.ndarray:
+    # arrays / Series keep their dtype (bulk path); plain sequences stay
+    # object so mixed cells are not coerced (e.g. True -> "True")
+    if hasattr(x, "dtype"):
+        return np.asarray(x)
+    return np.asarray(x, dtype=object)
+
+
+def _float_col(x: Any) -> Optional[np.ndarray]:
+    a = _arr(x)
+    if a.dtype.kind in "biuf":
+        return a.astype(np.float64)
+    vals = [_norm_float(v) for v in a.tolist()]
+    if any(v is None for v in vals):
+        return None
+    return np.asarray(vals, dtype=np.float64)
+
+
+def _str_col(x: Any) -> Optional[np.ndarray]:
+    a = _arr(x)
+    if a.dtype.kind == "U":
+        s = np.char.strip(a)
+        return None if (np.char.str_len(s) == 0).any() else s
+    if a.dtype.kind != "O":
+        return None if len(a) else np.asarray([], dtype=str)
+    vals = [_norm_str(v) for v in a.tolist()]
+    if any(v is None for v in vals):
+        return None
+    return np.asarray(vals, dtype=str)
+
+
+def _bool_col(x: Any) -> np.ndarray:
+    a = _arr(x)
+    if a.dtype.kind in "biuf":
+        return a.astype(bool)
+    return np.fromiter((bool(v) for v in a.tolist()), dtype=bool, count=len(a))
+
+
+def _zone_col(x: Any) -> np.ndarray:
+    # int / bool / unicode arrays compare like their str(); labels via str(.item())
+    a = _arr(x)
+    if a.dtype.kind in "biuU":
+        return a
+    return np.asarray([str(v) for v in a.tolist()], dtype=str)
+
+
+def _is_fail(outcome: np.ndarray) -> np.ndarray:
+    # outcome.upper() == "FAIL"; str.upper never shrinks, so only <= 4 chars can match
+    fail = outcome == "FAIL"
+    cand = np.flatnonzero(~fail & (np.char.str_len(outcome) <= 4))
+    if len(cand):
+        fail[cand] = np.char.upper(outcome[cand]) == "FAIL"
+    return fail
+
+
+def columns_from_events(events: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Column view of field-checked event dicts (as evaluate() accepts them)."""
+    cols: Dict[str, List[Any]] = {k: [e[k] for e in events] for k, _ in COLUMNS if k not in (RING3, RING4)}
+    cols[RING3] = [e["hsr_flags"].get(RING3) for e in events]
+    cols[RING4] = [e["hsr_flags"].get(RING4) for e in events]
+    cols["event_id"] = [e.get("event_id") for e in events]
+    return cols
+
+
+@dataclass(frozen=True)
+class _Prepared:
+    ts: np.ndarray  # sorted
+    pressure: np.ndarray  # sorted
+    zone: np.ndarray  # sorted
+    eids: Optional[List[Any]]  # sorted, or None without an event_id column
+    qi: np.ndarray  # sorted positions of qualifying FAILs
+    hard_break: np.ndarray  # len(qi)-1: gap in qualifying run or zone change
+    gap_s: np.ndarray  # len(qi)-1: dt between consecutive qualifying FAILs
+
+
+def _prepare(columns: Mapping[str, Any]) -> Union[NASResult, _Prepared]:
+    """Everything that does not depend on (max_dt_s, min_fail_count); NASResult if fail-closed."""
+    for k, label in COLUMNS:
+        if k not in columns:
+            return _unvalidated(f"NAS_FAIL_CLOSED:missing_{label}")
+    n = len(columns["event_start_time"])
+    if any(len(columns[k]) != n for k, _ in COLUMNS) or ("event_id" in columns and len(columns["event_id"]) != n):
+        return _unvalidated("NAS_FAIL_CLOSED:column_length_mismatch")
+
+    ts = _float_col(columns["event_start_time"])
+    pressure = _float_col(columns["pressure_level"])
+    phase = _str_col(columns["phase"])
+    state_id = _str_col(columns["state_id"])
+    action_type = _str_col(columns["action_type"])
+    outcome = _str_col(columns["outcome"])
+    if ts is None or pressure is None or phase is None or state_id is None or action_type is None or outcome is None:
+        return _unvalidated("NAS_FAIL_CLOSED:bad_field_type")
+
+    # Sort by time deterministically (stable), as evaluate()
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    pressure = pressure[order]
+    zone = _zone_col(columns["zone_id"])[order]
+
+    # Hard gates (exclude)
+    qual = (
+        ((phase == "DEFENSIVE") | (phase == "TRANSITION"))
+        & (state_id != "DEAD_BALL")
+        & ~_bool_col(columns[RING3])
+        & ~_bool_col(columns[RING4])
+        & _is_fail(outcome)
+    )[order]
+    qi = np.flatnonzero(qual)
+
+    # Break conditions between consecutive qualifying FAILs (dt handled per setting)
+    hard_break = (np.diff(qi) != 1) | (zone[qi[1:]] != zone[qi[:-1]])
+    gap_s = ts[qi[1:]] - ts[qi[:-1]]
+
+    eids: Optional[List[Any]] = None
+    if "event_id" in columns and len(qi):
+        eids = np.asarray(columns["event_id"], dtype=object)[order].tolist()
+    return _Prepared(ts, pressure, zone, eids, qi, hard_break, gap_s)
+
+
+def _chains(prep: _Prepared, max_dt_s: float) -> np.ndarray:
+    """Chain bounds into prep.qi: chain c is qi[bounds[c]:bounds[c + 1]]."""
+    if not len(prep.qi):
+        return np.zeros(1, dtype=np.int64)
+    start = np.ones(len(prep.qi), dtype=bool)
+    start[1:] = prep.hard_break | (prep.gap_s > max_dt_s)
+    return np.append(np.flatnonzero(start), len(prep.qi))
+
+
+def _sequence(prep: _Prepared, lo: int, hi: int) -> NASSequence:
+    rows = prep.qi[lo:hi]
+    p = prep.pressure[rows].tolist()
+    ids: List[str] = []
+    if prep.eids is not None:
+        for r in rows.tolist():
+            eid = _norm_str(prep.eids[r])
+            if eid:
+                ids.append(eid)
+    return NASSequence(
+        start_ts=float(prep.ts[rows[0]]),
+        end_ts=float(prep.ts[rows[-1]]),
+        zone_id=str(prep.zone[rows[0]].item()),
+        fail_count=len(rows),
+        avg_pressure=sum(p) / len(p),
+        max_pressure=max(p),
+        event_ids=ids,
+    )
+
+
+def evaluate_columns(columns: Mapping[str, Any], max_dt_s: float = 0.5, min_fail_count: int = 3) -> NASResult:
+    prep = _prepare(columns)
+    if isinstance(prep, NASResult):
+        return prep
+    bounds = _chains(prep, float(max_dt_s))
+    keep = np.flatnonzero(np.diff(bounds) >= int(min_fail_count))
+    sequences = [_sequence(prep, int(bounds[c]), int(bounds[c + 1])) for c in keep.tolist()]
+    return NASResult(status="PASS", reason="OK", nas_sequence_count=len(sequences), sequences=sequences)
+
+
+# -----------------------------
+# Parameter sweep
+# -----------------------------
+@dataclass(frozen=True)
+class NASSweepRow:
+    max_dt_s: float
+    min_fail_count: int
+    nas_sequence_count: int
+    sequences: List[NASSequence]
+
+
+@dataclass(frozen=True)
+class NASSweep:
+    status: str  # PASS | UNVALIDATED (data-level; same for every setting)
+    reason: str
+    rows: List[NASSweepRow]  # max_dt_s-major, in grid order
+
+    def result(self, max_dt_s: float, min_fail_count: int) -> NASResult:
+        """The NASResult evaluate() would return for one grid point."""
+        if self.status != "PASS":
+            return _unvalidated(self.reason)
+        for r in self.rows:
+            if r.max_dt_s == float(max_dt_s) and r.min_fail_count == int(min_fail_count):
+                return NASResult(status="PASS", reason="OK", nas_sequence_count=r.nas_sequence_count, sequences=r.sequences)
+        raise KeyError((max_dt_s, min_fail_count))
+
+
+def sweep_columns(
+    columns: Mapping[str, Any], max_dt_values: Sequence[float], min_fail_values: Sequence[int]
+) -> NASSweep:
+    """
+    Grid of (max_dt_s, min_fail_count) in one pass: gating, sort and the
+    inter-fail gaps are computed once; each max_dt_s re-cuts the chains with
+    one vectorized comparison and each min_fail_count is a length filter.
+    Identical chains share one NASSequence object across settings.
+    """
+    dts = [float(v) for v in max_dt_values]
+    mins = [int(v) for v in min_fail_values]
+    prep = _prepare(columns)
+    if isinstance(prep, NASResult):
+        return NASSweep(status=prep.status, reason=prep.reason, rows=[])
+
+    built: Dict[Tuple[int, int], NASSequence] = {}
+    rows: List[NASSweepRow] = []
+    floor = min(mins) if mins else 0
+    for dt in dts:
+        bounds = _chains(prep, dt)
+        lengths = np.diff(bounds)
+        cand = np.flatnonzero(lengths >= floor).tolist()
+        for m in mins:
+            seqs: List[NASSequence] = []
+            for c in cand:
+                if lengths[c] < m:
+                    continue
+                key = (int(bounds[c]), int(bounds[c + 1]))
+                seq = built.get(key)
+                if seq is None:
+                    seq = built[key] = _sequence(prep, key[0], key[1])
+                seqs.append(seq)
+            rows.append(NASSweepRow(max_dt_s=dt, min_fail_count=m, nas_sequence_count=len(seqs), sequences=seqs))
+    return NASSweep(status="PASS", reason="OK", rows=rows)
+
+
+def sweep_events(
+    events: List[Dict[str, Any]], max_dt_values: Sequence[float], min_fail_values: Sequence[int]
+) -> NASSweep:
+    """sweep_columns() for event dicts, with evaluate()'s per-event field checks first."""
+    reason = _check_events(events)
+    if reason is not None:
+        return NASSweep(status="UNVALIDATED", reason=reason, rows=[])
+    return sweep_columns(columns_from_events(events), max_dt_values, min_fail_values)
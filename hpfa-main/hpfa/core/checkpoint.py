@@ -0,0 +1,101 @@
+"""
+HPFA Checkpoint Log — resume live possession tagging without replay
+
+Append-only JSONL, one line per checkpoint:
+  {"offset": <events consumed so far>, "snapshot": <machine.snapshot()>}
+
+- append() never rewrites earlier lines (optional fsync per checkpoint)
+- last() reads only the file tail (O(1) in match length)
+- a torn last line (crash mid-write) is skipped; the previous checkpoint wins,
+  and the next append() terminates it first so the new line stays readable
+
+Live consumer:
+  log = CheckpointLog(path)
+  sm, offset = resume_state_machine(log)
+  for i, ev in enumerate(feed[offset:], start=offset):
+      sm.update(ev)
+      log.append(i + 1, sm.snapshot())
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from hpfa.core.state_machine import PossessionStateMachine
+
+_TAIL_BLOCK = 4096
+
+
+class CheckpointLog:
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        self.path = path
+        self.fsync = bool(fsync)
+
+    def append(self, offset: int, snapshot: Dict[str, Any]) -> None:
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("CHECKPOINT_FAIL_CLOSED:bad_offset")
+        if not isinstance(snapshot, dict):
+            raise ValueError("CHECKPOINT_FAIL_CLOSED:snapshot_not_dict")
+        data = (json.dumps({"offset": offset, "snapshot": snapshot}, ensure_ascii=False, sort_keys=True) + "\n").encode("utf-8")
+        with open(self.path, "a+b") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data  # torn last line: do not glue this checkpoint onto it
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def last(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Latest complete checkpoint, or None if the log is missing/empty."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            while pos > 0:
+                step = min(_TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = buf.split(b"\n")
+                # lines[0] may be cut unless we reached the start of the file
+                complete = lines if pos == 0 else lines[1:]
+                for raw in reversed(complete):
+                    rec = _parse_line(raw)
+                    if rec is not None:
+                        return rec
+                buf = lines[0] if pos > 0 else b""
+        return None
+
+
+def _parse_line(raw: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        d = json.loads(raw.decode("utf-8"))
+    except Exception:
+        return None
+    if not isinstance(d, dict):
+        return None
+    off = d.get("offset")
+    snap = d.get("snapshot")
+    if not isinstance(off, int) or not isinstance(snap, dict):
+        return None
+    return off, snap
+
+
+def resume_state_machine(log: CheckpointLog, scramble_buffer_s: float = 0.5) -> Tuple[PossessionStateMachine, int]:
+    """(machine, events already consumed). Fresh machine at offset 0 if there is no checkpoint."""
+    sm = PossessionStateMachine(scramble_buffer_s=scramble_buffer_s)
+    last = log.last()
+    if last is None:
+        return sm, 0
+    offset, snap = last
+    sm.restore(snap)
+    return sm, offset
@@ -0,0 +1,244 @@
+"""
+HPFA Possession Runner — season-wide possession tagging
+
+Input layout:
+  <season_dir>/<match>/canonical_outfield.jsonl
+
+Canonical -> state machine fields (sm_fields), action labels mapped by
+mappings/engine_action_map.json (--action-map):
+  event_start_time  t_start
+  team_id           team_id
+  event_type        canon_type (RESTART => RESTART_<canon_subtype>),
+                    unmapped label => the raw action (not a canon event => UNVALIDATED, per canon)
+  outcome           SUCCESS/FAIL => success/fail, else none
+  is_meta labels (period start/break, match end) are dropped: not fed, not written (n_meta).
+  Records that already carry event_type are state-machine format and used as is.
+
+Output:
+  <season_dir>/<match>/possession_outfield.jsonl  (input record + state machine fields, streamed)
+  <season_dir>/possession_summary.json            (per-match counts + timings)
+
+Determinism:
+  - one PossessionStateMachine per match, events fed in file order
+  - possession ids restart at p000001 for every match, independent of scheduling
+  - summary rows sorted by match name
+
+Fail-closed:
+  - unreadable / non-object JSON line => match status FAIL (output removed)
+  - missing / malformed action map    => ValueError before any match is tagged
+  - (ERROR + UNVALIDATED) / events above --max-bad-ratio (default 0.5)
+                                      => POSSESSION_FAIL_CLOSED:bad_ratio:<ratio>><max> (output removed)
+  - a failing match does not stop the others; exit code 1 if any match failed
+
+Usage:
+  python -m hpfa.core.possession_runner <season_dir> [--jobs N] [--action-map PATH] [--max-bad-ratio R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from hpfa.core.state_machine import PossessionStateMachine
+
+INPUT_NAME = "canonical_outfield.jsonl"
+OUTPUT_NAME = "possession_outfield.jsonl"
+SUMMARY_NAME = "possession_summary.json"
+CHUNK_EVENTS = 2048
+
+DEFAULT_ACTION_MAP = Path(__file__).resolve().parents[3] / "mappings" / "engine_action_map.json"
+MAX_BAD_RATIO = 0.5
+
+_OUTCOMES = {"SUCCESS": "success", "FAIL": "fail"}
+
+ActionMap = Dict[str, Optional[Tuple[str, Optional[str]]]]
+
+
+def load_action_map(path: Path = DEFAULT_ACTION_MAP) -> ActionMap:
+    """
+    Provider action label -> (state machine event, outcome), None for meta labels.
+    Fail-closed: missing file or malformed entry => ValueError.
+    """
+    if not Path(path).exists():
+        raise ValueError(f"POSSESSION_FAIL_CLOSED:action_map_missing:{path}")
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    mapping = raw.get("mapping") if isinstance(raw, dict) else None
+    if not isinstance(mapping, dict):
+        raise ValueError("POSSESSION_FAIL_CLOSED:action_map_no_mapping")
+
+    out: ActionMap = {}
+    for label, spec in mapping.items():
+        if not isinstance(spec, dict) or not isinstance(spec.get("canon_type"), str) or not isinstance(spec.get("is_meta"), bool):
+            raise ValueError(f"POSSESSION_FAIL_CLOSED:action_map_bad_entry:{label}")
+        if spec["is_meta"]:
+            out[label] = None
+            continue
+        e_type = spec["canon_type"]
+        if e_type == "RESTART":
+            e_type = f"RESTART_{spec.get('canon_subtype')}"
+        out[label] = (e_type, _OUTCOMES.get(spec.get("outcome")))
+    return out
+
+
+def sm_fields(rec: Dict[str, Any], action_map: ActionMap) -> Tuple[Any, Any, Any, Any]:
+    """(event_type, team_id, event_start_time, outcome) of one non-meta input record (see module doc)."""
+    if "event_type" in rec:
+        return rec.get("event_type"), rec.get("team_id"), rec.get("event_start_time"), rec.get("outcome")
+    action = rec.get("action")
+    e_type, outcome = (action_map.get(action) or (action, None)) if isinstance(action, str) else (None, None)
+    return e_type, rec.get("team_id"), rec.get("t_start"), outcome
+
+
+def _flush(sm: PossessionStateMachine, recs: List[Dict[str, Any]], action_map: ActionMap, f: Any, stats: Dict[str, int]) -> None:
+    e_type, team, ts, outcome = zip(*(sm_fields(r, action_map) for r in recs))
+    cols = sm.run_columns(e_type, team, ts, outcome)
+    for i, r in enumerate(recs):
+        r["prev_state_id"] = cols.prev_state_id[i]
+        r["state_id"] = cols.state_id[i]
+        r["possession_effect"] = cols.possession_effect[i]
+        r["possession_id"] = cols.possession_id[i]
+        r["sm_reason"] = cols.sm_reason[i]
+        r["logic_version"] = "v1.0.0"
+        f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        if cols.state_id[i] == "ERROR":
+            stats["n_error"] += 1
+        elif cols.state_id[i] == "UNVALIDATED":
+            stats["n_unvalidated"] += 1
+    stats["n_events"] += len(recs)
+
+
+def tag_match(
+    match_dir: str,
+    scramble_buffer_s: float = 0.5,
+    action_map: Optional[ActionMap] = None,
+    max_bad_ratio: float = MAX_BAD_RATIO,
+) -> Dict[str, Any]:
+    """Tag one match; streams <match_dir>/possession_outfield.jsonl in chunks."""
+    t0 = time.perf_counter()
+    src = os.path.join(match_dir, INPUT_NAME)
+    dst = os.path.join(match_dir, OUTPUT_NAME)
+    row: Dict[str, Any] = {"match": os.path.basename(match_dir), "status": "PASS", "reason": "OK"}
+    stats = {"n_events": 0, "n_error": 0, "n_unvalidated": 0, "n_meta": 0}
+
+    sm = PossessionStateMachine(scramble_buffer_s=scramble_buffer_s)
+    try:
+        if action_map is None:
+            action_map = load_action_map()
+        with open(src, "r", encoding="utf-8") as fin, open(dst, "w", encoding="utf-8") as fout:
+            buf: List[Dict[str, Any]] = []
+            for lineno, line in enumerate(fin, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                rec = json.loads(line)
+                if not isinstance(rec, dict):
+                    raise ValueError(f"line_not_object:{lineno}")
+                if "event_type" not in rec and action_map.get(rec.get("action"), ()) is None:
+                    stats["n_meta"] += 1  # period markers: not play events
+                    continue
+                buf.append(rec)
+                if len(buf) >= CHUNK_EVENTS:
+                    _flush(sm, buf, action_map, fout, stats)
+                    buf = []
+            if buf:
+                _flush(sm, buf, action_map, fout, stats)
+    except Exception as e:
+        if os.path.exists(dst):
+            os.remove(dst)
+        row.update({"status": "FAIL", "reason": f"POSSESSION_FAIL_CLOSED:{type(e).__name__}:{e}"})
+    bad_ratio = (stats["n_error"] + stats["n_unvalidated"]) / stats["n_events"] if stats["n_events"] else 0.0
+    if row["status"] == "PASS" and bad_ratio > max_bad_ratio:
+        # mostly untagged (unmapped labels / undefined transitions): not a PASS
+        os.remove(dst)
+        row.update({"status": "FAIL", "reason": f"POSSESSION_FAIL_CLOSED:bad_ratio:{bad_ratio:.3f}>{max_bad_ratio}"})
+
+    row.update(stats)
+    row["bad_ratio"] = round(bad_ratio, 4)
+    row["n_possessions"] = sm._pos_counter
+    row["seconds"] = round(time.perf_counter() - t0, 4)
+    return row
+
+
+def find_matches(season_dir: str) -> List[str]:
+    out: List[str] = []
+    for name in sorted(os.listdir(season_dir)):
+        d = os.path.join(season_dir, name)
+        if os.path.isfile(os.path.join(d, INPUT_NAME)):
+            out.append(d)
+    return out
+
+
+def run_season(
+    season_dir: str,
+    jobs: int = 1,
+    scramble_buffer_s: float = 0.5,
+    action_map_path: Path = DEFAULT_ACTION_MAP,
+    max_bad_ratio: float = MAX_BAD_RATIO,
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    action_map = load_action_map(action_map_path)  # once per season; fail-closed before any match
+    matches = find_matches(season_dir)
+    n = len(matches)
+    if jobs <= 1 or n <= 1:
+        rows = [tag_match(m, scramble_buffer_s, action_map, max_bad_ratio) for m in matches]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            rows = list(ex.map(tag_match, matches, [scramble_buffer_s] * n, [action_map] * n, [max_bad_ratio] * n))
+    rows.sort(key=lambda r: r["match"])
+
+    summary = {
+        "season_dir": os.path.abspath(season_dir),
+        "jobs": jobs,
+        "n_matches": len(rows),
+        "n_failed": sum(1 for r in rows if r["status"] != "PASS"),
+        "n_events": sum(r["n_events"] for r in rows),
+        "wall_seconds": round(time.perf_counter() - t0, 4),
+        "matches": rows,
+    }
+    with open(os.path.join(season_dir, SUMMARY_NAME), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Season-wide possession tagging (one state machine per match).")
+    ap.add_argument("season_dir")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--scramble-buffer-s", type=float, default=0.5)
+    ap.add_argument("--action-map", type=Path, default=DEFAULT_ACTION_MAP)
+    ap.add_argument("--max-bad-ratio", type=float, default=MAX_BAD_RATIO)
+    args = ap.parse_args(argv)
+
+    if not Path(args.season_dir).is_dir():
+        print(f"FAIL_CLOSED season_dir not found: {args.season_dir}", file=sys.stderr)
+        return 2
+
+    try:
+        summary = run_season(
+            args.season_dir,
+            jobs=args.jobs,
+            scramble_buffer_s=args.scramble_buffer_s,
+            action_map_path=args.action_map,
+            max_bad_ratio=args.max_bad_ratio,
+        )
+    except ValueError as e:
+        print(f"FAIL_CLOSED {e}", file=sys.stderr)
+        return 2
+    for r in summary["matches"]:
+        print(
+            f"{r['status']} {r['match']} events={r['n_events']} bad_ratio={r['bad_ratio']} "
+            f"possessions={r['n_possessions']} t={r['seconds']:.3f}s {r['reason']}"
+        )
+    print(f"matches={summary['n_matches']} failed={summary['n_failed']} wall={summary['wall_seconds']:.3f}s")
+    return 1 if summary["n_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
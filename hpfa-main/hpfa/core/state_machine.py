@@ -4,6 +4,7 @@ HPFA Possession State Machine — Canonical v1.0.0
 
 Single Source of Truth:
   - hpfa/canon/possession_state_machine.md
+    (compiled once into an integer-coded table, see hpfa/core/transition_table.py)
 
 Fail-closed principles:
   - Missing required keys => ERROR (veto state)
@@ -24,7 +25,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from hpfa.core.transition_table import N_OUTCOMES, OUTCOME_CODE, compile_canon
 
 
 class HPFAState(str, Enum):
@@ -51,6 +54,30 @@ class SMResult:
     reason: str
 
 
+@dataclass(frozen=True)
+class SMColumns:
+    """
+    Columnar output of PossessionStateMachine.run_columns().
+    All lists are index-aligned with the input columns; values are the
+    same plain strings the dict path writes (state_id, possession_effect, ...).
+    """
+    prev_state_id: List[str]
+    state_id: List[str]
+    possession_effect: List[str]
+    possession_id: List[Optional[str]]
+    sm_reason: List[str]
+
+
+_STATES: Tuple[HPFAState, ...] = tuple(HPFAState)
+_EFFECTS: Tuple[PossessionEffect, ...] = tuple(PossessionEffect)
+_STATE_CODE: Dict[HPFAState, int] = {st: i for i, st in enumerate(_STATES)}
+_STATE_VALUES: Tuple[str, ...] = tuple(st.value for st in _STATES)
+_EFFECT_VALUES: Tuple[str, ...] = tuple(ef.value for ef in _EFFECTS)
+
+# Fail-closed: an unparseable canon makes the module unimportable.
+_TABLE = compile_canon(_STATE_VALUES, _EFFECT_VALUES)
+
+
 def _norm_str(x: Any) -> Optional[str]:
     if isinstance(x, str):
         s = x.strip()
@@ -116,6 +143,74 @@ class PossessionStateMachine:
         # deterministic possession id counter (no uuid)
         self._pos_counter: int = 0
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Compact, JSON-safe copy of the machine state.
+        restore(snapshot()) on a fresh machine continues exactly where this one stopped.
+        """
+        return {
+            "logic_version": "v1.0.0",
+            "scramble_buffer_s": self.scramble_buffer_s,
+            "state": self.state.value,
+            "possession_id": self.possession_id,
+            "team_id": self.team_id,
+            "last_ts": self.last_ts,
+            "last_team_id": self.last_team_id,
+            "pos_counter": self._pos_counter,
+        }
+
+    def restore(self, snap: Dict[str, Any]) -> None:
+        """
+        Load a snapshot() into this machine (O(1), no replay).
+        Fail-closed: malformed snapshot or broken invariant => ValueError, machine untouched.
+        """
+        if not isinstance(snap, dict):
+            raise ValueError("SM_FAIL_CLOSED:snapshot_not_dict")
+        if snap.get("logic_version") != "v1.0.0":
+            raise ValueError(f"SM_FAIL_CLOSED:snapshot_logic_version:{snap.get('logic_version')}")
+
+        state_raw = snap.get("state")
+        if state_raw not in HPFAState.__members__:
+            raise ValueError(f"SM_FAIL_CLOSED:snapshot_bad_state:{state_raw}")
+        state = HPFAState(state_raw)
+
+        counter = snap.get("pos_counter")
+        if not isinstance(counter, int) or isinstance(counter, bool) or counter < 0:
+            raise ValueError("SM_FAIL_CLOSED:snapshot_bad_pos_counter")
+
+        buf = _norm_ts(snap.get("scramble_buffer_s"))
+        if buf is None:
+            raise ValueError("SM_FAIL_CLOSED:snapshot_bad_scramble_buffer")
+
+        last_ts = snap.get("last_ts")
+        if last_ts is not None:
+            last_ts = _norm_ts(last_ts)
+            if last_ts is None:
+                raise ValueError("SM_FAIL_CLOSED:snapshot_bad_last_ts")
+
+        pos_id = snap.get("possession_id")
+        team = snap.get("team_id")
+        last_team = snap.get("last_team_id")
+        for k, v in (("possession_id", pos_id), ("team_id", team), ("last_team_id", last_team)):
+            if v is not None and _norm_str(v) != v:
+                raise ValueError(f"SM_FAIL_CLOSED:snapshot_bad_{k}")
+
+        if pos_id is not None:
+            num = pos_id[1:]
+            if not (pos_id.startswith("p") and num.isdigit() and 0 < int(num) <= counter):
+                raise ValueError("SM_FAIL_CLOSED:snapshot_possession_id_out_of_counter")
+        # Invariant: DEAD_BALL => possession_id must be None
+        if state == HPFAState.DEAD_BALL and pos_id is not None:
+            raise ValueError("SM_FAIL_CLOSED:snapshot_dead_ball_with_possession")
+
+        self.scramble_buffer_s = buf
+        self.state = state
+        self.possession_id = pos_id
+        self.team_id = team
+        self.last_ts = last_ts
+        self.last_team_id = last_team
+        self._pos_counter = counter
+
     def _new_possession_id(self) -> str:
         self._pos_counter += 1
         return f"p{self._pos_counter:06d}"
@@ -271,49 +366,194 @@ class PossessionStateMachine:
         )
         return out, res
 
+    def run_columns(
+        self,
+        event_type: Sequence[Any],
+        team_id: Sequence[Any],
+        event_start_time: Sequence[Any],
+        outcome: Optional[Sequence[Any]] = None,
+    ) -> SMColumns:
+        """
+        Columnar batch mode.
+
+        Same semantics as calling update() once per event (same normalization,
+        same fail-closed paths, same possession counter), but the input is
+        given as parallel columns and no per-event dict / SMResult is built.
+        Machine state is committed at the end, so dict and batch calls can be
+        mixed on the same instance.
+        """
+        n = len(event_type)
+        if len(team_id) != n or len(event_start_time) != n or (outcome is not None and len(outcome) != n):
+            raise ValueError("SM_FAIL_CLOSED:column_length_mismatch")
+
+        table = _TABLE
+        cells = table.cells
+        reasons = table.reasons
+        templated = table.templated
+        n_states = len(_STATES)
+        S_CONTROLLED = _STATE_CODE[HPFAState.CONTROLLED]
+        S_CONTESTED = _STATE_CODE[HPFAState.CONTESTED]
+        S_DEAD_BALL = _STATE_CODE[HPFAState.DEAD_BALL]
+        S_ERROR = _STATE_CODE[HPFAState.ERROR]
+        E_START = _EFFECTS.index(PossessionEffect.START)
+        E_CONTINUE = _EFFECTS.index(PossessionEffect.CONTINUE)
+        E_NEUTRAL = _EFFECTS.index(PossessionEffect.NEUTRAL)
+
+        # Raw value -> normalized code. A match has few distinct codes/teams.
+        type_cache: Dict[Any, Tuple[Optional[int], Optional[str]]] = {}
+        team_cache: Dict[Any, Optional[str]] = {}
+        outcome_cache: Dict[Any, int] = {}
+
+        def _type_code(raw: Any) -> Tuple[Optional[int], Optional[str]]:
+            e = _norm_event_type(raw)
+            return (None, None) if e is None else (table.event_code(e), e)
+
+        out_prev: List[str] = []
+        out_state: List[str] = []
+        out_effect: List[str] = []
+        out_pos: List[Optional[str]] = []
+        out_reason: List[str] = []
+        add_prev, add_state, add_effect, add_pos, add_reason = (
+            out_prev.append, out_state.append, out_effect.append, out_pos.append, out_reason.append
+        )
+
+        state = _STATE_CODE[self.state]
+        pos_id = self.possession_id
+        team = self.team_id
+        last_ts = self.last_ts
+        last_team = self.last_team_id
+        counter = self._pos_counter
+        buf = self.scramble_buffer_s
+
+        for i in range(n):
+            raw = event_type[i]
+            try:
+                ev, ev_name = type_cache[raw]
+            except KeyError:
+                ev, ev_name = type_cache[raw] = _type_code(raw)
+            except TypeError:
+                ev, ev_name = _type_code(raw)
+
+            raw = team_id[i]
+            try:
+                tid = team_cache[raw]
+            except KeyError:
+                tid = team_cache[raw] = _norm_team_id(raw)
+            except TypeError:
+                tid = _norm_team_id(raw)
+
+            raw = event_start_time[i]
+            ts = raw if type(raw) is float else _norm_ts(raw)
+
+            if outcome is None:
+                oc = 0
+            else:
+                raw = outcome[i]
+                try:
+                    oc = outcome_cache[raw]
+                except KeyError:
+                    oc = outcome_cache[raw] = OUTCOME_CODE[_norm_outcome(raw)]
+                except TypeError:
+                    oc = OUTCOME_CODE[_norm_outcome(raw)]
+
+            prev_state = state
+            add_prev(_STATE_VALUES[prev_state])
+
+            # fail-closed on missing critical fields (state is NOT committed)
+            if ev is None or tid is None or ts is None:
+                add_state("ERROR")
+                add_effect("NEUTRAL")
+                add_pos(pos_id)
+                add_reason("fail_closed:missing_required_keys")
+                continue
+
+            # Atomic unification
+            if last_ts is not None and last_team is not None and ts == last_ts and tid == last_team:
+                add_state(_STATE_VALUES[prev_state])
+                add_effect("NEUTRAL")
+                add_pos(pos_id)
+                add_reason("atomic_unify:same_ts_same_team")
+                continue
+
+            # Canonical transition decision: one table lookup
+            new_state, effect, reason_code = cells[(ev * n_states + prev_state) * N_OUTCOMES + oc]
+            reason = reasons[reason_code]
+            if templated[reason_code]:
+                reason = table.reason(reason_code, ev_name)
+
+            new_pos = pos_id
+            new_team = team
+
+            if new_state == S_DEAD_BALL:
+                new_pos = None
+                new_team = None
+
+            elif effect == E_START:
+                if new_state != S_CONTROLLED:
+                    new_state = S_ERROR
+                    effect = E_NEUTRAL
+                    reason = "invariant_violation:start_not_controlled"
+                elif (
+                    team is not None
+                    and tid != team
+                    and prev_state == S_CONTESTED
+                    and last_ts is not None
+                    and (ts - last_ts) <= buf
+                ):
+                    effect = E_NEUTRAL
+                    reason = f"scramble_buffer:hold_possession_dt={ts - last_ts:.3f}"
+                else:
+                    counter += 1
+                    new_pos = f"p{counter:06d}"
+                    new_team = tid
+
+            elif effect == E_CONTINUE:
+                if new_state != S_CONTROLLED:
+                    new_state = S_ERROR
+                    effect = E_NEUTRAL
+                    reason = "invariant_violation:continue_not_controlled"
+                if new_pos is None:
+                    counter += 1
+                    new_pos = f"p{counter:06d}"
+                    new_team = tid
+                    reason = f"{reason}|autostart_missing_possession"
+
+            else:
+                if new_team is None and new_pos is not None:
+                    new_state = S_ERROR
+                    effect = E_NEUTRAL
+                    reason = "fail_closed:possession_without_team"
+
+            state = new_state
+            pos_id = new_pos
+            team = new_team
+            last_ts = ts
+            last_team = tid
+
+            add_state(_STATE_VALUES[new_state])
+            add_effect(_EFFECT_VALUES[effect])
+            add_pos(new_pos)
+            add_reason(reason)
+
+        # Commit state
+        self.state = _STATES[state]
+        self.possession_id = pos_id
+        self.team_id = team
+        self.last_ts = last_ts
+        self.last_team_id = last_team
+        self._pos_counter = counter
+
+        return SMColumns(
+            prev_state_id=out_prev,
+            state_id=out_state,
+            possession_effect=out_effect,
+            possession_id=out_pos,
+            sm_reason=out_reason,
+        )
+
     def _transition(
         self, prev_state: HPFAState, e_type: str, outcome: Optional[str]
     ) -> Tuple[HPFAState, PossessionEffect, str]:
-        # ANY -> DEAD_BALL on OUT/FOUL
-        if e_type in ("OUT", "FOUL"):
-            return HPFAState.DEAD_BALL, PossessionEffect.END, f"transition:any+{e_type}->DEAD_BALL"
-
-        # ANY -> CONTESTED on LOOSE_BALL
-        if e_type == "LOOSE_BALL":
-            return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:any+LOOSE_BALL->CONTESTED_NEUTRAL"
-
-        # DEAD_BALL -> CONTROLLED START on RESTART_*
-        if e_type.startswith("RESTART_"):
-            return HPFAState.CONTROLLED, PossessionEffect.START, f"transition:DEAD_BALL+{e_type}->CONTROLLED_START"
-
-        # CONTROLLED -> CONTROLLED CONTINUE on PASS/DRIBBLE success
-        if e_type in ("PASS", "DRIBBLE"):
-            if outcome == "success":
-                if prev_state == HPFAState.CONTROLLED:
-                    return (
-                        HPFAState.CONTROLLED,
-                        PossessionEffect.CONTINUE,
-                        f"transition:CONTROLLED+{e_type}_success->CONTROLLED_CONTINUE",
-                    )
-                # not defined by canon => ERROR
-                return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+{e_type}_success"
-
-            # Canon v1.0.0: fail or missing outcome NOT defined -> UNVALIDATED (fail-closed, no speculation)
-            return HPFAState.UNVALIDATED, PossessionEffect.NEUTRAL, f"unvalidated:{prev_state.value}+{e_type}_missing_or_fail"
-
-        # TACKLE rules
-        if e_type == "TACKLE":
-            if prev_state == HPFAState.CONTROLLED:
-                return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:CONTROLLED+TACKLE->CONTESTED_NEUTRAL"
-            if prev_state == HPFAState.CONTESTED:
-                return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:CONTESTED+TACKLE->CONTESTED_NEUTRAL"
-            return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+TACKLE"
-
-        # INTERCEPTION rules
-        if e_type == "INTERCEPTION":
-            if prev_state in (HPFAState.CONTROLLED, HPFAState.CONTESTED):
-                return HPFAState.CONTROLLED, PossessionEffect.START, f"transition:{prev_state.value}+INTERCEPTION->CONTROLLED_START"
-            return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+INTERCEPTION"
-
-        # Unknown event => UNVALIDATED (fail-closed but non-crashing)
-        return HPFAState.UNVALIDATED, PossessionEffect.NEUTRAL, f"unknown_event:{e_type}"
+        # Compiled canon lookup: (prev_state, event_type, outcome) -> (state, effect, interned reason)
+        st, eff, reason = _TABLE.lookup(_STATE_CODE[prev_state], _TABLE.event_code(e_type), OUTCOME_CODE[outcome])
+        return _STATES[st], _EFFECTS[eff], _TABLE.reason(reason, e_type)
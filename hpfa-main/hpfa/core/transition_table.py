@@ -0,0 +1,215 @@
+"""
+HPFA Possession State Machine — compiled transition table
+
+Single Source of Truth:
+  - hpfa/canon/possession_state_machine.md ("Canonical Events" + "Transition Rules")
+
+The canon table is parsed once and compiled into a flat integer-coded table:
+
+  cell index = (event_code * N_STATES + state_code) * N_OUTCOMES + outcome_code
+  cell value = (to_state_code, effect_code, reason_code)
+
+Reason strings are interned (one str object per distinct reason).
+
+All rows are compiled up front and the table is never mutated afterwards
+(safe to share between threads):
+  - one row per canon event (Canonical Events + every event a rule names)
+  - one shared row per wildcard rule (RESTART_*) for unlisted kinds
+  - one shared UNDEFINED row for every event not in the canon
+Shared rows carry EVENT_SLOT in their reason; reason(code, e_type) fills in
+the event type, so sm_reason is the same as with a row per type.
+
+Cells the canon does not define are filled with the fail-closed policy of
+the state machine (see hpfa/core/state_machine.py):
+  - outcome-qualified event (PASS/DRIBBLE) without success => UNVALIDATED
+  - known event, undefined transition                       => ERROR
+  - event not in the canon                                  => UNVALIDATED
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_CANON_PATH = Path(__file__).resolve().parent.parent / "canon" / "possession_state_machine.md"
+
+# outcome codes (input already normalized by the state machine)
+OUTCOME_NONE = 0
+OUTCOME_SUCCESS = 1
+OUTCOME_FAIL = 2
+OUTCOME_CODE: Dict[Optional[str], int] = {None: OUTCOME_NONE, "success": OUTCOME_SUCCESS, "fail": OUTCOME_FAIL}
+N_OUTCOMES = 3
+
+ANY = "ANY"
+EVENT_SLOT = "{event}"
+
+
+@dataclass(frozen=True)
+class CanonRule:
+    from_state: str  # state name or ANY
+    event: str  # exact event, or prefix wildcard "RESTART_*"
+    success_only: bool
+    to_state: str
+    effect: str
+
+
+def _section(lines: List[str], title: str) -> List[str]:
+    out: List[str] = []
+    inside = False
+    for ln in lines:
+        if ln.startswith("## "):
+            inside = ln[3:].strip() == title
+            continue
+        if inside:
+            out.append(ln)
+    return out
+
+
+def parse_canon(
+    states: Sequence[str], effects: Sequence[str], path: Path = DEFAULT_CANON_PATH
+) -> Tuple[List[str], List[CanonRule]]:
+    """
+    Parse canonical events + transition rules from the canon markdown.
+    Fail-closed: anything unexpected (unknown state/effect, malformed row) raises ValueError.
+    """
+    if not path.exists():
+        raise ValueError(f"SM_FAIL_CLOSED:canon_missing:{path}")
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    events: List[str] = []
+    for ln in _section(lines, "Canonical Events"):
+        s = ln.strip()
+        if s.startswith("- "):
+            events.append(s[2:].split("(")[0].strip().upper())
+
+    rules: List[CanonRule] = []
+    for ln in _section(lines, "Transition Rules"):
+        s = ln.strip()
+        if not s.startswith("|"):
+            continue
+        cells = [c.strip() for c in s.strip("|").split("|")]
+        if len(cells) != 4:
+            raise ValueError(f"SM_FAIL_CLOSED:canon_bad_row:{s}")
+        if cells[0] == "From State" or set(cells[0]) <= {"-"}:
+            continue
+        frm, ev_cell, to, eff = cells
+        frm = frm.upper()
+        if frm != ANY and frm not in states:
+            raise ValueError(f"SM_FAIL_CLOSED:canon_unknown_state:{frm}")
+        if to not in states or eff not in effects:
+            raise ValueError(f"SM_FAIL_CLOSED:canon_bad_target:{to}/{eff}")
+        success_only = "(success)" in ev_cell
+        for ev in ev_cell.replace("(success)", "").split("/"):
+            ev = ev.strip().upper()
+            if not ev:
+                raise ValueError(f"SM_FAIL_CLOSED:canon_bad_event:{ev_cell}")
+            rules.append(CanonRule(frm, ev, success_only, to, eff))
+
+    if not events or not rules:
+        raise ValueError("SM_FAIL_CLOSED:canon_empty")
+    return events, rules
+
+
+def _label(to: str, effect: str) -> str:
+    # END transitions carry only the target state in their reason
+    return to if effect == "END" else f"{to}_{effect}"
+
+
+class TransitionTable:
+    def __init__(self, rules: List[CanonRule], events: List[str], states: Sequence[str], effects: Sequence[str]) -> None:
+        self.states: Tuple[str, ...] = tuple(states)
+        self.effects: Tuple[str, ...] = tuple(effects)
+        self._state_code = {s: i for i, s in enumerate(self.states)}
+        self._effect_code = {e: i for i, e in enumerate(self.effects)}
+        self._any: Dict[str, CanonRule] = {}
+        self._wild: List[Tuple[str, CanonRule]] = []
+        self._by_event: Dict[str, Dict[str, CanonRule]] = {}
+        for r in rules:
+            if r.event.endswith("*"):
+                self._wild.append((r.event[:-1], r))
+            elif r.from_state == ANY:
+                self._any[r.event] = r
+            else:
+                self._by_event.setdefault(r.event, {})[r.from_state] = r
+
+        self.reasons: List[str] = []
+        self.templated: List[bool] = []  # reason contains EVENT_SLOT
+        self._reason_code: Dict[str, int] = {}
+        self.event_codes: Dict[str, int] = {}
+        self.cells: List[Tuple[int, int, int]] = []
+        named = list(events) + list(self._any) + list(self._by_event)
+        for ev in dict.fromkeys(named):
+            self.event_codes[ev] = self._add_row(lambda st, oc: self._cell(ev, st, oc))
+        self._wild_codes: List[Tuple[str, int]] = [
+            (prefix, self._add_row(lambda st, oc: (r.to_state, r.effect, f"transition:{r.from_state}+{EVENT_SLOT}->{_label(r.to_state, r.effect)}")))
+            for prefix, r in self._wild
+        ]
+        self.undefined_code = self._add_row(lambda st, oc: ("UNVALIDATED", "NEUTRAL", f"unknown_event:{EVENT_SLOT}"))
+
+    def _intern(self, reason: str) -> int:
+        code = self._reason_code.get(reason)
+        if code is None:
+            code = self._reason_code[reason] = len(self.reasons)
+            self.reasons.append(reason)
+            self.templated.append(EVENT_SLOT in reason)
+        return code
+
+    def _add_row(self, cell) -> int:
+        code = len(self.cells) // (len(self.states) * N_OUTCOMES)
+        for st in self.states:
+            for oc in range(N_OUTCOMES):
+                to, eff, reason = cell(st, oc)
+                self.cells.append((self._state_code[to], self._effect_code[eff], self._intern(reason)))
+        return code
+
+    def _cell(self, e_type: str, state: str, outcome_code: int) -> Tuple[str, str, str]:
+        r = self._any.get(e_type)
+        if r is not None:
+            return r.to_state, r.effect, f"transition:any+{e_type}->{_label(r.to_state, r.effect)}"
+
+        # Wildcard rows (RESTART_*) are entry rules: applied from every state,
+        # so a restart always recovers play after UNVALIDATED / ERROR.
+        for prefix, r in self._wild:
+            if e_type.startswith(prefix):
+                return r.to_state, r.effect, f"transition:{r.from_state}+{e_type}->{_label(r.to_state, r.effect)}"
+
+        by_state = self._by_event.get(e_type)
+        if by_state is None:
+            return "UNVALIDATED", "NEUTRAL", f"unknown_event:{e_type}"
+
+        success_only = any(r.success_only for r in by_state.values())
+        if success_only:
+            if outcome_code != OUTCOME_SUCCESS:
+                # Canon v1.0.0: fail or missing outcome NOT defined -> UNVALIDATED
+                return "UNVALIDATED", "NEUTRAL", f"unvalidated:{state}+{e_type}_missing_or_fail"
+            ev_label = f"{e_type}_success"
+        else:
+            ev_label = e_type
+
+        r = by_state.get(state)
+        if r is None:
+            return "ERROR", "NEUTRAL", f"undefined_transition:{state}+{ev_label}"
+        return r.to_state, r.effect, f"transition:{state}+{ev_label}->{_label(r.to_state, r.effect)}"
+
+    def event_code(self, e_type: str) -> int:
+        """Row code for a normalized event type (canon row, shared wildcard row or UNDEFINED)."""
+        code = self.event_codes.get(e_type)
+        if code is not None:
+            return code
+        for prefix, code in self._wild_codes:
+            if e_type.startswith(prefix):
+                return code
+        return self.undefined_code
+
+    def reason(self, reason_code: int, e_type: str) -> str:
+        r = self.reasons[reason_code]
+        return r.replace(EVENT_SLOT, e_type) if self.templated[reason_code] else r
+
+    def lookup(self, state_code: int, event_code: int, outcome_code: int) -> Tuple[int, int, int]:
+        return self.cells[(event_code * len(self.states) + state_code) * N_OUTCOMES + outcome_code]
+
+
+def compile_canon(states: Sequence[str], effects: Sequence[str], path: Path = DEFAULT_CANON_PATH) -> TransitionTable:
+    events, rules = parse_canon(states, effects, path)
+    return TransitionTable(rules, events, states, effects)
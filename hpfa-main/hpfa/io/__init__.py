@@ -0,0 +1 @@
+# hpfa.io package
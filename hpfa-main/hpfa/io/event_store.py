@@ -0,0 +1,277 @@
+"""
+HPFA Event Store — typed columnar copy of the canonical JSONL streams
+
+Ingest writes canonical_<stream>.npz next to canonical_<stream>.jsonl:
+an uncompressed NPZ (plain np.load works), one member per column.
+
+Column kinds (CANONICAL_COLUMNS):
+  f8   float64, null -> NaN                      t_start, t_end, x, y
+  i8   int64, null -> INT_NULL                   id, half, team_id, player_id
+  str  interned: <col> int32 codes (null -> -1)  match_id, stream, action, code,
+       + <col>__vocab unicode array              team_raw, metric
+  __meta__: JSON {"version", "n_rows", "source_size", "source_mtime_ns"}
+
+Reader:
+  cols = load_events(match_dir, columns=["t_start", "team_raw"])
+  - only the requested members are touched; each is memory-mapped straight
+    out of the NPZ (stored members are contiguous .npy bytes in the zip)
+  - str columns come back as object arrays of the original values (None
+    for null); each distinct string is one shared Python object
+  - interned=True (or load_interned()) returns them as Interned(codes, vocab)
+    instead, for per-distinct-value work
+  - missing NPZ, or one not built from the current JSONL (source_size and
+    source_mtime_ns, like hpfa.io.match; a same-size in-place edit still
+    changes mtime), falls back to parsing the JSONL into the same columns
+
+Fail-closed:
+  - unknown column              => EVENT_STORE_FAIL_CLOSED:unknown_column:<name>
+  - neither NPZ nor JSONL found => EVENT_STORE_FAIL_CLOSED:missing_stream:<jsonl name>
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zipfile
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+STORE_VERSION = 1
+INT_NULL = np.iinfo(np.int64).min
+
+CANONICAL_COLUMNS: List[Tuple[str, str]] = [
+    ("match_id", "str"),
+    ("stream", "str"),
+    ("id", "i8"),
+    ("t_start", "f8"),
+    ("t_end", "f8"),
+    ("half", "i8"),
+    ("action", "str"),
+    ("code", "str"),
+    ("x", "f8"),
+    ("y", "f8"),
+    ("team_raw", "str"),
+    ("team_id", "i8"),
+    ("player_id", "i8"),
+    ("metric", "str"),
+]
+_KIND = dict(CANONICAL_COLUMNS)
+
+
+class Interned(NamedTuple):
+    codes: np.ndarray  # int32 into vocab, -1 = null
+    vocab: List[str]
+
+
+_VOCAB = "__vocab"
+_META = "__meta__"
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")  # zip local file header (30 bytes)
+
+
+def stream_paths(match_dir: str, stream: str = "outfield") -> Tuple[str, str]:
+    """(npz, jsonl) paths of one canonical stream."""
+    base = os.path.join(match_dir, f"canonical_{stream}")
+    return base + ".npz", base + ".jsonl"
+
+
+# -----------------------------
+# Writer
+# -----------------------------
+class ColumnBuilder:
+    """Accumulates canonical records column-wise; tap() passes them through to another writer."""
+
+    def __init__(self) -> None:
+        self.n_rows = 0
+        self._num: Dict[str, array] = {k: array("d" if kind == "f8" else "q") for k, kind in CANONICAL_COLUMNS if kind != "str"}
+        self._codes: Dict[str, array] = {k: array("i") for k, kind in CANONICAL_COLUMNS if kind == "str"}
+        self._vocab: Dict[str, Dict[str, int]] = {k: {} for k in self._codes}
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        get = rec.get
+        for k, col in self._num.items():
+            v = get(k)
+            if _KIND[k] == "f8":
+                col.append(float("nan") if v is None else float(v))
+            else:
+                col.append(INT_NULL if v is None else int(v))
+        for k, col in self._codes.items():
+            v = get(k)
+            if v is None:
+                col.append(-1)
+            else:
+                vocab = self._vocab[k]
+                code = vocab.get(v)
+                if code is None:
+                    code = vocab[v] = len(vocab)
+                col.append(code)
+        self.n_rows += 1
+
+    def tap(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for rec in records:
+            self.add(rec)
+            yield rec
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        for k, kind in CANONICAL_COLUMNS:
+            if kind == "str":
+                out[k] = np.frombuffer(self._codes[k], dtype=np.int32)
+                out[k + _VOCAB] = np.array(list(self._vocab[k]), dtype=str)
+            else:
+                out[k] = np.frombuffer(self._num[k], dtype=np.float64 if kind == "f8" else np.int64)
+        return out
+
+    def save(self, path: str, source_size: Optional[int] = None, source_mtime_ns: Optional[int] = None) -> None:
+        """Write the NPZ via a temp file + rename (never truncates a hardlinked old copy)."""
+        arrays = self.arrays()
+        meta = {"version": STORE_VERSION, "n_rows": self.n_rows, "source_size": source_size, "source_mtime_ns": source_mtime_ns}
+        arrays[_META] = np.array(json.dumps(meta))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def write_store(
+    path: str, records: Iterable[Dict[str, Any]], source_size: Optional[int] = None, source_mtime_ns: Optional[int] = None
+) -> int:
+    b = ColumnBuilder()
+    for rec in records:
+        b.add(rec)
+    b.save(path, source_size, source_mtime_ns)
+    return b.n_rows
+
+
+# -----------------------------
+# Reader
+# -----------------------------
+def _member_arrays(path: str, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Named NPZ members; stored ones memory-mapped, compressed ones read via np.load."""
+    out: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for name in names:
+            info = zf.getinfo(name + ".npy")
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as m:
+                    out[name] = np.lib.format.read_array(m, allow_pickle=False)
+                continue
+            f.seek(info.header_offset)
+            hdr = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            f.seek(info.header_offset + _LOCAL_HEADER.size + hdr[9] + hdr[10])
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"EVENT_STORE_FAIL_CLOSED:object_member:{name}")
+            if not shape or 0 in shape:
+                with zf.open(info) as m:
+                    out[name] = np.lib.format.read_array(m, allow_pickle=False)
+                continue
+            out[name] = np.memmap(f, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran else "C")
+    return out
+
+
+def _store_meta(path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(path) as zf, zf.open(_META + ".npy") as m:
+        return json.loads(str(np.lib.format.read_array(m, allow_pickle=False)))
+
+
+def _check_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    if columns is None:
+        return [k for k, _ in CANONICAL_COLUMNS]
+    cols = list(columns)
+    for c in cols:
+        if c not in _KIND:
+            raise ValueError(f"EVENT_STORE_FAIL_CLOSED:unknown_column:{c}")
+    return cols
+
+
+def _fresh_npz(npz: str, jsonl: str) -> Optional[str]:
+    if not os.path.exists(npz):
+        return None
+    try:
+        meta = _store_meta(npz)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+    if meta.get("version") != STORE_VERSION:
+        return None
+    if os.path.exists(jsonl):
+        st = os.stat(jsonl)
+        if meta.get("source_size") != st.st_size or meta.get("source_mtime_ns") != st.st_mtime_ns:
+            return None
+    return npz
+
+
+def _jsonl_arrays(jsonl: str) -> Dict[str, np.ndarray]:
+    b = ColumnBuilder()
+    with open(jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict):
+                b.add(rec)
+    return b.arrays()
+
+
+def _raw_columns(jsonl: str, cols: List[str]) -> Dict[str, np.ndarray]:
+    names: List[str] = []
+    for c in cols:
+        names.append(c)
+        if _KIND[c] == "str":
+            names.append(c + _VOCAB)
+    npz = _fresh_npz(os.path.splitext(jsonl)[0] + ".npz", jsonl)
+    if npz is not None:
+        return _member_arrays(npz, names)
+    if not os.path.exists(jsonl):
+        raise ValueError(f"EVENT_STORE_FAIL_CLOSED:missing_stream:{os.path.basename(jsonl)}")
+    arrays = _jsonl_arrays(jsonl)
+    return {k: arrays[k] for k in names}
+
+
+def _decode(raw: Dict[str, np.ndarray], cols: List[str], interned: bool) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for c in cols:
+        if _KIND[c] == "str" and interned:
+            out[c] = Interned(raw[c], raw[c + _VOCAB].tolist())
+        elif _KIND[c] == "str":
+            values = np.empty(len(raw[c + _VOCAB]) + 1, dtype=object)
+            values[:-1] = raw[c + _VOCAB].tolist()  # last slot (code -1) stays None
+            out[c] = values[raw[c]]
+        else:
+            out[c] = raw[c]
+    return out
+
+
+def load_interned(match_dir: str, column: str, stream: str = "outfield") -> Interned:
+    """(codes, vocab) of one str column; code -1 is null."""
+    _check_columns([column])
+    if _KIND[column] != "str":
+        raise ValueError(f"EVENT_STORE_FAIL_CLOSED:not_str_column:{column}")
+    return load_events(match_dir, [column], stream, interned=True)[column]
+
+
+def load_events(
+    match_dir: str, columns: Optional[Sequence[str]] = None, stream: str = "outfield", interned: bool = False
+) -> Dict[str, Any]:
+    """Requested columns of canonical_<stream> as arrays (read-only; numeric ones memory-mapped)."""
+    return load_events_path(stream_paths(match_dir, stream)[1], columns, interned)
+
+
+def load_events_path(jsonl: str, columns: Optional[Sequence[str]] = None, interned: bool = False) -> Dict[str, Any]:
+    """load_events() for a canonical JSONL path (its .npz sibling is used when fresh)."""
+    cols = _check_columns(columns)
+    return _decode(_raw_columns(jsonl, cols), cols, interned)
@@ -0,0 +1,186 @@
+"""
+HPFA Match Loader — one parsed, normalized copy of a match for all report tools
+
+load_match(source, stream="outfield") -> MatchData
+  source: match out dir (canonical_<stream>.jsonl inside) or a canonical JSONL path.
+  Columns come from hpfa.io.event_store (NPZ when fresh, else the JSONL).
+
+Normalized columns (numpy, one row per canonical record, file order):
+  t_start        float64, NaN if missing
+  half           int64, 0 if missing
+  action, code   str, stripped, "" if missing
+  team_raw       str, stripped, "" if missing
+  team           team_raw or "UNKNOWN_TEAM"
+  player         player name from code ("9. Ali Sowe (1) - Pas" -> "Ali Sowe (1)"), None if none
+  x, y           float64, NaN if missing; has_xy = both present
+  x105, y68      105x68 metres (scale detected once per match: unit / percent / metres),
+                 x mirrored (105 - x) in the 2nd half; NaN without xy
+
+String columns are normalized per distinct value (interned vocab), not per record.
+md.rows("team", "player", "x105") gives per-event tuples for row-wise loops.
+
+Memoized per (JSONL path) and the (mtime_ns, size) of the JSONL and its NPZ:
+every tool in one process (hpfa report all) shares one MatchData; a re-ingest
+invalidates it. MatchData arrays are read-only, treat them as shared.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hpfa.io.event_store import INT_NULL, Interned, load_events_path, stream_paths
+
+PITCH_L = 105.0
+PITCH_W = 68.0
+UNKNOWN_TEAM = "UNKNOWN_TEAM"
+
+
+def s(x: Any) -> str:
+    return (x or "").strip()
+
+
+def player_of_code(code: Any) -> Optional[str]:
+    code = s(code)
+    if not code:
+        return None
+    left = code.split(" - ")[0].strip()
+    if ". " in left:
+        left = left.split(". ", 1)[1].strip()
+    return left or None
+
+
+def load_jsonl(path: str) -> List[Dict[str, Any]]:
+    """Tolerant JSONL reader (blank / malformed lines skipped) for non-canonical files such as stats__*.jsonl."""
+    out: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                pass
+    return out
+
+
+def pitch_scale(x: np.ndarray, y: np.ndarray) -> str:
+    """Source unit for the whole match: "unit" (0..1), "percent" (0..100) or "m" (105x68 metres)."""
+    ok = ~(np.isnan(x) | np.isnan(y))
+    if not ok.any() or x[ok].min() < 0 or y[ok].min() < 0:
+        return "m"
+    xmax, ymax = x[ok].max(), y[ok].max()
+    if xmax <= 1.5 and ymax <= 1.5:
+        return "unit"
+    # y past the 68 m touchline (with slack) but inside 100: percent of pitch
+    if xmax <= 100.5 and PITCH_W * 1.05 < ymax <= 100.5:
+        return "percent"
+    return "m"
+
+
+def to_105_68(x: np.ndarray, y: np.ndarray, half: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    scale = pitch_scale(x, y)
+    if scale == "unit":
+        xm, ym = x * PITCH_L, y * PITCH_W
+    elif scale == "percent":
+        xm, ym = (x / 100.0) * PITCH_L, (y / 100.0) * PITCH_W
+    else:
+        xm, ym = x.copy(), y.copy()
+    second = half == 2
+    xm[second] = PITCH_L - xm[second]
+    return xm, ym
+
+
+def _str_column(col: Interned, fn: Any) -> np.ndarray:
+    # fn runs once per distinct value; the last slot is code -1 (null)
+    values = np.empty(len(col.vocab) + 1, dtype=object)
+    values[:-1] = [fn(v) for v in col.vocab]
+    values[-1] = fn(None)
+    return values[col.codes]
+
+
+@dataclass(frozen=True, eq=False)  # identity eq/hash: usable as a weak dict key (array fields are unhashable)
+class MatchData:
+    source: str
+    n: int
+    t_start: np.ndarray
+    half: np.ndarray
+    action: np.ndarray
+    code: np.ndarray
+    team_raw: np.ndarray
+    team: np.ndarray
+    player: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    has_xy: np.ndarray
+    x105: np.ndarray
+    y68: np.ndarray
+
+    def rows(self, *columns: str) -> List[Tuple[Any, ...]]:
+        """Per-event tuples of the named columns (Python scalars), for row-wise report code."""
+        return list(zip(*(getattr(self, c).tolist() for c in columns)))
+
+
+def _build(jsonl: str) -> MatchData:
+    raw = load_events_path(jsonl, ["t_start", "half", "action", "code", "team_raw", "x", "y"], interned=True)
+    half = np.asarray(raw["half"], dtype=np.int64)
+    half = np.where(half == INT_NULL, 0, half)
+    x = np.array(raw["x"], dtype=np.float64)
+    y = np.array(raw["y"], dtype=np.float64)
+    x105, y68 = to_105_68(x, y, half)
+    cols = dict(
+        t_start=np.array(raw["t_start"], dtype=np.float64),
+        half=half,
+        action=_str_column(raw["action"], s),
+        code=_str_column(raw["code"], s),
+        team_raw=_str_column(raw["team_raw"], s),
+        team=_str_column(raw["team_raw"], lambda v: s(v) or UNKNOWN_TEAM),
+        player=_str_column(raw["code"], player_of_code),
+        x=x,
+        y=y,
+        has_xy=~(np.isnan(x) | np.isnan(y)),
+        x105=x105,
+        y68=y68,
+    )
+    for a in cols.values():
+        a.flags.writeable = False
+    return MatchData(source=jsonl, n=len(half), **cols)
+
+
+_MATCHES: Dict[str, Tuple[Tuple[Any, ...], MatchData]] = {}
+
+
+def _stamp(jsonl: str) -> Tuple[Any, ...]:
+    out: List[Any] = []
+    for p in (jsonl, os.path.splitext(jsonl)[0] + ".npz"):
+        try:
+            st = os.stat(p)
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+def canonical_path(source: str, stream: str = "outfield") -> str:
+    return os.path.abspath(stream_paths(source, stream)[1] if os.path.isdir(source) else source)
+
+
+def load_match(source: str, stream: str = "outfield") -> MatchData:
+    """Memoized MatchData for a match dir (canonical_<stream>.jsonl) or a canonical JSONL path."""
+    jsonl = canonical_path(source, stream)
+    stamp = _stamp(jsonl)
+    hit = _MATCHES.get(jsonl)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    m = _build(jsonl)
+    _MATCHES[jsonl] = (stamp, m)
+    return m
+
+
+def clear_cache() -> None:
+    _MATCHES.clear()
@@ -0,0 +1,355 @@
+"""
+HPFA Render Scheduler — figure specs built in the main process, rasterized in a pool
+
+A report tool describes every PNG as a FigureSpec:
+  name       file name inside the report dir (also the index.html entry)
+  draw       module-level function draw(plt, **params) drawing on the current figure
+  params     plain data (lists, tuples, dicts, numbers, strings, None, numpy arrays)
+  dpi, figsize, tight (plt.tight_layout() before saving), bbox_inches
+
+render_figures(specs, outdir, opts=RenderOptions()) -> [name, ...] in spec order
+  opts.jobs=1   in-process, one figure after another (the tools' old behaviour)
+  opts.jobs>1   Agg rasterization spread over a process pool of that size
+  opts.jobs=0   one worker per CPU
+render_reports([(specs, outdir), ...], opts) does the same for several reports
+with one pool (hpfa_report all); each report dir still gets its own manifest.
+The returned order is the spec order whatever the completion order, so
+index.html is written exactly as before. Each figure starts from a fresh
+plt.figure(), so a PNG does not depend on which worker drew it or on what it
+drew before (parallel output is byte-identical to serial).
+
+draw must be importable by name (module level in the tool or in hpfa) so the
+spec can be pickled to a worker; closures and lambdas only work with jobs=1.
+Two specs with the same name: only the last one is drawn (last write won before
+too), the name is still returned for both.
+
+Render cache (content-addressed, on by default):
+  key = sha256(RENDER_VERSION, matplotlib version, rcParams in effect,
+        source versions of the draw module and every repo module it reaches
+        (hpfa.* and its sibling tool modules, transitively, + this module),
+        draw name, params, dpi, figsize, tight, bbox_inches)
+  <cache dir>/<key>.png; a hit is hardlinked (or copied) into the report dir and
+  not rasterized. Default cache dir: .render_cache next to the report dir
+  (out/<match>/.render_cache), shared by all report_* dirs of the match.
+  Any edit to a tool file, or to an hpfa module it imports, invalidates that
+  tool's figures; so does a style / rcParams change.
+  Not in the key: third-party code other than matplotlib (numpy, freetype,
+  installed fonts). Clear the cache dir (or use --no-render-cache) after
+  upgrading those.
+  Output files are unlinked before they are written, so rewriting a report
+  never truncates a cached PNG through a hardlink.
+
+render_manifest.json (written into the report dir on every run):
+  {"render_version", "cache": {"dir", "hits", "misses"} or null,
+   "figures": [{"name", "key", "cache": "hit" | "miss" | null}, ...]}
+
+Shared report flags: --jobs N, --render-cache DIR, --no-render-cache;
+pop_render_args(argv) for the sys.argv tools, add_render_arguments(parser) +
+render_options(args) for the argparse ones.
+
+Fail-closed:
+  - jobs not an integer >= 0          => RENDER_FAIL_CLOSED:bad_jobs:<value>
+  - flag without its value            => RENDER_FAIL_CLOSED:missing_value:<flag>
+  - param the key cannot encode       => RENDER_FAIL_CLOSED:unhashable_param:<type>
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+RENDER_VERSION = 2
+MANIFEST = "render_manifest.json"
+JOBS_HELP = "render figures in N processes (0 = one per CPU, default 1)"
+CACHE_HELP = "render cache dir (default: .render_cache next to the report dir)"
+NO_CACHE_HELP = "rasterize every figure, do not read or write the render cache"
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    name: str
+    draw: Callable[..., Any]
+    params: Mapping[str, Any] = field(default_factory=dict)
+    dpi: int = 100
+    figsize: Optional[Tuple[float, float]] = None
+    tight: bool = True
+    bbox_inches: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    jobs: int = 1
+    cache_dir: Optional[str] = None
+    cache: bool = True
+
+
+def _pyplot() -> Any:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _rasterize(spec: FigureSpec, outdir: str) -> str:
+    plt = _pyplot()
+    path = os.path.join(outdir, spec.name)
+    if os.path.lexists(path):
+        os.remove(path)  # may be a hardlink into the render cache
+    fig = plt.figure(figsize=spec.figsize) if spec.figsize else plt.figure()
+    try:
+        spec.draw(plt, **spec.params)
+        if spec.tight:
+            plt.tight_layout()
+        kw: Dict[str, Any] = {"dpi": spec.dpi}
+        if spec.bbox_inches:
+            kw["bbox_inches"] = spec.bbox_inches
+        plt.savefig(path, **kw)
+    finally:
+        plt.close(fig)
+    return spec.name
+
+
+# -----------------------------
+# Spec keys + render cache
+# -----------------------------
+def _feed(h: Any, v: Any) -> None:
+    # type-tagged, order-preserving encoding: equal keys only for equal drawing inputs
+    if v is None or isinstance(v, (bool, np.bool_)):
+        h.update(f"{v!r}\x00".encode())
+    elif isinstance(v, str):
+        h.update(f"str:{len(v)}:{v}\x00".encode("utf-8"))
+    elif isinstance(v, (int, np.integer)):
+        h.update(f"int:{int(v)}\x00".encode())
+    elif isinstance(v, (float, np.floating)):
+        h.update(f"float:{float(v).hex()}\x00".encode())
+    elif isinstance(v, np.ndarray) and v.dtype.kind in "biuf":
+        a = np.ascontiguousarray(v)
+        h.update(f"ndarray:{a.dtype.str}:{a.shape}\x00".encode())
+        h.update(a.tobytes())
+    elif isinstance(v, (list, tuple, range, np.ndarray)):
+        h.update(f"{type(v).__name__}:{len(v)}\x00".encode())
+        for x in v:
+            _feed(h, x)
+    elif isinstance(v, Mapping):
+        h.update(f"map:{len(v)}\x00".encode())
+        for k in sorted(v, key=str):
+            _feed(h, k)
+            _feed(h, v[k])
+    else:
+        raise ValueError(f"RENDER_FAIL_CLOSED:unhashable_param:{type(v).__name__}")
+
+
+_SOURCE_VERSIONS: Dict[str, str] = {}
+
+
+def _source_version(path: str) -> str:
+    if path not in _SOURCE_VERSIONS:
+        h = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(path.encode("utf-8"))
+        _SOURCE_VERSIONS[path] = h.hexdigest()
+    return _SOURCE_VERSIONS[path]
+
+
+_DEPENDENCIES: Dict[str, List[str]] = {}
+
+
+def _repo_modules(name: str) -> List[str]:
+    # name + the repo modules (hpfa.*, modules next to it) its globals reach, transitively
+    if name not in _DEPENDENCIES:
+        root = os.path.dirname(getattr(sys.modules.get(name), "__file__", None) or "")
+        seen: List[str] = []
+        todo = [name, __name__]
+        while todo:
+            mod = sys.modules.get(todo.pop())
+            if mod is None or mod.__name__ in seen:
+                continue
+            seen.append(mod.__name__)
+            for v in list(vars(mod).values()):
+                dep = v.__name__ if isinstance(v, type(sys)) else getattr(v, "__module__", None)
+                dep_mod = sys.modules.get(dep) if isinstance(dep, str) else None
+                path = getattr(dep_mod, "__file__", None) or ""
+                if dep_mod is not None and (dep.split(".")[0] == "hpfa" or (root and os.path.dirname(path) == root)):
+                    todo.append(dep)
+        _DEPENDENCIES[name] = sorted(seen)
+    return _DEPENDENCIES[name]
+
+
+def _tool_version(draw: Callable[..., Any]) -> str:
+    """Source version of the draw module and the repo modules it depends on."""
+    # sources only, not module names: a tool run as __main__ and imported by hpfa_report share keys
+    h = hashlib.sha256()
+    for v in sorted(_source_version(getattr(sys.modules[name], "__file__", None) or name) for name in _repo_modules(draw.__module__)):
+        h.update(v.encode("ascii"))
+    return h.hexdigest()
+
+
+# GUI / session settings that do not change an Agg PNG (backend is also unresolved before the first draw)
+_RC_IGNORED = ("backend", "backend_fallback", "interactive", "toolbar", "webagg.", "tk.", "macosx.")
+
+
+def _rc_digest() -> str:
+    import matplotlib
+
+    h = hashlib.sha256()
+    for k, v in sorted(dict.items(matplotlib.rcParams)):
+        if not k.startswith(_RC_IGNORED):
+            h.update(f"{k}={v!r}\x00".encode("utf-8"))
+    return h.hexdigest()
+
+
+def spec_key(spec: FigureSpec) -> str:
+    import matplotlib
+
+    h = hashlib.sha256()
+    _feed(h, [RENDER_VERSION, matplotlib.__version__, _rc_digest(), _tool_version(spec.draw), spec.draw.__qualname__,
+              spec.dpi, spec.figsize, spec.tight, spec.bbox_inches])
+    _feed(h, dict(spec.params))
+    return h.hexdigest()
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class RenderCache:
+    # <root>/<key>.png; entries staged under a temp name and renamed in, so readers never see a partial PNG
+    def __init__(self, root: str):
+        self.root = root
+        self.hits: List[str] = []
+        self.misses: List[str] = []
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, key: str, dst: str) -> bool:
+        src = os.path.join(self.root, f"{key}.png")
+        try:
+            link_or_copy(src, dst)
+        except OSError:
+            self.misses.append(os.path.basename(dst))
+            return False
+        self.hits.append(os.path.basename(dst))
+        return True
+
+    def put(self, key: str, src: str) -> None:
+        tmp = os.path.join(self.root, f".{key}.{os.getpid()}.tmp")
+        try:
+            link_or_copy(src, tmp)
+            os.replace(tmp, os.path.join(self.root, f"{key}.png"))
+        except OSError:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+
+
+# -----------------------------
+# Shared report flags
+# -----------------------------
+def resolve_jobs(jobs: Any) -> int:
+    try:
+        n = int(jobs)
+    except (TypeError, ValueError):
+        raise ValueError(f"RENDER_FAIL_CLOSED:bad_jobs:{jobs}")
+    if n < 0 or str(jobs).strip() != str(n):
+        raise ValueError(f"RENDER_FAIL_CLOSED:bad_jobs:{jobs}")
+    return n or (os.cpu_count() or 1)
+
+
+def pop_render_args(argv: Sequence[str]) -> Tuple[List[str], RenderOptions]:
+    """Split the shared render flags out of argv: (remaining args, RenderOptions)."""
+    rest: List[str] = []
+    vals: Dict[str, Any] = {"--jobs": 1, "--render-cache": None}
+    cache = True
+    it = iter(argv)
+    for a in it:
+        flag, eq, v = a.partition("=")
+        if flag in vals:
+            if not eq:
+                v = next(it, None)
+                if v is None:
+                    raise ValueError(f"RENDER_FAIL_CLOSED:missing_value:{flag}")
+            vals[flag] = v
+        elif a == "--no-render-cache":
+            cache = False
+        else:
+            rest.append(a)
+    return rest, RenderOptions(jobs=resolve_jobs(vals["--jobs"]), cache_dir=vals["--render-cache"], cache=cache)
+
+
+def add_render_arguments(parser: Any) -> None:
+    parser.add_argument("--jobs", type=resolve_jobs, default=1, metavar="N", help=JOBS_HELP)
+    parser.add_argument("--render-cache", default=None, metavar="DIR", help=CACHE_HELP)
+    parser.add_argument("--no-render-cache", action="store_true", help=NO_CACHE_HELP)
+
+
+def render_options(args: Any) -> RenderOptions:
+    return RenderOptions(jobs=args.jobs, cache_dir=args.render_cache, cache=not args.no_render_cache)
+
+
+def default_cache_dir(outdir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(outdir)), ".render_cache")
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+def render_figures(specs: Sequence[FigureSpec], outdir: str, opts: RenderOptions = RenderOptions()) -> List[str]:
+    """Rasterize specs into outdir (cache hits are linked in); returns their names in spec order."""
+    return render_reports([(specs, outdir)], opts)[0]
+
+
+def render_reports(batches: Sequence[Tuple[Sequence[FigureSpec], str]], opts: RenderOptions = RenderOptions()) -> List[List[str]]:
+    """render_figures for several (specs, outdir) reports at once: one pool for all cache misses."""
+    plans = []
+    misses: List[Tuple[FigureSpec, str, str]] = []
+    for specs, outdir in batches:
+        last = {s.name: i for i, s in enumerate(specs)}
+        todo = [(s, spec_key(s)) for i, s in enumerate(specs) if last[s.name] == i]
+        cache = RenderCache(opts.cache_dir or default_cache_dir(outdir)) if opts.cache else None
+        state: Dict[str, Optional[str]] = {}
+        for s, key in todo:
+            if cache is not None and cache.get(key, os.path.join(outdir, s.name)):
+                state[s.name] = "hit"
+            else:
+                state[s.name] = "miss" if cache is not None else None
+                misses.append((s, key, outdir))
+        plans.append((outdir, todo, cache, state))
+
+    workers = min(resolve_jobs(opts.jobs), len(misses))
+    if workers <= 1:
+        for s, _, outdir in misses:
+            _rasterize(s, outdir)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            # map() keeps spec order; chunksize 1 balances heavy and light figures
+            list(ex.map(_rasterize, [s for s, _, _ in misses], [d for _, _, d in misses]))
+
+    for outdir, todo, cache, state in plans:
+        if cache is not None:
+            for s, key in todo:
+                if state[s.name] == "miss":
+                    cache.put(key, os.path.join(outdir, s.name))
+        manifest = {
+            "render_version": RENDER_VERSION,
+            "cache": {"dir": cache.root, "hits": len(cache.hits), "misses": len(cache.misses)} if cache else None,
+            "figures": [{"name": s.name, "key": key, "cache": state[s.name]} for s, key in todo],
+        }
+        with open(os.path.join(outdir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return [[s.name for s in specs] for specs, _ in batches]
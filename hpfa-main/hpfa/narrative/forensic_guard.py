@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent.parent / "narrative_rules.yaml"
+POOL_MIN_TEXTS = 4096  # validate_narratives: smaller batches stay in-process
 
 
 class GuardParseError(Exception):
@@ -63,8 +67,11 @@ def _parse_scalar(v: str) -> str:
 def load_rules_yaml(path: Path = DEFAULT_RULES_PATH) -> Dict[str, Any]:
     if not path.exists():
         raise GuardParseError(f"rules file not found: {path}")
+    return _parse_rules_text(path.read_text(encoding="utf-8"))
 
-    lines = path.read_text(encoding="utf-8").splitlines()
+
+def _parse_rules_text(text: str) -> Dict[str, Any]:
+    lines = text.splitlines()
 
     def clean(line: str) -> str:
         if "#" in line:
@@ -115,18 +122,27 @@ def _mask_quotes_per_line(line: str) -> Tuple[str, Optional[str]]:
     if '"' not in line:
         return line, None
 
-    masked: List[str] = []
-    in_q = False
-    for ch in line:
-        if ch == '"':
-            in_q = not in_q
-            masked.append('"')
-        else:
-            masked.append(" " if in_q else ch)
-
-    if in_q:
+    # segments between quote pairs sit at odd indices; an even count of
+    # segments means an odd number of quotes
+    parts = line.split('"')
+    if len(parts) % 2 == 0:
         return line, "UNMATCHED_QUOTES"
-    return "".join(masked), None
+    parts[1::2] = [" " * len(p) for p in parts[1::2]]
+    return '"'.join(parts), None
+
+
+def _scan_text(text: str) -> Tuple[str, Optional[str]]:
+    """Text the deny / rewrite rules see: '>' lines blanked, quoted spans masked."""
+    masked_lines: List[str] = []
+    for ln in text.splitlines() or [text]:
+        if ln.lstrip().startswith(">"):
+            masked_lines.append("")
+            continue
+        masked, err = _mask_quotes_per_line(ln)
+        if err:
+            return "", err
+        masked_lines.append(masked)
+    return "\n".join(masked_lines), None
 
 
 def _compile_regex_fail_closed(pat: str) -> re.Pattern:
@@ -136,81 +152,227 @@ def _compile_regex_fail_closed(pat: str) -> re.Pattern:
         raise GuardParseError(f"bad regex: {e}")
 
 
-def validate_narrative(text: str, state: str | None = None) -> dict:
-    if not isinstance(text, str):
-        return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": "text_not_str"}]}
-
+def _compile_or_error(pat: Any) -> Union[re.Pattern, GuardParseError]:
+    # regex errors are kept and reported only where validate_narrative reaches them
     try:
-        cfg = load_rules_yaml()
-        rules = cfg["rules"]
-    except Exception as e:
-        return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": f"rules_load:{e}"}]}
-
-    hits: List[Dict[str, str]] = []
-    st = state.strip().upper() if isinstance(state, str) and state.strip() else None
-
-    if st == "UNVALIDATED":
-        allow_re = rules.get("unvalidated_gate", {}).get("allow_log_regex", "")
-        try:
-            allow_pat = _compile_regex_fail_closed(allow_re)
-        except Exception as e:
-            return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": f"allow_log_regex:{e}"}]}
-        if allow_pat.match(text.strip()):
-            return {"decision": "PASS", "canonical": None, "hits": [{"rule": "UNVALIDATED_GATE", "detail": "allow_log_line"}]}
-        return {"decision": "DENY", "canonical": None, "hits": [{"rule": "UNVALIDATED_GATE", "detail": "state_unvalidated_deny_all"}]}
-
-    lines = text.splitlines() or [text]
-    masked_lines: List[str] = []
-    for ln in lines:
-        if ln.lstrip().startswith(">"):
-            masked_lines.append("")
-            continue
-        masked, err = _mask_quotes_per_line(ln)
-        if err:
-            return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": err}]}
-        masked_lines.append(masked)
+        return _compile_regex_fail_closed(pat)
+    except GuardParseError as e:
+        return e
+
+
+class CompiledRuleSet:
+    """
+    narrative_rules.yaml parsed and compiled once.
+
+    Deny terms are folded into one word-bounded alternation; it matches iff
+    some per-term pattern matches, so the per-term patterns only run to list
+    terms=[..] on a DENY. Allow / rewrite regexes are compiled once.
+    """
+
+    def __init__(self, rules: Dict[str, Any], sha256: str = "", stamp: Tuple[int, int] = (0, 0)):
+        self.rules = rules
+        self.sha256 = sha256
+        self.stamp = stamp  # (st_mtime_ns, st_size) of the file it was read from
+
+        terms = rules.get("deny_uncertainty", {}).get("terms", [])
+        self.deny_terms_ok = isinstance(terms, list)
+        self.deny_terms: Tuple[str, ...] = ()
+        if self.deny_terms_ok:
+            self.deny_terms = tuple(t.strip() for t in terms if isinstance(t, str) and t.strip() != "")
+        self._term_pats = [re.compile(rf"(?i)\b{re.escape(t)}\b") for t in self.deny_terms]
+        self.deny_any: Optional[re.Pattern] = None
+        if self.deny_terms:
+            # the first-character lookahead lets most positions fail before the alternation is tried
+            first = "".join(re.escape(c) for c in dict.fromkeys(t[0] for t in self.deny_terms))
+            alt = "|".join(re.escape(t) for t in self.deny_terms)
+            self.deny_any = re.compile(rf"(?i)\b(?=[{first}])(?:{alt})\b")
+
+        self.allow = _compile_or_error(rules.get("unvalidated_gate", {}).get("allow_log_regex", ""))
+        contested = rules.get("rewrite_contested_possession_claim", {})
+        self.contested = _compile_or_error(contested.get("regex", ""))
+        self.contested_canonical = contested.get("canonical", "")
+        dead_ball = rules.get("rewrite_dead_ball_in_play_claim", {})
+        self.dead_ball = _compile_or_error(dead_ball.get("regex", ""))
+        self.dead_ball_canonical = dead_ball.get("canonical", "")
+
+    def deny_hits(self, scan_text: str) -> List[str]:
+        """Deny terms found in scan_text, in rule order (duplicates kept)."""
+        if self.deny_any is None or not self.deny_any.search(scan_text):
+            return []
+        return [t for t, pat in zip(self.deny_terms, self._term_pats) if pat.search(scan_text)]
+
+    def denied(self, scan_texts: List[str]) -> List[int]:
+        """
+        Indices of scan_texts containing a deny term: one alternation pass over
+        the texts joined by newlines (terms never span a newline, and a newline
+        is a word boundary like the string ends).
+        """
+        if self.deny_any is None or not scan_texts:
+            return []
+        starts: List[int] = []
+        pos = 0
+        for t in scan_texts:
+            starts.append(pos)
+            pos += len(t) + 1
+        joined = "\n".join(scan_texts)
+
+        out: List[int] = []
+        pos = 0
+        while True:
+            m = self.deny_any.search(joined, pos)
+            if m is None:
+                break
+            k = bisect_right(starts, m.start()) - 1
+            out.append(k)
+            if k + 1 == len(starts):
+                break
+            pos = starts[k + 1]
+        return out
+
+
+_RULE_SETS: Dict[Path, CompiledRuleSet] = {}
+
+
+def compiled_rules(path: Path = DEFAULT_RULES_PATH) -> CompiledRuleSet:
+    """
+    Cached CompiledRuleSet for path. Re-read when (mtime_ns, size) changes;
+    recompiled only when the content sha256 changes. Load errors are not
+    cached (every call re-raises, as load_rules_yaml would).
+    """
+    if not path.exists():
+        raise GuardParseError(f"rules file not found: {path}")
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _RULE_SETS.get(path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
 
-    scan_text = "\n".join(masked_lines)
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if cached is not None and cached.sha256 == digest:
+        cached.stamp = stamp
+        return cached
 
-    deny_terms = rules.get("deny_uncertainty", {}).get("terms", [])
-    if not isinstance(deny_terms, list):
-        return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": "deny_terms_not_list"}]}
+    rs = CompiledRuleSet(_parse_rules_text(data.decode("utf-8"))["rules"], sha256=digest, stamp=stamp)
+    _RULE_SETS[path] = rs
+    return rs
 
-    term_hits = []
-    for t in deny_terms:
-        if not isinstance(t, str) or t.strip() == "":
-            continue
-        tt = re.escape(t.strip())
-        pat = rf"(?i)\b{tt}\b"
-        if re.search(pat, scan_text):
-            term_hits.append(t.strip())
 
-    if term_hits:
-        hits.append({"rule": "DENY_UNCERTAINTY", "detail": f"terms={term_hits}"})
-        return {"decision": "DENY", "canonical": None, "hits": hits}
+def _fail_closed(detail: str) -> dict:
+    return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": detail}]}
+
 
+def _unvalidated_gate(rs: CompiledRuleSet, text: str) -> dict:
+    if isinstance(rs.allow, GuardParseError):
+        return _fail_closed(f"allow_log_regex:{rs.allow}")
+    if rs.allow.match(text.strip()):
+        return {"decision": "PASS", "canonical": None, "hits": [{"rule": "UNVALIDATED_GATE", "detail": "allow_log_line"}]}
+    return {"decision": "DENY", "canonical": None, "hits": [{"rule": "UNVALIDATED_GATE", "detail": "state_unvalidated_deny_all"}]}
+
+
+def _rewrite_or_pass(rs: CompiledRuleSet, st: Optional[str], scan_text: str) -> dict:
     if st == "CONTESTED":
-        rr = rules.get("rewrite_contested_possession_claim", {})
-        rex = rr.get("regex", "")
-        canon = rr.get("canonical", "")
-        try:
-            pat = _compile_regex_fail_closed(rex)
-        except Exception as e:
-            return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": f"rewrite_contested_regex:{e}"}]}
-        if pat.search(scan_text):
-            hits.append({"rule": "REWRITE_CONTESTED_POSSESSION", "detail": "matched"})
-            return {"decision": "REWRITE", "canonical": canon, "hits": hits}
+        if isinstance(rs.contested, GuardParseError):
+            return _fail_closed(f"rewrite_contested_regex:{rs.contested}")
+        if rs.contested.search(scan_text):
+            hits = [{"rule": "REWRITE_CONTESTED_POSSESSION", "detail": "matched"}]
+            return {"decision": "REWRITE", "canonical": rs.contested_canonical, "hits": hits}
 
     if st == "DEAD_BALL":
-        rr = rules.get("rewrite_dead_ball_in_play_claim", {})
-        rex = rr.get("regex", "")
-        canon = rr.get("canonical", "")
-        try:
-            pat = _compile_regex_fail_closed(rex)
-        except Exception as e:
-            return {"decision": "DENY", "canonical": None, "hits": [{"rule": "FAIL_CLOSED", "detail": f"rewrite_dead_ball_regex:{e}"}]}
-        if pat.search(scan_text):
-            hits.append({"rule": "REWRITE_DEAD_BALL_IN_PLAY", "detail": "matched"})
-            return {"decision": "REWRITE", "canonical": canon, "hits": hits}
-
-    return {"decision": "PASS", "canonical": None, "hits": hits}
+        if isinstance(rs.dead_ball, GuardParseError):
+            return _fail_closed(f"rewrite_dead_ball_regex:{rs.dead_ball}")
+        if rs.dead_ball.search(scan_text):
+            hits = [{"rule": "REWRITE_DEAD_BALL_IN_PLAY", "detail": "matched"}]
+            return {"decision": "REWRITE", "canonical": rs.dead_ball_canonical, "hits": hits}
+
+    return {"decision": "PASS", "canonical": None, "hits": []}
+
+
+def _validate_batch(texts: List[Any], states: List[Any], rules_path: Path) -> List[dict]:
+    out: List[Optional[dict]] = [None] * len(texts)
+    try:
+        rs: Optional[CompiledRuleSet] = compiled_rules(rules_path)
+        load_err = ""
+    except Exception as e:
+        rs, load_err = None, f"rules_load:{e}"
+
+    # state -> input positions
+    groups: Dict[Optional[str], List[int]] = {}
+    for i, (text, state) in enumerate(zip(texts, states)):
+        if not isinstance(text, str):
+            out[i] = _fail_closed("text_not_str")
+        elif rs is None:
+            out[i] = _fail_closed(load_err)
+        else:
+            st = state.strip().upper() if isinstance(state, str) and state.strip() else None
+            groups.setdefault(st, []).append(i)
+
+    for st, idx in groups.items():
+        if st == "UNVALIDATED":
+            for i in idx:
+                out[i] = _unvalidated_gate(rs, texts[i])
+            continue
+
+        live: List[int] = []
+        scans: List[str] = []
+        for i in idx:
+            scan, err = _scan_text(texts[i])
+            if err:
+                out[i] = _fail_closed(err)
+            else:
+                live.append(i)
+                scans.append(scan)
+
+        if not rs.deny_terms_ok:
+            for i in live:
+                out[i] = _fail_closed("deny_terms_not_list")
+            continue
+
+        for k in rs.denied(scans):
+            hits = [{"rule": "DENY_UNCERTAINTY", "detail": f"terms={rs.deny_hits(scans[k])}"}]
+            out[live[k]] = {"decision": "DENY", "canonical": None, "hits": hits}
+
+        for k, i in enumerate(live):
+            if out[i] is None:
+                out[i] = _rewrite_or_pass(rs, st, scans[k])
+
+    return out  # type: ignore[return-value]
+
+
+def validate_narrative(text: str, state: str | None = None, rules_path: Path = DEFAULT_RULES_PATH) -> dict:
+    return _validate_batch([text], [state], rules_path)[0]
+
+
+def validate_narratives(
+    texts: Sequence[Any],
+    states: Optional[Sequence[Any]] = None,
+    jobs: int = 1,
+    rules_path: Path = DEFAULT_RULES_PATH,
+) -> List[dict]:
+    """
+    validate_narrative() for many texts; one result per item, in input order,
+    identical to the per-item call.
+
+    Texts are grouped by normalized state: each group is masked, then scanned
+    for deny terms in one alternation pass, then run through that state's
+    rewrite regex. jobs > 1 splits batches of at least POOL_MIN_TEXTS into
+    contiguous chunks over a process pool.
+    """
+    texts = list(texts)
+    states = [None] * len(texts) if states is None else list(states)
+    if len(states) != len(texts):
+        raise ValueError("NARRATIVE_FAIL_CLOSED:texts_states_length_mismatch")
+
+    if jobs <= 1 or len(texts) < POOL_MIN_TEXTS:
+        return _validate_batch(texts, states, rules_path)
+
+    size = -(-len(texts) // jobs)
+    bounds = range(0, len(texts), size)
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        parts = ex.map(
+            _validate_batch,
+            [texts[b : b + size] for b in bounds],
+            [states[b : b + size] for b in bounds],
+            [rules_path] * len(bounds),
+        )
+        return [r for part in parts for r in part]
@@ -7,12 +7,17 @@ def validate_context(event: Dict[str, Any]) -> None:
     if not isinstance(event, dict):
         raise ValueError("HSR_FAIL_CLOSED:context:event_not_dict")
 
-    ts = event.get("event_start_time")
-    prev_ts = event.get("prev_event_time")
-    state = event.get("state_id")
-    prev_state = event.get("prev_state_id")
-    effect = event.get("possession_effect")
+    check_context(
+        event.get("event_start_time"),
+        event.get("prev_event_time"),
+        event.get("state_id"),
+        event.get("prev_state_id"),
+        event.get("possession_effect"),
+        event.get("event_type"),
+    )
 
+def check_context(ts: Any, prev_ts: Any, state: Any, prev_state: Any, effect: Any, e_type: Any) -> None:
+    # Ring 5 on already-extracted fields (shared with HSRPipeline)
     if ts is None or prev_ts is None or state is None or prev_state is None:
         raise ValueError("HSR_FAIL_CLOSED:context:missing_fields")
 
@@ -22,5 +27,5 @@ def validate_context(event: Dict[str, Any]) -> None:
     if effect == "START" and not (prev_state == "DEAD_BALL" and state == "CONTROLLED"):
         raise ValueError("HSR_CONTEXT_VIOLATION:start_out_of_dead_ball")
 
-    if prev_state == "DEAD_BALL" and (ts - prev_ts) > COOLDOWN_S and event.get("event_type") in ("TACKLE","INTERCEPTION"):
+    if prev_state == "DEAD_BALL" and (ts - prev_ts) > COOLDOWN_S and e_type in ("TACKLE","INTERCEPTION"):
         raise ValueError("HSR_CONTEXT_VIOLATION:cooldown_breach")
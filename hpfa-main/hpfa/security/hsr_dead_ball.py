@@ -18,15 +18,15 @@ ILLEGAL_EVENTS = {"TACKLE", "INTERCEPTION"}
 def validate_dead_ball(event: Dict[str, Any]) -> None:
     if not isinstance(event, dict):
         raise ValueError("HSR_FAIL_CLOSED:event_not_dict")
+    check_dead_ball(event.get("event_type"), event.get("prev_state_id"), event.get("state_id"))
 
-    e_type = event.get("event_type")
+
+def check_dead_ball(e_type: Any, prev_state: Any, state: Any) -> None:
+    """Ring 3 on already-extracted fields (shared with HSRPipeline)."""
     if not isinstance(e_type, str) or not e_type.strip():
         raise ValueError("HSR_FAIL_CLOSED:missing_event_type")
     e_type = e_type.strip().upper()
 
-    prev_state = event.get("prev_state_id")
-    state = event.get("state_id")
-
     # Fail-closed: if state fields are missing, veto
     if prev_state is None and state is None:
         raise ValueError("HSR_FAIL_CLOSED:missing_state_fields")
@@ -20,22 +20,29 @@ class NASRing:
         if not isinstance(event, dict):
             raise ValueError("NAS_FAIL_CLOSED:event_not_dict")
 
-        team = event.get("team_id")
-        outcome = event.get("outcome")
-        state = event.get("state_id")
+        if self.observe(event.get("team_id"), event.get("outcome"), event.get("state_id")):
+            event.update({
+                "nas_flag": True,
+                "nas_level": self.window_events,
+                "nas_reason": f"{self.window_events}_consecutive_failures"
+            })
+        else:
+            event.update({"nas_flag": False})
 
+        return event
+
+    def observe(self, team: Any, outcome: Any, state: Any) -> bool:
+        """Ring step on already-extracted fields; True = NAS trigger (shared with HSRPipeline)."""
         if team is None or state is None:
             raise ValueError("NAS_FAIL_CLOSED:missing_required_fields")
 
         # Only evaluate during active play
         if state not in ("CONTROLLED", "CONTESTED"):
-            event.update({"nas_flag": False})
-            return event
+            return False
 
         # Normalize outcome
         if outcome is None:
-            event.update({"nas_flag": False})
-            return event
+            return False
 
         o = str(outcome).lower()
         if o not in ("success", "fail"):
@@ -44,13 +51,4 @@ class NASRing:
         dq = self._hist.setdefault(str(team), deque(maxlen=self.window_events))
         dq.append(o)
 
-        if len(dq) == self.window_events and all(x == "fail" for x in dq):
-            event.update({
-                "nas_flag": True,
-                "nas_level": self.window_events,
-                "nas_reason": f"{self.window_events}_consecutive_failures"
-            })
-        else:
-            event.update({"nas_flag": False})
-
-        return event
+        return len(dq) == self.window_events and all(x == "fail" for x in dq)
@@ -9,12 +9,19 @@ Contract (tests):
 Stateful ring:
 - First call stores (t,x,y)
 - Next calls compute dt, distance, speed
+
+Match scale (PhysicsRingBank):
+- one ring per player_id, whole (player, t, x, y) arrays per call
+- grouped diffs in NumPy; violation mask + reason codes instead of raising
+- commit-on-success kept: a vetoed event never becomes the next prev
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 @dataclass
@@ -42,9 +49,14 @@ def validate_physics(event: Dict[str, Any], ring: PhysicsRing) -> None:
     if not isinstance(ring, PhysicsRing):
         raise ValueError("HSR_FAIL_CLOSED:physics:ring_not_physicsring")
 
-    t = _num(event.get("event_start_time"))
-    x = _num(event.get("x"))
-    y = _num(event.get("y"))
+    step_physics(ring, event.get("event_start_time"), event.get("x"), event.get("y"))
+
+
+def step_physics(ring: PhysicsRing, t_raw: Any, x_raw: Any, y_raw: Any) -> None:
+    """Ring 4 on already-extracted fields (shared with HSRPipeline); commits only on success."""
+    t = _num(t_raw)
+    x = _num(x_raw)
+    y = _num(y_raw)
 
     # Fail-closed: missing core fields
     if x is None or y is None:
@@ -79,3 +91,235 @@ def validate_physics(event: Dict[str, Any], ring: PhysicsRing) -> None:
     ring.prev_t = t
     ring.prev_x = x
     ring.prev_y = y
+
+
+# -----------------------------
+# Batch validation (per-player ring bank)
+# -----------------------------
+PHYS_OK = 0
+PHYS_MISSING_PLAYER = 1
+PHYS_MISSING_XY = 2
+PHYS_MISSING_TIME = 3
+PHYS_MISSING_PREV_XY = 4
+PHYS_NONPOSITIVE_DT = 5
+PHYS_SPEED = 6
+
+PHYSICS_REASONS: Tuple[str, ...] = (
+    "",
+    "HSR_FAIL_CLOSED:physics:missing_player",
+    "HSR_FAIL_CLOSED:physics:missing_xy",
+    "HSR_FAIL_CLOSED:physics:missing_time",
+    "HSR_FAIL_CLOSED:physics:missing_prev_xy",
+    "HSR_FAIL_CLOSED:physics:nonpositive_dt",
+    "HSR_PHYSICS_VIOLATION",
+)
+
+# vectorized rounds before the remaining rows are finished one by one
+_MAX_ROUNDS = 8
+
+
+@dataclass(frozen=True)
+class PhysicsBatch:
+    violation: np.ndarray  # bool, True = vetoed (validate_physics would raise)
+    reason_code: np.ndarray  # uint8, index into PHYSICS_REASONS
+    speed: np.ndarray  # float64, m/s vs the player's last committed point (NaN if not computed)
+
+    def reasons(self) -> List[Optional[str]]:
+        """Per-event message validate_physics would raise with (None = committed)."""
+        out: List[Optional[str]] = []
+        for code, sp in zip(self.reason_code.tolist(), self.speed.tolist()):
+            if code == PHYS_OK:
+                out.append(None)
+            elif code == PHYS_SPEED:
+                out.append(f"{PHYSICS_REASONS[code]}:speed={sp:.2f}")
+            else:
+                out.append(PHYSICS_REASONS[code])
+        return out
+
+
+def _num_col(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """(float64 values, present mask) with _num() semantics."""
+    # arrays / Series keep their dtype; plain sequences are read element-wise
+    a = np.asarray(values) if hasattr(values, "dtype") else np.asarray(values, dtype=object)
+    if a.dtype.kind in "biuf":
+        return a.astype(np.float64), np.ones(len(a), dtype=bool)
+    nums = [_num(v) for v in a.tolist()]
+    ok = np.fromiter((v is not None for v in nums), dtype=bool, count=len(nums))
+    return np.asarray([v if v is not None else np.nan for v in nums], dtype=np.float64), ok
+
+
+@dataclass
+class PhysicsRingBank:
+    """One PhysicsRing per player_id; validate_arrays() runs a whole batch."""
+
+    max_speed_mps: float = 12.0
+    rings: Dict[Any, PhysicsRing] = field(default_factory=dict)
+
+    def ring(self, player_id: Any) -> PhysicsRing:
+        r = self.rings.get(player_id)
+        if r is None:
+            r = self.rings[player_id] = PhysicsRing(max_speed_mps=self.max_speed_mps)
+        return r
+
+    def validate_arrays(self, player_id: Sequence[Any], t: Sequence[Any], x: Sequence[Any], y: Sequence[Any]) -> PhysicsBatch:
+        """
+        Same verdicts (and final ring states) as calling validate_physics per
+        event in array order on each player's ring, catching the errors.
+        """
+        n = len(player_id)
+        if not (len(t) == len(x) == len(y) == n):
+            raise ValueError("HSR_FAIL_CLOSED:physics:column_length_mismatch")
+
+        tv, t_ok = _num_col(t)
+        xv, x_ok = _num_col(x)
+        yv, y_ok = _num_col(y)
+
+        keys, gid = _group_codes(player_id)
+        rings = [self.ring(k) for k in keys]
+        seed_t = np.array([np.nan if r.prev_t is None else r.prev_t for r in rings], dtype=np.float64)
+        seed_x = np.array([np.nan if r.prev_x is None else r.prev_x for r in rings], dtype=np.float64)
+        seed_y = np.array([np.nan if r.prev_y is None else r.prev_y for r in rings], dtype=np.float64)
+        seed_has = np.array([r.prev_t is not None for r in rings], dtype=bool)
+        seed_broken = np.array([r.prev_t is not None and (r.prev_x is None or r.prev_y is None) for r in rings], dtype=bool)
+        max_speed = np.array([float(r.max_speed_mps) for r in rings], dtype=np.float64)
+
+        reason = np.zeros(n, dtype=np.uint8)
+        speed = np.full(n, np.nan)
+        known = gid >= 0
+        xy_ok = x_ok & y_ok
+        reason[~known] = PHYS_MISSING_PLAYER
+        reason[known & ~xy_ok] = PHYS_MISSING_XY
+        reason[known & xy_ok & ~t_ok] = PHYS_MISSING_TIME
+        if len(keys):
+            reason[known & (reason == PHYS_OK) & seed_broken[np.where(known, gid, 0)]] = PHYS_MISSING_PREV_XY
+        vetoed = reason != PHYS_OK
+
+        # pending rows in (player, arrival) order; per player, accepted rows are
+        # always a prefix, so only the last one (last_commit) is needed as prev
+        order = np.argsort(gid, kind="stable")
+        pend = order[~vetoed[order]]
+        last_commit = np.full(len(keys), -1, dtype=np.int64)
+
+        rounds = 0
+        while len(pend):
+            if rounds >= _MAX_ROUNDS:
+                _finish_scalar(pend, gid, tv, xv, yv, seed_t, seed_x, seed_y, seed_has, max_speed, last_commit, vetoed, reason, speed)
+                break
+            rounds += 1
+            g = gid[pend]
+            start = np.ones(len(pend), dtype=bool)
+            start[1:] = g[1:] != g[:-1]
+            prev = np.empty(len(pend), dtype=np.int64)
+            prev[1:] = pend[:-1]
+            prev[start] = last_commit[g[start]]
+            from_row = prev >= 0
+            src = np.maximum(prev, 0)
+            pt = np.where(from_row, tv[src], seed_t[g])
+            px = np.where(from_row, xv[src], seed_x[g])
+            py = np.where(from_row, yv[src], seed_y[g])
+            has = from_row | seed_has[g]
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                dt = tv[pend] - pt
+                dx = xv[pend] - px
+                dy = yv[pend] - py
+                sp = np.power(dx * dx + dy * dy, 0.5) / dt
+            bad_dt = has & (dt <= 0)
+            bad_sp = has & ~bad_dt & (sp > max_speed[g])
+            fail = bad_dt | bad_sp
+
+            # rows before each player's first failure are exact; so is that failure
+            cut = np.full(len(keys), len(pend), dtype=np.int64)
+            fpos = np.flatnonzero(fail)
+            if len(fpos):
+                ug, first = np.unique(g[fpos], return_index=True)
+                cut[ug] = fpos[first]
+            pos = np.arange(len(pend))
+            c = cut[g]
+            ok_now = pos < c
+            bad_now = pos == c
+
+            measured = (ok_now | bad_now) & has & ~bad_dt
+            speed[pend[measured]] = sp[measured]
+            vetoed[pend[bad_now]] = True
+            reason[pend[bad_now & bad_dt]] = PHYS_NONPOSITIVE_DT
+            reason[pend[bad_now & bad_sp]] = PHYS_SPEED
+            ok_rows = pend[ok_now]
+            if len(ok_rows):
+                og = gid[ok_rows]
+                tail = np.flatnonzero(np.append(og[1:] != og[:-1], True))
+                last_commit[og[tail]] = ok_rows[tail]
+            pend = pend[pos > c]
+
+        # Commit: last accepted point per player becomes the ring's prev
+        for k, row in enumerate(last_commit.tolist()):
+            if row >= 0:
+                r = rings[k]
+                r.prev_t = float(tv[row])
+                r.prev_x = float(xv[row])
+                r.prev_y = float(yv[row])
+
+        return PhysicsBatch(violation=vetoed, reason_code=reason, speed=speed)
+
+
+def _group_codes(player_id: Sequence[Any]) -> Tuple[List[Any], np.ndarray]:
+    """(distinct player ids, per-row code); None player => code -1."""
+    if hasattr(player_id, "dtype") and np.asarray(player_id).dtype.kind in "biuU":
+        keys, gid = np.unique(np.asarray(player_id), return_inverse=True)
+        return keys.tolist(), gid.astype(np.int64).reshape(-1)
+    pids = player_id.tolist() if hasattr(player_id, "tolist") else list(player_id)
+    keys: List[Any] = []
+    index: Dict[Any, int] = {}
+    gid = np.empty(len(pids), dtype=np.int64)
+    for i, p in enumerate(pids):
+        if p is None:
+            gid[i] = -1
+            continue
+        g = index.get(p)
+        if g is None:
+            g = index[p] = len(keys)
+            keys.append(p)
+        gid[i] = g
+    return keys, gid
+
+
+def _finish_scalar(
+    pend: np.ndarray,
+    gid: np.ndarray,
+    tv: np.ndarray,
+    xv: np.ndarray,
+    yv: np.ndarray,
+    seed_t: np.ndarray,
+    seed_x: np.ndarray,
+    seed_y: np.ndarray,
+    seed_has: np.ndarray,
+    max_speed: np.ndarray,
+    last_commit: np.ndarray,
+    vetoed: np.ndarray,
+    reason: np.ndarray,
+    speed: np.ndarray,
+) -> None:
+    # sequential fallback for players with many vetoes in one batch
+    for row in pend.tolist():
+        g = int(gid[row])
+        t, x, y = float(tv[row]), float(xv[row]), float(yv[row])
+        lc = int(last_commit[g])
+        if lc >= 0 or seed_has[g]:
+            if lc >= 0:
+                pt, px, py = float(tv[lc]), float(xv[lc]), float(yv[lc])
+            else:
+                pt, px, py = float(seed_t[g]), float(seed_x[g]), float(seed_y[g])
+            dt = t - pt
+            if dt <= 0:
+                vetoed[row] = True
+                reason[row] = PHYS_NONPOSITIVE_DT
+                continue
+            dx = x - px
+            dy = y - py
+            sp = (dx * dx + dy * dy) ** 0.5 / dt
+            speed[row] = sp
+            if sp > max_speed[g]:
+                vetoed[row] = True
+                reason[row] = PHYS_SPEED
+                continue
+        last_commit[g] = row
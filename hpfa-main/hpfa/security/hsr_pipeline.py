@@ -0,0 +1,145 @@
+"""
+HSR Pipeline — all rings in one pass over a match stream (Fail-Closed)
+
+Per event, each key is read once and fed to:
+  - Ring 3 dead ball    (check_dead_ball)
+  - Ring 4 physics      (step_physics, one PhysicsRing per player_id)
+  - Ring 5 context      (check_context)
+  - NAS ring            (NASRing.observe)
+
+Rings are independent: every ring runs on every event and a veto in one
+ring never blocks another (same as calling each validator and catching).
+Physics still commits only on its own success.
+
+Previous-event context is carried internally:
+  prev_state_id   = event["prev_state_id"] if set (state machine output), else previous event's state_id
+  prev_event_time = event["prev_event_time"] if set, else previous event's event_start_time
+Ring 5 gets both times coerced to float (numeric str accepted, unparseable => missing).
+
+Output per event: veto bitmask (HSR_* bits) + reasons (exception messages;
+NAS trigger reason). hsr_flags(mask) is the NAS input dict.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from hpfa.security.hsr_context import check_context
+from hpfa.security.hsr_dead_ball import check_dead_ball
+from hpfa.security.hsr_nas import NASRing
+from hpfa.security.hsr_physics import PhysicsRingBank, _num, step_physics
+
+HSR_R3_DEAD_BALL = 1 << 0
+HSR_R4_PHYSICS = 1 << 1
+HSR_R5_CONTEXT = 1 << 2
+HSR_NAS_FAIL_CLOSED = 1 << 3
+HSR_NAS_TRIGGER = 1 << 4
+
+_NO_REASONS: Tuple[str, ...] = ()
+
+_NOT_DICT = (
+    HSR_R3_DEAD_BALL | HSR_R4_PHYSICS | HSR_R5_CONTEXT | HSR_NAS_FAIL_CLOSED,
+    (
+        "HSR_FAIL_CLOSED:event_not_dict",
+        "HSR_FAIL_CLOSED:physics:event_not_dict",
+        "HSR_FAIL_CLOSED:context:event_not_dict",
+        "NAS_FAIL_CLOSED:event_not_dict",
+    ),
+)
+
+
+def hsr_flags(mask: int) -> Dict[str, bool]:
+    """NAS hsr_flags input for one event mask."""
+    return {
+        "ring3_dead_ball_veto": bool(mask & HSR_R3_DEAD_BALL),
+        "ring4_physics_veto": bool(mask & HSR_R4_PHYSICS),
+    }
+
+
+@dataclass(frozen=True)
+class HSRBatch:
+    masks: List[int]
+    reasons: List[Tuple[str, ...]]
+
+    def hsr_flags(self) -> List[Dict[str, bool]]:
+        return [hsr_flags(m) for m in self.masks]
+
+
+@dataclass
+class HSRPipeline:
+    max_speed_mps: float = 12.0
+    nas_window_events: int = 3
+    physics: PhysicsRingBank = field(init=False)
+    nas: NASRing = field(init=False)
+    prev_state_id: Optional[Any] = None
+    prev_event_time: Optional[Any] = None
+
+    def __post_init__(self) -> None:
+        self.physics = PhysicsRingBank(max_speed_mps=self.max_speed_mps)
+        self.nas = NASRing(window_events=self.nas_window_events)
+
+    def step(self, event: Dict[str, Any]) -> Tuple[int, Tuple[str, ...]]:
+        if not isinstance(event, dict):
+            return _NOT_DICT
+
+        get = event.get
+        e_type = get("event_type")
+        state = get("state_id")
+        ts = get("event_start_time")
+        prev_state = get("prev_state_id")
+        if prev_state is None:
+            prev_state = self.prev_state_id
+        prev_ts = get("prev_event_time")
+        if prev_ts is None:
+            prev_ts = self.prev_event_time
+        player = get("player_id")
+
+        mask = 0
+        reasons: Optional[List[str]] = None
+
+        try:
+            check_dead_ball(e_type, prev_state, state)
+        except ValueError as e:
+            mask |= HSR_R3_DEAD_BALL
+            reasons = [str(e)]
+
+        try:
+            if player is None:
+                raise ValueError("HSR_FAIL_CLOSED:physics:missing_player")
+            step_physics(self.physics.ring(player), ts, get("x"), get("y"))
+        except ValueError as e:
+            mask |= HSR_R4_PHYSICS
+            reasons = (reasons or []) + [str(e)]
+
+        try:
+            # numeric times (str accepted, as in physics / state machine); unparseable => missing_fields
+            check_context(_num(ts), _num(prev_ts), state, prev_state, get("possession_effect"), e_type)
+        except ValueError as e:
+            mask |= HSR_R5_CONTEXT
+            reasons = (reasons or []) + [str(e)]
+
+        try:
+            if self.nas.observe(get("team_id"), get("outcome"), state):
+                mask |= HSR_NAS_TRIGGER
+                reasons = (reasons or []) + [f"{self.nas.window_events}_consecutive_failures"]
+        except ValueError as e:
+            mask |= HSR_NAS_FAIL_CLOSED
+            reasons = (reasons or []) + [str(e)]
+
+        # carry context for the next event
+        self.prev_state_id = state
+        self.prev_event_time = ts
+        return mask, (tuple(reasons) if reasons else _NO_REASONS)
+
+    def run(self, events: List[Dict[str, Any]], annotate: bool = False) -> HSRBatch:
+        """One pass over a match; annotate=True also writes event["hsr_flags"] for NAS."""
+        masks: List[int] = []
+        reasons: List[Tuple[str, ...]] = []
+        for e in events:
+            m, r = self.step(e)
+            masks.append(m)
+            reasons.append(r)
+            if annotate and isinstance(e, dict):
+                e["hsr_flags"] = hsr_flags(m)
+        return HSRBatch(masks=masks, reasons=reasons)
@@ -0,0 +1,74 @@
+import gc
+import json
+import math
+import random
+import weakref
+from collections import Counter
+
+from hpfa.analytics.aggregates import match_aggregates
+from hpfa.io.event_store import stream_paths
+from hpfa.io.match import UNKNOWN_TEAM, load_match
+
+
+def _write(d, seed, n=300):
+    rng = random.Random(seed)
+    _, jsonl_path = stream_paths(str(d))
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            has_xy = rng.random() < 0.7
+            f.write(json.dumps({
+                # few distinct times: lots of ties for the stable time order
+                "t_start": rng.choice([None, 0.0, 59.9, 60.0, 61.5, 3600.0, 3600.0]),
+                "half": rng.choice([1, 2]),
+                "action": "Pas",
+                "code": rng.choice([None, f"{i % 5}. Oyuncu {i % 5} ({i % 5}) - Pas", "Ali (1) - Pas"]),
+                "x": rng.uniform(0, 105) if has_xy else None,
+                "y": rng.uniform(0, 68) if has_xy else None,
+                "team_raw": rng.choice([None, "B", "A"]),
+            }, ensure_ascii=False) + "\n")
+    return str(d)
+
+
+def test_matches_per_team_loops(tmp_path):
+    md = load_match(_write(tmp_path, 0))
+    agg = match_aggregates(md)
+    teams, ts, players = md.team.tolist(), md.t_start.tolist(), md.player.tolist()
+
+    assert agg.teams == sorted(set(teams)) and UNKNOWN_TEAM in agg.teams
+    assert list(agg.rows) == list(dict.fromkeys(teams))  # first-appearance order, as defaultdict grouping
+    minute = [None if math.isnan(t) else int(t // 60) for t in ts]
+    assert agg.per_minute == Counter(m for m in minute if m is not None)
+    assert agg.minute.tolist() == [-1 if m is None else m for m in minute]
+    for team in agg.teams:
+        rows = [i for i in range(md.n) if teams[i] == team]
+        assert agg.rows[team] == rows
+        by_time = sorted(rows, key=lambda i: 0.0 if math.isnan(ts[i]) else ts[i])
+        assert agg.rows_by_time[team] == by_time
+        assert agg.team_minutes[team] == Counter(minute[i] for i in rows if minute[i] is not None)
+        touches = Counter()
+        for i in by_time:
+            if players[i]:
+                touches[players[i]] += 1
+        assert list(agg.touches[team].items()) == list(touches.items())  # same most_common tie order
+    for i, xy in enumerate(agg.xy_of):
+        assert xy == ((md.x[i], md.y[i]) if md.has_xy[i] else None)
+
+
+def test_memoized_per_match(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    md = load_match(_write(tmp_path / "a", 1))
+    assert match_aggregates(md) is match_aggregates(load_match(str(tmp_path / "a")))
+    other = match_aggregates(load_match(_write(tmp_path / "b", 2)))
+    assert other is not match_aggregates(md)
+    assert sum(len(r) for r in other.rows.values()) == 300
+
+
+def test_reloaded_match_releases_old_aggregates(tmp_path):
+    md = load_match(_write(tmp_path, 3))
+    agg = weakref.ref(match_aggregates(md))
+    old = weakref.ref(md)
+    del md
+    load_match(_write(tmp_path, 4, n=200))  # changed file: load_match replaces its entry
+    gc.collect()
+    assert old() is None and agg() is None
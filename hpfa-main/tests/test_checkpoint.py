@@ -0,0 +1,69 @@
+import pytest
+
+from hpfa.core.checkpoint import CheckpointLog, resume_state_machine
+from hpfa.core.state_machine import PossessionStateMachine
+
+
+def _feed():
+    evs = []
+    for i in range(60):
+        e_type = ["RESTART_KICKOFF", "PASS", "PASS", "TACKLE", "INTERCEPTION", "OUT"][i % 6]
+        evs.append({"event_type": e_type, "team_id": 1 + (i // 6) % 2, "event_start_time": i * 0.7, "outcome": "success"})
+    return evs
+
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path):
+    evs = _feed()
+    ref = PossessionStateMachine()
+    want = [ref.update(e)[0] for e in evs]
+
+    log = CheckpointLog(str(tmp_path / "sm.ckpt.jsonl"))
+    sm, offset = resume_state_machine(log)
+    assert offset == 0
+    got = []
+    for i, e in enumerate(evs[:37]):
+        got.append(sm.update(e)[0])
+        log.append(i + 1, sm.snapshot())
+
+    # crash + redeploy: new process, same log
+    sm2, offset = resume_state_machine(log)
+    assert offset == 37
+    for e in evs[offset:]:
+        got.append(sm2.update(e)[0])
+    assert got == want
+
+
+def test_torn_tail_line_is_skipped(tmp_path):
+    p = tmp_path / "sm.ckpt.jsonl"
+    log = CheckpointLog(str(p))
+    sm = PossessionStateMachine()
+    sm.update({"event_type": "RESTART_KICKOFF", "team_id": 1, "event_start_time": 0.0})
+    log.append(1, sm.snapshot())
+    with open(p, "a", encoding="utf-8") as f:
+        f.write('{"offset": 2, "snapshot": {"state": "CONTR')
+    sm2, offset = resume_state_machine(log)
+    assert offset == 1
+    assert sm2.possession_id == "p000001"
+
+
+def test_restore_fails_closed_on_dead_ball_with_possession():
+    snap = PossessionStateMachine().snapshot()
+    snap.update({"possession_id": "p000001", "pos_counter": 1})
+    sm = PossessionStateMachine()
+    with pytest.raises(ValueError) as e:
+        sm.restore(snap)
+    assert "SM_FAIL_CLOSED:snapshot_dead_ball_with_possession" in str(e.value)
+    assert sm.snapshot() == PossessionStateMachine().snapshot()
+
+
+def test_append_after_torn_line_starts_a_new_line(tmp_path):
+    p = tmp_path / "sm.ckpt.jsonl"
+    log = CheckpointLog(str(p))
+    sm = PossessionStateMachine()
+    log.append(0, sm.snapshot())
+    with open(p, "a", encoding="utf-8") as f:
+        f.write('{"offset": 1, "snapsh')
+    sm.update({"event_type": "RESTART_KICKOFF", "team_id": 1, "event_start_time": 0.0})
+    log.append(2, sm.snapshot())
+    assert log.last() == (2, sm.snapshot())
+    assert p.read_text(encoding="utf-8").count("\n") == 3
@@ -0,0 +1,120 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+from hpfa.io.event_store import INT_NULL, ColumnBuilder, load_events, load_interned, stream_paths
+
+
+def _records(seed, n=300):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        team = rng.choice(["Caykur Rizespor (62850)", "Galatasaray (3061)", None])
+        action = rng.choice(["Paslar adresi bulanlar", "Top Taşıma", "İsabetli Şut", None])
+        out.append({
+            "match_id": "m1",
+            "stream": "outfield",
+            "id": i + 1 if rng.random() > 0.02 else None,
+            "t_start": round(rng.uniform(0, 5400), 2),
+            "t_end": rng.choice([None, 1.5, 3.0]),
+            "half": rng.choice([1, 2, None]),
+            "action": action,
+            "code": f"{rng.randint(1, 30)}. Oyuncu ({rng.randint(1, 9)}) - {action}" if action else None,
+            "x": rng.choice([None, round(rng.uniform(0, 105), 2)]),
+            "y": rng.choice([None, round(rng.uniform(0, 68), 2)]),
+            "team_raw": team,
+            "team_id": rng.choice([62850, None]),
+            "player_id": rng.choice([1389884, None]),
+            "metric": None,
+        })
+    return out
+
+
+def _write_match(tmp_path, records, npz=True):
+    npz_path, jsonl_path = stream_paths(str(tmp_path))
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    if npz:
+        b = ColumnBuilder()
+        for r in records:
+            b.add(r)
+        st = os.stat(jsonl_path)
+        b.save(npz_path, source_size=st.st_size, source_mtime_ns=st.st_mtime_ns)
+    return str(tmp_path)
+
+
+def _as_records(cols, n):
+    out = []
+    for i in range(n):
+        rec = {}
+        for k, a in cols.items():
+            v = a[i]
+            if a.dtype.kind == "f":
+                v = None if np.isnan(v) else float(v)
+            elif a.dtype.kind == "i":
+                v = None if v == INT_NULL else int(v)
+            rec[k] = v
+        out.append(rec)
+    return out
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_npz_round_trips_jsonl_records(tmp_path, seed):
+    recs = _records(seed)
+    d = _write_match(tmp_path, recs)
+    cols = load_events(d)
+    assert isinstance(cols["t_start"], np.memmap)
+    assert _as_records(cols, len(recs)) == recs
+
+
+def test_requested_columns_only_and_shared_strings(tmp_path):
+    d = _write_match(tmp_path, _records(0))
+    cols = load_events(d, columns=["team_raw", "x"])
+    assert list(cols) == ["team_raw", "x"]
+    teams = [t for t in cols["team_raw"].tolist() if t is not None]
+    assert len({id(t) for t in teams}) == len(set(teams))
+
+    codes, vocab = load_interned(d, "action")
+    acts = [vocab[c] if c >= 0 else None for c in codes.tolist()]
+    assert acts == load_events(d, columns=["action"])["action"].tolist()
+
+
+def test_stale_or_missing_npz_falls_back_to_jsonl(tmp_path):
+    recs = _records(1)
+    d = _write_match(tmp_path, recs)
+    recs[0]["team_raw"] = "Changed (1)"
+    _, jsonl_path = stream_paths(d)
+    with open(jsonl_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(recs[0], ensure_ascii=False) + "\n")
+    cols = load_events(d, columns=["team_raw"])
+    assert cols["team_raw"][-1] == "Changed (1)" and len(cols["team_raw"]) == len(recs) + 1
+
+    # same-size in-place edit: only the mtime tells
+    (tmp_path / "same_size").mkdir()
+    d3 = _write_match(tmp_path / "same_size", recs[:3])
+    _, p3 = stream_paths(d3)
+    st = os.stat(p3)
+    body = open(p3, "rb").read()
+    with open(p3, "r+b") as f:
+        f.write(body.replace(b'"stream": "outfield"', b'"stream": "outfielD"', 1))
+    os.utime(p3, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert os.path.getsize(p3) == st.st_size
+    assert load_events(d3, columns=["stream"])["stream"][0] == "outfielD"
+
+    (tmp_path / "no_npz").mkdir()
+    d2 = _write_match(tmp_path / "no_npz", recs, npz=False)
+    assert load_events(d2, columns=["half"])["half"].tolist() == [INT_NULL if r["half"] is None else r["half"] for r in recs]
+
+
+def test_fail_closed(tmp_path):
+    d = _write_match(tmp_path, _records(2, n=5))
+    with pytest.raises(ValueError, match="EVENT_STORE_FAIL_CLOSED:unknown_column:nope"):
+        load_events(d, columns=["nope"])
+    with pytest.raises(ValueError, match="EVENT_STORE_FAIL_CLOSED:not_str_column:x"):
+        load_interned(d, "x")
+    with pytest.raises(ValueError, match="EVENT_STORE_FAIL_CLOSED:missing_stream:canonical_gk.jsonl"):
+        load_events(d, stream="gk")
@@ -1,5 +1,8 @@
+import os
+
 import pytest
-from hpfa.narrative.forensic_guard import validate_narrative
+from hpfa.narrative import forensic_guard
+from hpfa.narrative.forensic_guard import compiled_rules, validate_narrative, validate_narratives
 
 def test_pass_simple_observation():
     r = validate_narrative("Observation: Pas, (x=45, y=30).", state="CONTROLLED")
@@ -34,3 +37,87 @@ def test_contested_rewrite_possession_claims():
 def test_dead_ball_rewrite_in_play_claims():
     r = validate_narrative("Top oyunda.", state="DEAD_BALL")
     assert r["decision"] == "REWRITE"
+
+def _write_rules(path, terms='["maybe","perhaps"]', contested="(?i)\\b(winning)\\b"):
+    path.write_text(
+        "rules:\n"
+        "  deny_uncertainty:\n"
+        f"    terms: {terms}\n"
+        "  unvalidated_gate:\n"
+        "    allow_log_regex: '^State:\\s*UNVALIDATED\\s*$'\n"
+        "  rewrite_contested_possession_claim:\n"
+        f"    regex: '{contested}'\n"
+        "    canonical: 'State: CONTESTED (INCONCLUSIVE)'\n",
+        encoding="utf-8",
+    )
+
+
+def test_compiled_rules_cached_and_invalidated_on_change(tmp_path):
+    p = tmp_path / "rules.yaml"
+    _write_rules(p)
+    rs = compiled_rules(p)
+    assert compiled_rules(p) is rs
+    assert validate_narrative("they might win", "CONTROLLED", rules_path=p)["decision"] == "PASS"
+
+    # same content, new mtime: re-hashed, not recompiled
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert compiled_rules(p) is rs
+
+    _write_rules(p, terms='["maybe","might"]')
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    assert compiled_rules(p) is not rs
+    r = validate_narrative("they might win", "CONTROLLED", rules_path=p)
+    assert r["decision"] == "DENY" and r["hits"][0]["detail"] == "terms=['might']"
+
+
+def test_deny_terms_listed_in_rule_order(tmp_path):
+    p = tmp_path / "rules.yaml"
+    _write_rules(p, terms='["perhaps","maybe","perhaps"]')
+    r = validate_narrative("maybe, perhaps", "CONTROLLED", rules_path=p)
+    assert r["hits"] == [{"rule": "DENY_UNCERTAINTY", "detail": "terms=['perhaps', 'maybe', 'perhaps']"}]
+
+
+def test_bad_rewrite_regex_fails_closed_only_in_its_state(tmp_path):
+    p = tmp_path / "rules.yaml"
+    _write_rules(p, contested="(winning")
+    assert validate_narrative("winning", "CONTROLLED", rules_path=p)["decision"] == "PASS"
+    r = validate_narrative("winning", "CONTESTED", rules_path=p)
+    assert r["decision"] == "DENY"
+    assert r["hits"][0]["detail"].startswith("rewrite_contested_regex:bad regex:")
+
+
+def test_missing_rules_file_fails_closed(tmp_path):
+    r = validate_narrative("ok", "CONTROLLED", rules_path=tmp_path / "nope.yaml")
+    assert r["decision"] == "DENY" and r["hits"][0]["detail"].startswith("rules_load:rules file not found")
+
+
+def test_validate_narratives_matches_per_item_in_input_order():
+    texts = [
+        "Takım üstün.",
+        "maybe the pass was key",
+        "Top oyunda.",
+        'dedi ki: "maybe"',
+        "State: UNVALIDATED (veri eksikliği)",
+        'tek tırnak "açık',
+        None,
+        "> maybe quoted away\nObservation: pas",
+        "Takım üstün.",
+        "perhaps\nmaybe",
+    ]
+    states = ["CONTESTED", "CONTROLLED", " dead_ball ", None, "UNVALIDATED", "CONTROLLED", "CONTESTED", "DEAD_BALL", "CONTROLLED", "CONTESTED"]
+    out = validate_narratives(texts, states)
+    assert out == [validate_narrative(t, s) for t, s in zip(texts, states)]
+    assert [r["decision"] for r in out] == ["REWRITE", "DENY", "REWRITE", "PASS", "PASS", "DENY", "DENY", "PASS", "PASS", "DENY"]
+
+
+def test_validate_narratives_process_pool_keeps_order(monkeypatch):
+    monkeypatch.setattr(forensic_guard, "POOL_MIN_TEXTS", 1)
+    texts = [f"pas {i}" + (" maybe" if i % 7 == 0 else "") for i in range(40)]
+    states = ["CONTESTED" if i % 3 else "CONTROLLED" for i in range(40)]
+    assert validate_narratives(texts, states, jobs=3) == validate_narratives(texts, states)
+
+
+def test_validate_narratives_length_mismatch_raises():
+    with pytest.raises(ValueError, match="texts_states_length_mismatch"):
+        validate_narratives(["a", "b"], ["CONTROLLED"])
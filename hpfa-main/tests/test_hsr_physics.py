@@ -1,6 +1,9 @@
+import random
+
+import numpy as np
 import pytest
 
-from hpfa.security.hsr_physics import PhysicsRing, validate_physics
+from hpfa.security.hsr_physics import PhysicsRing, PhysicsRingBank, validate_physics
 
 
 def test_physics_pass_normal_speed():
@@ -38,3 +41,71 @@ def test_physics_fail_closed_nonpositive_dt():
     with pytest.raises(ValueError) as e:
         validate_physics({"event_start_time": 1.0, "x": 1.0, "y": 1.0}, ring)
     assert "HSR_FAIL_CLOSED:physics:nonpositive_dt" in str(e.value)
+
+
+def _scalar_bank(rings, players, ts, xs, ys):
+    out = []
+    for p, t, x, y in zip(players, ts, xs, ys):
+        if p is None:
+            out.append("HSR_FAIL_CLOSED:physics:missing_player")
+            continue
+        ring = rings.setdefault(p, PhysicsRing())
+        try:
+            validate_physics({"event_start_time": t, "x": x, "y": y}, ring)
+            out.append(None)
+        except ValueError as e:
+            out.append(str(e))
+    return out
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_ring_bank_matches_per_event_rings(seed):
+    rng = random.Random(seed)
+    bank = PhysicsRingBank()
+    rings = {}
+    clock = 0.0
+    pos = {}
+    for _ in range(3):  # batches share ring state
+        players, ts, xs, ys = [], [], [], []
+        for _ in range(400):
+            p = rng.choice([7, 9, 11, None] if seed % 2 else [7, 9, 11])
+            clock += rng.choice([0.0, 0.1, 0.5, 1.0]) if rng.random() > 0.02 else -2.0
+            bx, by = pos.get(p, (50.0, 34.0))
+            step = rng.choice([0.5, 1.0, 3.0]) if rng.random() > 0.1 else 40.0
+            pos[p] = (bx + rng.uniform(-step, step), by + rng.uniform(-step, step))
+            players.append(p)
+            ts.append(clock if rng.random() > 0.01 else None)
+            xs.append(pos[p][0] if rng.random() > 0.01 else "n/a")
+            ys.append(pos[p][1])
+        batch = bank.validate_arrays(players, ts, xs, ys)
+        ref = _scalar_bank(rings, players, ts, xs, ys)
+        assert batch.reasons() == ref
+        assert batch.violation.tolist() == [r is not None for r in ref]
+        for p, ring in rings.items():
+            got = bank.rings[p]
+            assert (got.prev_t, got.prev_x, got.prev_y) == (ring.prev_t, ring.prev_x, ring.prev_y)
+
+
+def test_ring_bank_vetoed_event_is_not_committed():
+    bank = PhysicsRingBank(max_speed_mps=12.0)
+    # 0 -> teleport (veto) -> 6m/s from the committed origin, not from the teleport
+    batch = bank.validate_arrays(np.array([4, 4, 4]), np.array([0.0, 1.0, 2.0]), np.array([0.0, 90.0, 12.0]), np.zeros(3))
+    assert batch.violation.tolist() == [False, True, False]
+    assert batch.reasons()[1].startswith("HSR_PHYSICS_VIOLATION:speed=90.00")
+    assert batch.speed[2] == pytest.approx(6.0)
+    assert (bank.rings[4].prev_t, bank.rings[4].prev_x) == (2.0, 12.0)
+
+
+def test_ring_bank_many_vetoes_in_one_batch():
+    # wrong seed: every later point is far until enough time has passed
+    bank = PhysicsRingBank()
+    n = 300
+    players, ts, xs, ys = [1] * n, list(range(n)), [0.0] + [1000.0 + i for i in range(n - 1)], [0.0] * n
+    batch = bank.validate_arrays(players, ts, xs, ys)
+    assert batch.reasons() == _scalar_bank({}, players, ts, xs, ys)
+
+
+def test_ring_bank_length_mismatch_fails_closed():
+    with pytest.raises(ValueError) as e:
+        PhysicsRingBank().validate_arrays([1, 2], [0.0], [0.0, 1.0], [0.0, 1.0])
+    assert "HSR_FAIL_CLOSED:physics:column_length_mismatch" in str(e.value)
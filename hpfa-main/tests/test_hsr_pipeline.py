@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from hpfa.core.state_machine import PossessionStateMachine
+from hpfa.security.hsr_context import validate_context
+from hpfa.security.hsr_dead_ball import validate_dead_ball
+from hpfa.security.hsr_nas import NASRing
+from hpfa.security.hsr_physics import PhysicsRing, validate_physics
+from hpfa.security.hsr_pipeline import (
+    HSR_NAS_TRIGGER,
+    HSR_R3_DEAD_BALL,
+    HSR_R4_PHYSICS,
+    HSR_R5_CONTEXT,
+    HSRPipeline,
+)
+
+
+def _match(seed, n=600):
+    rng = random.Random(seed)
+    sm = PossessionStateMachine()
+    ts = 0.0
+    pos = {}
+    out = []
+    for i in range(n):
+        ts += rng.choice([0.0, 0.1, 0.2, 0.5, 1.0])
+        team = rng.choice(["A", "B"])
+        player = rng.choice([f"{team}{k}" for k in range(4)] + [None] * (seed % 2))
+        bx, by = pos.get(player, (52.5, 34.0))
+        step = 30.0 if rng.random() < 0.05 else 2.0
+        pos[player] = (bx + rng.uniform(-step, step), by + rng.uniform(-step, step))
+        e = {
+            "event_id": f"e{i}",
+            "event_type": rng.choice(["PASS", "PASS", "TACKLE", "INTERCEPTION", "OUT", "RESTART_THROWIN", "DRIBBLE"]),
+            "team_id": team,
+            "player_id": player,
+            "event_start_time": ts,
+            "outcome": rng.choice(["success", "fail", "fail", None]),
+            "x": pos[player][0],
+            "y": pos[player][1] if rng.random() > 0.01 else None,
+        }
+        out.append(sm.update(e)[0])
+    return out
+
+
+def _chained(events, window=3):
+    # the per-event chain callers wrote by hand, with prev context injected
+    rings = {}
+    nas = NASRing(window_events=window)
+    prev_state = prev_time = None
+    masks, reasons = [], []
+    for src in events:
+        e = dict(src)
+        if e.get("prev_state_id") is None:
+            e["prev_state_id"] = prev_state
+        if e.get("prev_event_time") is None:
+            e["prev_event_time"] = prev_time
+        m, r = 0, []
+        try:
+            validate_dead_ball(e)
+        except ValueError as ex:
+            m |= HSR_R3_DEAD_BALL
+            r.append(str(ex))
+        try:
+            if e.get("player_id") is None:
+                raise ValueError("HSR_FAIL_CLOSED:physics:missing_player")
+            validate_physics(e, rings.setdefault(e["player_id"], PhysicsRing()))
+        except ValueError as ex:
+            m |= HSR_R4_PHYSICS
+            r.append(str(ex))
+        try:
+            validate_context(e)
+        except ValueError as ex:
+            m |= HSR_R5_CONTEXT
+            r.append(str(ex))
+        nas.update(e)
+        if e["nas_flag"]:
+            m |= HSR_NAS_TRIGGER
+            r.append(e["nas_reason"])
+        prev_state, prev_time = src.get("state_id"), src.get("event_start_time")
+        masks.append(m)
+        reasons.append(tuple(r))
+    return masks, reasons
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pipeline_matches_chained_validators(seed):
+    events = _match(seed)
+    batch = HSRPipeline().run(events)
+    masks, reasons = _chained(events)
+    assert batch.masks == masks
+    assert batch.reasons == reasons
+    assert any(m & HSR_R4_PHYSICS for m in masks) and any(m & HSR_R5_CONTEXT for m in masks)
+
+
+def test_pipeline_carries_prev_context_without_injection():
+    pipe = HSRPipeline()
+    first = {"event_type": "OUT", "state_id": "DEAD_BALL", "team_id": "A", "player_id": 1, "event_start_time": 1.0, "x": 0, "y": 0}
+    second = {"event_type": "TACKLE", "state_id": "CONTROLLED", "team_id": "B", "player_id": 2, "event_start_time": 2.0, "x": 0, "y": 0}
+    m1, r1 = pipe.step(first)
+    assert r1 == ("HSR_FAIL_CLOSED:context:missing_fields",)  # no previous event yet
+    m2, r2 = pipe.step(second)
+    assert m2 & HSR_R3_DEAD_BALL and "HSR_DEAD_BALL_VIOLATION:TACKLE" in r2
+    assert m2 & HSR_R5_CONTEXT and "HSR_CONTEXT_VIOLATION:cooldown_breach" in r2
+
+
+def test_pipeline_annotates_nas_hsr_flags():
+    events = _match(1, n=50)
+    batch = HSRPipeline().run(events, annotate=True)
+    for e, m in zip(events, batch.masks):
+        assert e["hsr_flags"] == {
+            "ring3_dead_ball_veto": bool(m & HSR_R3_DEAD_BALL),
+            "ring4_physics_veto": bool(m & HSR_R4_PHYSICS),
+        }
+
+
+def test_pipeline_non_dict_event_fails_closed_in_every_ring():
+    mask, reasons = HSRPipeline().step(["not", "a", "dict"])
+    assert mask & HSR_R3_DEAD_BALL and mask & HSR_R4_PHYSICS and mask & HSR_R5_CONTEXT
+    assert len(reasons) == 4
+
+
+def test_pipeline_string_timestamps_reach_context_ring():
+    pipe = HSRPipeline()
+    evs = [
+        {"event_type": "OUT", "state_id": "DEAD_BALL", "team_id": "A", "player_id": 1, "event_start_time": 1.0, "x": 0, "y": 0},
+        {"event_type": "TACKLE", "state_id": "CONTROLLED", "team_id": "B", "player_id": 2, "event_start_time": " 2.0 ", "x": 0, "y": 0},
+        {"event_type": "PASS", "state_id": "CONTROLLED", "team_id": "B", "player_id": 2, "event_start_time": "1.5", "x": 0, "y": 0},
+        {"event_type": "PASS", "state_id": "CONTROLLED", "team_id": "B", "player_id": 2, "event_start_time": "n/a", "x": 0, "y": 0},
+    ]
+    batch = pipe.run(evs)
+    assert "HSR_CONTEXT_VIOLATION:cooldown_breach" in batch.reasons[1]
+    assert "HSR_CONTEXT_VIOLATION:time_non_monotonic" in batch.reasons[2]
+    assert "HSR_FAIL_CLOSED:context:missing_fields" in batch.reasons[3]
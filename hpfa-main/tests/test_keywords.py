@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from hpfa.analytics.keywords import FAMILIES, REGAIN, SETPIECE, SHOT, TURNOVER, KeywordClassifier, kw_mask, kw_masks, phase_proxy
+
+
+def _scan(text):
+    # the report tools' original rule, one family at a time
+    t = (text or "").strip().lower()
+    return sum(bit for bit, kws in FAMILIES.items() if any(k in t for k in kws))
+
+
+def test_matches_per_family_substring_scan():
+    rng = random.Random(0)
+    words = [k for kws in FAMILIES.values() for k in kws] + ["Pas", "İsabetli", "TOP KAYBI", "ŞUT", " ", "xyz", "Penaltı"]
+    texts = [None, "", "  Serbest Vuruş  "] + [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(500)]
+    for t in texts:
+        assert kw_mask(t) == _scan(t), t
+    assert kw_masks(texts).tolist() == [_scan(t) for t in texts]
+
+
+def test_overlapping_keywords_keep_every_family():
+    assert kw_mask("serbest vuruş") == SETPIECE | SHOT
+    assert kw_mask("kafa vuruşu") == SHOT
+    c = KeywordClassifier({1: ("ab",), 2: ("abc",), 4: ("bc",)})
+    assert c.mask("xabcx") == 7 and c.mask("ab") == 1 and KeywordClassifier({}).mask("ab") == 0
+
+
+@pytest.mark.parametrize("mask,phase", [
+    (SETPIECE | TURNOVER, "F5/F6"), (TURNOVER | REGAIN, "F3"), (REGAIN | SHOT, "F4"), (SHOT, "OPEN"), (0, "OPEN"),
+])
+def test_phase_proxy_priority(mask, phase):
+    assert phase_proxy(mask) == phase
@@ -0,0 +1,66 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from hpfa.analytics.latency import next_event_latency
+
+
+def _match(seed, n=800):
+    rng = random.Random(seed)
+    times = [rng.choice([float("nan")] + [round(rng.uniform(0, 600), 1)] * 20) for _ in range(n)]
+    src = [rng.random() < 0.15 for _ in range(n)]
+    dst = [rng.random() < 0.1 for _ in range(n)]
+    teams = [rng.choice(["A", "B", "C"]) for _ in range(n)]
+    return times, src, dst, teams
+
+
+def _linear(times, src, dst, teams, inclusive=True):
+    # the report tools' original scan: per team sorted X times, first one >= (>) t0
+    out = {}
+    for i, t0 in enumerate(times):
+        if not src[i] or math.isnan(t0):
+            continue
+        xs = sorted(times[j] for j in range(len(times)) if dst[j] and teams[j] == teams[i] and not math.isnan(times[j]))
+        t1 = next((t for t in xs if (t >= t0 if inclusive else t > t0)), None)
+        out[i] = None if t1 is None else t1 - t0
+    return out
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("inclusive", [True, False])
+def test_matches_linear_scan(seed, inclusive):
+    times, src, dst, teams = _match(seed)
+    lat = next_event_latency(times, src, dst, groups=teams, inclusive=inclusive)
+    ref = _linear(times, src, dst, teams, inclusive)
+    assert lat.from_rows.tolist() == sorted(ref)
+    for row, dt, to in zip(lat.from_rows.tolist(), lat.dt.tolist(), lat.to_rows.tolist()):
+        if ref[row] is None:
+            assert math.isnan(dt) and to == -1
+        else:
+            assert dt == ref[row]
+            assert times[to] - times[row] == dt and teams[to] == teams[row] and dst[to]
+
+    by = lat.by_group(0, 30)
+    for team, dts in by.items():
+        want = [ref[i] for i in sorted(ref) if teams[i] == team and ref[i] is not None and 0 <= ref[i] <= 30]
+        assert dts.tolist() == want
+
+
+def test_ties_pick_earliest_row_and_same_event_counts_when_inclusive():
+    times = [5.0, 5.0, 5.0, 9.0]
+    src = [True, False, False, False]
+    dst = [True, True, True, True]
+    assert next_event_latency(times, src, dst).to_rows.tolist() == [0]
+    assert next_event_latency(times, src, dst, inclusive=False).to_rows.tolist() == [3]
+
+
+def test_no_groups_and_length_mismatch():
+    lat = next_event_latency(np.array([1.0, 2.0, 4.0]), [True, True, False], [False, False, True])
+    assert lat.dt.tolist() == [3.0, 2.0]
+    assert list(lat.by_group(hi=2.5)) == [0] and lat.by_group(hi=2.5)[0].tolist() == [2.0]
+    with pytest.raises(ValueError, match="LATENCY_FAIL_CLOSED:column_length_mismatch"):
+        next_event_latency([1.0, 2.0], [True], [True, True])
+    with pytest.raises(ValueError, match="LATENCY_FAIL_CLOSED:column_length_mismatch"):
+        next_event_latency([1.0, 2.0], [True, True], [True, True], groups=["A"])
@@ -0,0 +1,95 @@
+import json
+import math
+import os
+import random
+
+import numpy as np
+import pytest
+
+from hpfa.io.event_store import ColumnBuilder, stream_paths
+from hpfa.io.match import UNKNOWN_TEAM, clear_cache, load_match, pitch_scale, player_of_code, to_105_68
+
+
+def _records(seed, n=200, scale=1.0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        code = rng.choice([None, "", "Start of the 1st half", f"{rng.randint(1, 30)}. Oyuncu {i % 7} ({i % 7}) - Top Taşıma", "Ali (1) - Gol"])
+        has_xy = rng.random() < 0.8
+        out.append({
+            "t_start": rng.choice([None, round(rng.uniform(0, 5400), 2)]),
+            "half": rng.choice([1, 2, None]),
+            "action": rng.choice([None, "Top Taşıma", "Gol"]),
+            "code": code,
+            "x": round(rng.uniform(0, 105) * scale, 3) if has_xy else None,
+            "y": round(rng.uniform(0, 68) * scale, 3) if has_xy else rng.choice([None, 1.0]),
+            "team_raw": rng.choice([None, "Galatasaray (29205)", "Caykur Rizespor (62850)"]),
+        })
+    return out
+
+
+def _write(d, records, npz=True):
+    npz_path, jsonl_path = stream_paths(str(d))
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    if npz:
+        b = ColumnBuilder()
+        for r in records:
+            b.add(r)
+        st = os.stat(jsonl_path)
+        b.save(npz_path, source_size=st.st_size, source_mtime_ns=st.st_mtime_ns)
+    return str(d)
+
+
+@pytest.mark.parametrize("npz", [True, False])
+def test_columns_match_per_record_helpers(tmp_path, npz):
+    recs = _records(0)
+    md = load_match(_write(tmp_path, recs, npz))
+    assert md.n == len(recs)
+    for i, r in enumerate(recs):
+        assert md.action[i] == (r["action"] or "")
+        assert md.code[i] == (r["code"] or "")
+        assert md.team_raw[i] == (r["team_raw"] or "")
+        assert md.team[i] == (r["team_raw"] or UNKNOWN_TEAM)
+        assert md.player[i] == player_of_code(r["code"])
+        assert md.half[i] == (r["half"] or 0)
+        ok = r["x"] is not None and r["y"] is not None
+        assert md.has_xy[i] == ok
+        if ok:
+            x = 105.0 - r["x"] if r["half"] == 2 else r["x"]
+            assert (md.x105[i], md.y68[i]) == (x, r["y"])
+        else:
+            assert math.isnan(md.x105[i])
+        assert (md.t_start[i] == r["t_start"]) or (r["t_start"] is None and math.isnan(md.t_start[i]))
+    assert md.rows("player", "half")[:3] == [(player_of_code(r["code"]), r["half"] or 0) for r in recs[:3]]
+    with pytest.raises(ValueError):
+        md.x[0] = 1.0  # shared copy is read-only
+
+
+def test_memoized_until_the_file_changes(tmp_path):
+    clear_cache()
+    d = _write(tmp_path, _records(1))
+    md = load_match(d)
+    assert load_match(d) is md
+    assert load_match(stream_paths(d)[1]) is md  # dir and JSONL path share one entry
+
+    _write(tmp_path, _records(2, n=50))
+    st = os.stat(stream_paths(d)[1])
+    os.utime(stream_paths(d)[1], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    md2 = load_match(d)
+    assert md2 is not md and md2.n == 50
+
+
+def test_pitch_scale_detection_and_half_flip():
+    half = np.array([1, 2, 0])
+    x = np.array([0.5, 0.25, np.nan])
+    y = np.array([0.5, 1.0, 0.1])
+    assert pitch_scale(x, y) == "unit"
+    xm, ym = to_105_68(x, y, half)
+    assert xm[0] == 0.5 * 105.0 and xm[1] == 105.0 - 0.25 * 105.0 and ym[1] == 68.0
+
+    assert pitch_scale(np.array([50.0, 99.0]), np.array([10.0, 90.0])) == "percent"
+    # metres data stays metres even when every x is inside 0..100
+    assert pitch_scale(np.array([50.0, 99.0]), np.array([10.0, 67.0])) == "m"
+    assert pitch_scale(np.array([np.nan]), np.array([np.nan])) == "m"
@@ -1,6 +1,8 @@
+import random
+
 import pytest
 
-from hpfa.analytics.nas import NASDetector
+from hpfa.analytics.nas import NASDetector, NASStream
 
 
 def _e(ts, phase="DEFENSIVE", state="CONTROLLED", action="X", outcome="FAIL", zone=1, p=5.0, r3=False, r4=False, eid=None):
@@ -86,3 +88,64 @@ def test_nas_extended_failure_chain_should_count_as_single_sequence():
     assert res.status == "PASS"
     assert res.nas_sequence_count == 1
     assert res.sequences[0].fail_count == 5
+
+
+def test_nas_stream_emits_sequence_when_chain_closes():
+    st = NASStream()
+    assert [st.push(e) for e in [_e(10.0, eid="a"), _e(10.3, eid="b"), _e(10.6, eid="c")]] == [None, None, None]
+    seq = st.push(_e(10.7, outcome="SUCCESS"))
+    assert seq is not None and seq.event_ids == ["a", "b", "c"]
+    res = st.close()
+    assert res.status == "PASS" and res.sequences == [seq]
+
+
+def _random_match(seed, n=400):
+    rng = random.Random(seed)
+    t = 0.0
+    out = []
+    for i in range(n):
+        t += rng.choice([0.0, 0.1, 0.2, 0.3, 0.4, 0.6])
+        out.append(_e(
+            t,
+            phase=rng.choice(["DEFENSIVE", "DEFENSIVE", "TRANSITION", "ATTACK"]),
+            state=rng.choice(["CONTROLLED"] * 9 + ["DEAD_BALL"]),
+            outcome=rng.choice(["FAIL", "FAIL", "FAIL", "fail", "SUCCESS"]),
+            zone=rng.choice([1, 2]),
+            p=rng.choice([1, 2.5, "4"]),
+            r3=rng.random() < 0.03,
+            r4=rng.random() < 0.03,
+            eid=f"e{i}" if rng.random() < 0.8 else None,
+        ))
+    return out
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nas_stream_matches_evaluate(seed):
+    events = _random_match(seed)
+    for max_dt, min_fail in [(0.5, 3), (0.3, 2)]:
+        ref = NASDetector(max_dt_s=max_dt, min_fail_count=min_fail).evaluate(events)
+        st = NASStream(max_dt_s=max_dt, min_fail_count=min_fail)
+        emitted = []
+        for k in range(0, len(events), 7):
+            emitted += st.push_many(events[k:k + 7])
+        res = st.close()
+        assert res == ref
+        assert emitted == ref.sequences[:len(emitted)]
+        assert len(ref.sequences) - len(emitted) <= 1
+
+
+def test_nas_stream_out_of_order_fails_closed():
+    st = NASStream()
+    st.push_many([_e(10.0), _e(9.0)])
+    res = st.close()
+    assert res.status == "UNVALIDATED"
+    assert res.reason == "NAS_FAIL_CLOSED:out_of_order:index=1"
+
+
+def test_nas_stream_missing_field_wins_over_earlier_bad_type_like_evaluate():
+    events = [_e(10.0, p="x"), _e(10.3)]
+    del events[1]["zone_id"]
+    st = NASStream()
+    st.push_many(events)
+    assert st.close() == NASDetector().evaluate(events)
+    assert st.close().reason == "NAS_FAIL_CLOSED:missing_zone_id"
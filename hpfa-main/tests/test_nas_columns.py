@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pytest
+
+from hpfa.analytics.nas import NASDetector
+from hpfa.analytics.nas_columns import columns_from_events, evaluate_columns, sweep_columns, sweep_events
+
+
+def _random_match(seed, n=600):
+    rng = random.Random(seed)
+    t = 0.0
+    out = []
+    for i in range(n):
+        t += rng.choice([0.0, 0.1, 0.2, 0.3, 0.4, 0.6])
+        d = {
+            "event_start_time": rng.choice([t, t, str(t), f" {t} "]),
+            "phase": rng.choice(["DEFENSIVE", "DEFENSIVE", " TRANSITION ", "ATTACK", "defensive"]),
+            "state_id": rng.choice(["CONTROLLED"] * 9 + ["DEAD_BALL"]),
+            "action_type": "X",
+            "outcome": rng.choice(["FAIL", "FAIL", "fail", " Fail", "SUCCESS"]),
+            "zone_id": rng.choice([1, 2, "1", 2.0]),
+            "pressure_level": rng.choice([1, 2.5, "4", True]),
+            "hsr_flags": {"ring3_dead_ball_veto": rng.random() < 0.03, "ring4_physics_veto": rng.choice([False] * 30 + [True, None, 1])},
+        }
+        if rng.random() < 0.8:
+            d["event_id"] = rng.choice([f"e{i}", f" e{i} ", " "])
+        out.append(d)
+    if seed % 2:
+        rng.shuffle(out)
+    return out
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_evaluate_columns_matches_scalar_on_lists(seed):
+    events = _random_match(seed)
+    for max_dt, min_fail in [(0.5, 3), (0.3, 2), (1.0, 1)]:
+        ref = NASDetector(max_dt_s=max_dt, min_fail_count=min_fail).evaluate(events)
+        assert evaluate_columns(columns_from_events(events), max_dt, min_fail) == ref
+
+
+def test_evaluate_columns_matches_scalar_on_typed_arrays():
+    rng = random.Random(3)
+    n = 3000
+    ts = np.round(np.cumsum(rng.choices([0.1, 0.2, 0.3, 0.7], k=n)), 2)
+    cols = {
+        "event_id": np.array([f"e{i}" for i in range(n)]),
+        "event_start_time": ts,
+        "phase": np.array(rng.choices(["DEFENSIVE", "TRANSITION", "ATTACK"], k=n)),
+        "state_id": np.array(rng.choices(["CONTROLLED"] * 9 + ["DEAD_BALL"], k=n)),
+        "action_type": np.array(["X"] * n),
+        "outcome": np.array(rng.choices(["FAIL", "Fail", "SUCCESS"], k=n)),
+        "zone_id": np.array(rng.choices([1, 2, 3], k=n)),
+        "pressure_level": np.array(rng.choices([1.0, 2.5, 4.0], k=n)),
+        "ring3_dead_ball_veto": np.array(rng.choices([False] * 30 + [True], k=n)),
+        "ring4_physics_veto": np.array(rng.choices([0] * 30 + [1], k=n)),
+    }
+    events = [
+        {
+            "event_id": str(cols["event_id"][i]),
+            "event_start_time": float(ts[i]),
+            "phase": str(cols["phase"][i]),
+            "state_id": str(cols["state_id"][i]),
+            "action_type": "X",
+            "outcome": str(cols["outcome"][i]),
+            "zone_id": int(cols["zone_id"][i]),
+            "pressure_level": float(cols["pressure_level"][i]),
+            "hsr_flags": {
+                "ring3_dead_ball_veto": bool(cols["ring3_dead_ball_veto"][i]),
+                "ring4_physics_veto": bool(cols["ring4_physics_veto"][i]),
+            },
+        }
+        for i in range(n)
+    ]
+    ref = NASDetector(max_dt_s=0.5, min_fail_count=2).evaluate(events)
+    assert ref.nas_sequence_count > 0
+    assert evaluate_columns(cols, 0.5, 2) == ref
+
+
+def test_evaluate_columns_fail_closed_reasons_match_scalar():
+    events = _random_match(0, n=20)
+    cols = columns_from_events(events)
+
+    missing = dict(cols)
+    del missing["ring4_physics_veto"]
+    res = evaluate_columns(missing)
+    assert res.status == "UNVALIDATED"
+    assert res.reason == "NAS_FAIL_CLOSED:missing_hsr_flags.ring4_physics_veto"
+
+    short = dict(cols, zone_id=cols["zone_id"][:-1])
+    assert evaluate_columns(short).reason == "NAS_FAIL_CLOSED:column_length_mismatch"
+
+    events[5]["pressure_level"] = "high"
+    ref = NASDetector().evaluate(events)
+    assert ref.reason == "NAS_FAIL_CLOSED:bad_field_type"
+    assert evaluate_columns(columns_from_events(events)) == ref
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sweep_matches_per_setting_evaluate(seed):
+    events = _random_match(seed)
+    dts = [0.1, 0.25, 0.5, 1.0]
+    mins = [1, 2, 3, 5]
+    sw = sweep_events(events, dts, mins)
+    assert sw.status == "PASS"
+    assert [(r.max_dt_s, r.min_fail_count) for r in sw.rows] == [(d, m) for d in dts for m in mins]
+    for d in dts:
+        for m in mins:
+            assert sw.result(d, m) == NASDetector(max_dt_s=d, min_fail_count=m).evaluate(events)
+    # a chain found under several settings is built once
+    by_setting = {(r.max_dt_s, r.min_fail_count): r.sequences for r in sw.rows}
+    for seq in by_setting[(0.5, 3)]:
+        assert any(other is seq for other in by_setting[(0.5, 2)])
+
+
+def test_sweep_fail_closed_is_data_level():
+    events = _random_match(0, n=10)
+    del events[4]["zone_id"]
+    sw = sweep_events(events, [0.5], [3])
+    assert sw.status == "UNVALIDATED" and sw.rows == []
+    assert sw.result(0.5, 3) == NASDetector().evaluate(events)
+
+    cols = columns_from_events(_random_match(1, n=10))
+    del cols["phase"]
+    assert sweep_columns(cols, [0.5], [3]).reason == "NAS_FAIL_CLOSED:missing_phase"
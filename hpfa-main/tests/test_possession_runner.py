@@ -0,0 +1,114 @@
+import json
+import shutil
+from pathlib import Path
+
+from hpfa.core import possession_runner
+from hpfa.core.possession_runner import OUTPUT_NAME, run_season
+from hpfa.core.state_machine import PossessionStateMachine
+
+
+def _write_match(d, n, team_b):
+    d.mkdir()
+    evs = []
+    t = 0.0
+    for i in range(n):
+        t += 1.0
+        e_type = "RESTART_KICKOFF" if i % 5 == 0 else "PASS"
+        evs.append({"id": i, "event_type": e_type, "team_id": 1 if i % 10 < 5 else team_b, "event_start_time": t, "outcome": "success"})
+    with open(d / "canonical_outfield.jsonl", "w", encoding="utf-8") as f:
+        for e in evs:
+            f.write(json.dumps(e) + "\n")
+    return evs
+
+
+def _read(p):
+    return [json.loads(l) for l in p.read_text(encoding="utf-8").splitlines()]
+
+
+def test_parallel_runner_is_deterministic_per_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(possession_runner, "CHUNK_EVENTS", 7)
+    season = tmp_path / "season"
+    season.mkdir()
+    matches = {name: _write_match(season / name, n, 2) for name, n in [("m_a", 40), ("m_b", 25), ("m_c", 33)]}
+
+    summary = run_season(str(season), jobs=1)
+    serial = {name: _read(season / name / OUTPUT_NAME) for name in matches}
+
+    summary_par = run_season(str(season), jobs=3)
+    for name, evs in matches.items():
+        got = _read(season / name / OUTPUT_NAME)
+        assert got == serial[name]
+        sm = PossessionStateMachine()
+        assert got == [sm.update(e)[0] for e in evs]
+        assert got[0]["possession_id"] == "p000001"
+
+    assert [r["match"] for r in summary_par["matches"]] == ["m_a", "m_b", "m_c"]
+    assert summary["n_failed"] == summary_par["n_failed"] == 0
+    assert (season / "possession_summary.json").exists()
+
+
+def test_runner_fails_closed_on_bad_line(tmp_path):
+    season = tmp_path / "season"
+    season.mkdir()
+    _write_match(season / "ok", 5, 2)
+    bad = season / "bad"
+    bad.mkdir()
+    (bad / "canonical_outfield.jsonl").write_text('{"event_type": "PASS"}\n[1, 2]\n', encoding="utf-8")
+
+    summary = run_season(str(season), jobs=2)
+    rows = {r["match"]: r for r in summary["matches"]}
+    assert rows["ok"]["status"] == "PASS"
+    assert rows["bad"]["status"] == "FAIL"
+    assert "line_not_object:2" in rows["bad"]["reason"]
+    assert not (bad / OUTPUT_NAME).exists()
+
+
+def test_canonical_records_are_mapped_by_action_map(tmp_path):
+    amap = tmp_path / "engine_action_map.json"
+    amap.write_text(json.dumps({"mapping": {
+        "Start of the 1st half": {"canon_type": "PERIOD_START", "canon_subtype": "H1", "outcome": "SUCCESS", "is_meta": True},
+        "Korner": {"canon_type": "RESTART", "canon_subtype": "CORNER", "outcome": "UNKNOWN", "is_meta": False},
+        "Paslar adresi bulanlar": {"canon_type": "PASS", "canon_subtype": "GENERAL", "outcome": "SUCCESS", "is_meta": False},
+    }}), encoding="utf-8")
+    season = tmp_path / "season"
+    m = season / "rz"
+    m.mkdir(parents=True)
+    recs = [
+        {"id": 1, "t_start": 4.55, "action": "Start of the 1st half", "team_id": None},
+        {"id": 2, "t_start": 5.0, "action": "Korner", "team_id": 62850},
+        {"id": 3, "t_start": 6.0, "action": "Paslar adresi bulanlar", "team_id": 62850},
+        {"id": 4, "t_start": 7.0, "action": "Set Hücumu Oyunu", "team_id": 62850},
+        {"id": 5, "t_start": 8.0, "action": "Paslar adresi bulanlar", "team_id": 62850},
+    ]
+    (m / "canonical_outfield.jsonl").write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recs), encoding="utf-8")
+
+    row = run_season(str(season), jobs=1, action_map_path=amap)["matches"][0]
+    assert row["status"] == "PASS" and row["n_possessions"] == 1
+    assert (row["n_meta"], row["n_events"], row["bad_ratio"]) == (1, 4, 0.5)
+    got = _read(m / OUTPUT_NAME)
+    assert [r["id"] for r in got] == [2, 3, 4, 5]
+    assert [r["state_id"] for r in got] == ["CONTROLLED", "CONTROLLED", "UNVALIDATED", "ERROR"]
+    assert got[0]["sm_reason"] == "transition:DEAD_BALL+RESTART_CORNER->CONTROLLED_START"
+
+    row = run_season(str(season), jobs=1, action_map_path=amap, max_bad_ratio=0.4)["matches"][0]
+    assert row["reason"] == "POSSESSION_FAIL_CLOSED:bad_ratio:0.500>0.4"
+    assert not (m / OUTPUT_NAME).exists()
+
+
+def test_real_canonical_match_fails_closed_on_bad_ratio(tmp_path):
+    src = Path(__file__).resolve().parents[2] / "out" / "rz-gs-20260208" / "canonical_outfield.jsonl"
+    m = tmp_path / "season" / "rz-gs-20260208"
+    m.mkdir(parents=True)
+    shutil.copyfile(src, m / "canonical_outfield.jsonl")
+
+    # repo mapping: period markers dropped, most labels unmapped => mostly untagged, not a PASS
+    row = run_season(str(tmp_path / "season"), jobs=1)["matches"][0]
+    assert (row["n_meta"], row["n_events"]) == (4, 3221)
+    assert row["status"] == "FAIL" and row["reason"].startswith("POSSESSION_FAIL_CLOSED:bad_ratio:")
+    assert row["n_error"] + row["n_unvalidated"] == row["n_events"]
+    assert not (m / OUTPUT_NAME).exists()
+
+    row = run_season(str(tmp_path / "season"), jobs=1, max_bad_ratio=1.0)["matches"][0]
+    got = _read(m / OUTPUT_NAME)
+    assert row["status"] == "PASS" and len(got) == 3221
+    assert not {"Start of the 1st half", "Halftime", "End of the match"} & {r["action"] for r in got}
@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from hpfa.io.render import MANIFEST, FigureSpec, RenderOptions, pop_render_args, render_figures, render_reports, resolve_jobs, spec_key
+
+
+def draw_line(plt, xs, ys, title):
+    plt.plot(xs, ys)
+    plt.title(title)
+
+
+def _specs(n=6):
+    return [
+        FigureSpec(f"{i:02d}_line.png", draw_line, dict(xs=list(range(i + 2)), ys=[v * v for v in range(i + 2)], title=f"fig {i}"), dpi=60, figsize=(3, 2))
+        for i in range(n)
+    ]
+
+
+def _read(d, names):
+    return [open(os.path.join(d, n), "rb").read() for n in names]
+
+
+def _manifest(d):
+    with open(os.path.join(d, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+NO_CACHE = RenderOptions(cache=False)
+
+
+def test_parallel_output_is_serial_output_in_spec_order(tmp_path):
+    specs = _specs()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    names = render_figures(specs, str(tmp_path / "a"), NO_CACHE)
+    assert names == [s.name for s in specs]
+    assert render_figures(specs, str(tmp_path / "b"), RenderOptions(jobs=3, cache=False)) == names
+    assert _read(tmp_path / "a", names) == _read(tmp_path / "b", names)
+    assert _manifest(tmp_path / "b")["cache"] is None
+
+
+def test_same_name_keeps_last_spec(tmp_path):
+    first, second = _specs(2)
+    dup = FigureSpec(first.name, second.draw, second.params, dpi=second.dpi, figsize=second.figsize)
+    assert render_figures([first, dup], str(tmp_path), NO_CACHE) == [first.name, first.name]
+    (tmp_path / "ref").mkdir()
+    render_figures([second], str(tmp_path / "ref"), NO_CACHE)
+    assert _read(tmp_path, [first.name]) == _read(tmp_path / "ref", [second.name])
+
+
+def test_cache_hits_skip_rasterization_and_track_inputs(tmp_path, monkeypatch):
+    specs = _specs(4)
+    cache = RenderOptions(cache_dir=str(tmp_path / "cache"))
+    for d in ("a", "b", "c"):
+        (tmp_path / d).mkdir()
+    names = render_figures(specs, str(tmp_path / "a"), cache)
+    assert _manifest(tmp_path / "a")["cache"]["misses"] == 4
+
+    changed = specs[:3] + [FigureSpec(specs[3].name, draw_line, dict(specs[3].params, title="changed"), dpi=60, figsize=(3, 2))]
+    render_figures(changed, str(tmp_path / "b"), RenderOptions(jobs=2, cache_dir=cache.cache_dir))
+    m = _manifest(tmp_path / "b")
+    assert (m["cache"]["hits"], m["cache"]["misses"]) == (3, 1)
+    assert [f["cache"] for f in m["figures"]] == ["hit", "hit", "hit", "miss"]
+    assert _read(tmp_path / "a", names[:3]) == _read(tmp_path / "b", names[:3])
+
+    # a full hit never draws; re-rendering without the cache must not touch the linked entries
+    def boom(*a, **k):
+        raise AssertionError("rasterized a cached figure")
+
+    monkeypatch.setattr("hpfa.io.render._rasterize", boom)
+    render_figures(specs, str(tmp_path / "c"), cache)
+    assert _read(tmp_path / "c", names) == _read(tmp_path / "a", names)
+    monkeypatch.undo()
+    cached = _read(tmp_path / "cache", [f"{spec_key(s)}.png" for s in specs])
+    render_figures([FigureSpec(names[0], draw_line, dict(xs=[0, 1], ys=[1, 0], title="x"), dpi=60)], str(tmp_path / "c"), NO_CACHE)
+    assert _read(tmp_path / "cache", [f"{spec_key(s)}.png" for s in specs]) == cached
+
+
+def test_spec_key_encodes_values_and_types():
+    base = FigureSpec("f.png", draw_line, dict(xs=[1, 2], ys=np.array([1.0, 2.0]), title="t"))
+    assert spec_key(base) == spec_key(FigureSpec("other.png", draw_line, dict(title="t", ys=np.array([1.0, 2.0]), xs=[1, 2])))
+    for params in (dict(xs=[1.0, 2], ys=np.array([1.0, 2.0]), title="t"),
+                   dict(xs=(1, 2), ys=np.array([1.0, 2.0]), title="t"),
+                   dict(xs=[1, 2], ys=np.array([1.0, 2.5]), title="t"),
+                   dict(xs=[1, 2], ys=np.array([1.0, 2.0]), title="t ")):
+        assert spec_key(FigureSpec("f.png", draw_line, params)) != spec_key(base)
+    assert spec_key(FigureSpec("f.png", draw_line, base.params, dpi=101)) != spec_key(base)
+    import matplotlib
+
+    key = spec_key(base)
+    with matplotlib.rc_context({"lines.linewidth": 3.5}):
+        assert spec_key(base) != key
+    assert spec_key(base) == key
+    with pytest.raises(ValueError, match="RENDER_FAIL_CLOSED:unhashable_param:object"):
+        spec_key(FigureSpec("f.png", draw_line, dict(xs=object())))
+
+
+def test_render_flags():
+    assert pop_render_args(["m", "--jobs", "3", "o"]) == (["m", "o"], RenderOptions(jobs=3))
+    assert pop_render_args(["--jobs=2", "m", "--no-render-cache"]) == (["m"], RenderOptions(jobs=2, cache=False))
+    assert pop_render_args(["m", "--render-cache", "/c", "o"]) == (["m", "o"], RenderOptions(cache_dir="/c"))
+    assert pop_render_args(["m", "o"]) == (["m", "o"], RenderOptions())
+    assert resolve_jobs(0) == (os.cpu_count() or 1)
+    for bad in ("-1", "x", "1.5", ""):
+        with pytest.raises(ValueError, match="RENDER_FAIL_CLOSED:bad_jobs"):
+            resolve_jobs(bad)
+    with pytest.raises(ValueError, match="RENDER_FAIL_CLOSED:missing_value:--jobs"):
+        pop_render_args(["m", "--jobs"])
+
+
+def test_render_reports_one_pass_per_dir_manifests(tmp_path):
+    specs = _specs(4)
+    dirs = [str(tmp_path / d) for d in ("a", "b", "ref")]
+    for d in dirs:
+        os.mkdir(d)
+    cache = RenderOptions(jobs=2, cache_dir=str(tmp_path / "cache"))
+    assert render_reports([(specs[:2], dirs[0]), (specs[2:], dirs[1])], cache) == [[s.name for s in specs[:2]], [s.name for s in specs[2:]]]
+    render_figures(specs, dirs[2], NO_CACHE)
+    assert _read(dirs[0], [s.name for s in specs[:2]]) + _read(dirs[1], [s.name for s in specs[2:]]) == _read(dirs[2], [s.name for s in specs])
+    assert [f["name"] for f in _manifest(dirs[1])["figures"]] == [s.name for s in specs[2:]]
+    render_reports([(specs[:3], dirs[0]), (specs[3:], dirs[1])], cache)
+    assert (_manifest(dirs[0])["cache"]["hits"], _manifest(dirs[1])["cache"]["hits"]) == (3, 1)
+
+
+def test_tool_version_covers_imported_hpfa_modules(monkeypatch):
+    from hpfa.io import render
+
+    assert "hpfa.io.render" in render._repo_modules(__name__)
+    before = render._tool_version(draw_line)
+    monkeypatch.setitem(render._SOURCE_VERSIONS, render.__file__, "edited")
+    assert render._tool_version(draw_line) != before
+
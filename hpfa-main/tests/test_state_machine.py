@@ -64,3 +64,68 @@ def test_unknown_event_is_unvalidated():
     out, res = sm.update({"event_type": "WTF_EVENT", "team_id": "A", "event_start_time": 1.0})
     assert out["state_id"] == "UNVALIDATED"
     assert out["possession_effect"] == "NEUTRAL"
+
+
+def _random_stream(seed, n=600):
+    import random
+
+    rnd = random.Random(seed)
+    types = [
+        "RESTART_KICKOFF", "restart_throwin", "PASS", "DRIBBLE", "TACKLE", "INTERCEPTION",
+        "LOOSE_BALL", "OUT", "FOUL", "WTF_EVENT", "", None,
+    ]
+    teams = [1, 2, "A", " B ", 1.0, None]
+    outcomes = ["success", "fail", "FAILED", "weird", None]
+    events = []
+    ts = 0.0
+    for _ in range(n):
+        ts += rnd.choice([0.0, 0.2, 0.4, 0.7, 1.5])
+        e = {
+            "event_type": rnd.choice(types),
+            "team_id": rnd.choice(teams),
+            "event_start_time": rnd.choice([ts, ts, ts, str(ts), None]),
+        }
+        if rnd.random() < 0.8:
+            e["outcome"] = rnd.choice(outcomes)
+        events.append(e)
+    return events
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_run_columns_matches_dict_path(seed):
+    events = _random_stream(seed)
+
+    sm = PossessionStateMachine()
+    expected = [sm.update(e)[0] for e in events]
+
+    sm_b = PossessionStateMachine()
+    # split in two batches to cover state carry-over between calls
+    k = len(events) // 3
+    cols = []
+    for chunk in (events[:k], events[k:]):
+        cols.append(
+            sm_b.run_columns(
+                [e.get("event_type") for e in chunk],
+                [e.get("team_id") for e in chunk],
+                [e.get("event_start_time") for e in chunk],
+                [e.get("outcome") for e in chunk],
+            )
+        )
+
+    got = []
+    for c in cols:
+        for i in range(len(c.state_id)):
+            got.append((c.prev_state_id[i], c.state_id[i], c.possession_effect[i], c.possession_id[i], c.sm_reason[i]))
+    want = [(o["prev_state_id"], o["state_id"], o["possession_effect"], o["possession_id"], o["sm_reason"]) for o in expected]
+    assert got == want
+
+    assert (sm_b.state, sm_b.possession_id, sm_b.team_id, sm_b.last_ts, sm_b.last_team_id, sm_b._pos_counter) == (
+        sm.state, sm.possession_id, sm.team_id, sm.last_ts, sm.last_team_id, sm._pos_counter
+    )
+
+
+def test_run_columns_rejects_length_mismatch():
+    sm = PossessionStateMachine()
+    with pytest.raises(ValueError) as e:
+        sm.run_columns(["PASS"], [1, 2], [0.0])
+    assert "column_length_mismatch" in str(e.value)
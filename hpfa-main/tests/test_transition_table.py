@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+
+from hpfa.core.state_machine import HPFAState, PossessionEffect, PossessionStateMachine
+from hpfa.core.transition_table import compile_canon, parse_canon
+
+STATES = [s.value for s in HPFAState]
+EFFECTS = [e.value for e in PossessionEffect]
+
+
+def _branch_transition(prev_state, e_type, outcome):
+    """Reference: the pre-compilation branch logic of PossessionStateMachine._transition (v1.0.0)."""
+    if e_type in ("OUT", "FOUL"):
+        return HPFAState.DEAD_BALL, PossessionEffect.END, f"transition:any+{e_type}->DEAD_BALL"
+    if e_type == "LOOSE_BALL":
+        return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:any+LOOSE_BALL->CONTESTED_NEUTRAL"
+    if e_type.startswith("RESTART_"):
+        return HPFAState.CONTROLLED, PossessionEffect.START, f"transition:DEAD_BALL+{e_type}->CONTROLLED_START"
+    if e_type in ("PASS", "DRIBBLE"):
+        if outcome == "success":
+            if prev_state == HPFAState.CONTROLLED:
+                return (
+                    HPFAState.CONTROLLED,
+                    PossessionEffect.CONTINUE,
+                    f"transition:CONTROLLED+{e_type}_success->CONTROLLED_CONTINUE",
+                )
+            return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+{e_type}_success"
+        return HPFAState.UNVALIDATED, PossessionEffect.NEUTRAL, f"unvalidated:{prev_state.value}+{e_type}_missing_or_fail"
+    if e_type == "TACKLE":
+        if prev_state == HPFAState.CONTROLLED:
+            return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:CONTROLLED+TACKLE->CONTESTED_NEUTRAL"
+        if prev_state == HPFAState.CONTESTED:
+            return HPFAState.CONTESTED, PossessionEffect.NEUTRAL, "transition:CONTESTED+TACKLE->CONTESTED_NEUTRAL"
+        return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+TACKLE"
+    if e_type == "INTERCEPTION":
+        if prev_state in (HPFAState.CONTROLLED, HPFAState.CONTESTED):
+            return HPFAState.CONTROLLED, PossessionEffect.START, f"transition:{prev_state.value}+INTERCEPTION->CONTROLLED_START"
+        return HPFAState.ERROR, PossessionEffect.NEUTRAL, f"undefined_transition:{prev_state.value}+INTERCEPTION"
+    return HPFAState.UNVALIDATED, PossessionEffect.NEUTRAL, f"unknown_event:{e_type}"
+
+
+def _generated_cases():
+    events, _ = parse_canon(STATES, EFFECTS)
+    extra = ["RESTART_PENALTY", "RESTART_", "SHOT", "WTF_EVENT"]
+    for st in HPFAState:
+        for ev in events + extra:
+            for oc in (None, "success", "fail"):
+                yield st, ev, oc
+
+
+@pytest.mark.parametrize("prev_state,e_type,outcome", list(_generated_cases()))
+def test_compiled_table_matches_branch_logic(prev_state, e_type, outcome):
+    sm = PossessionStateMachine()
+    assert sm._transition(prev_state, e_type, outcome) == _branch_transition(prev_state, e_type, outcome)
+
+
+def test_reasons_are_interned():
+    t = compile_canon(STATES, EFFECTS)
+    a = t.reasons[t.lookup(STATES.index("CONTROLLED"), t.event_code("PASS"), 1)[2]]
+    b = t.reasons[t.lookup(STATES.index("CONTROLLED"), t.event_code("PASS"), 1)[2]]
+    assert a is b
+    assert len(t.reasons) == len(set(t.reasons))
+
+
+def test_canon_unknown_state_fails_closed(tmp_path: Path):
+    p = tmp_path / "sm.md"
+    p.write_text(
+        "## Canonical Events\n- PASS\n\n"
+        "## Transition Rules\n\n"
+        "| From State | Event | To State | Possession Effect |\n"
+        "|---|---|---|---|\n"
+        "| LIMBO | PASS | CONTROLLED | START |\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError) as e:
+        compile_canon(STATES, EFFECTS, p)
+    assert "SM_FAIL_CLOSED:canon_unknown_state:LIMBO" in str(e.value)
+
+
+def test_table_is_fixed_after_compile_and_unknown_types_share_rows():
+    t = compile_canon(STATES, EFFECTS)
+    n_cells = len(t.cells)
+    codes = {ev: t.event_code(ev) for ev in ("WTF_EVENT", "SHOT", "NOPE_1", "RESTART_PENALTY", "RESTART_GOALKICK")}
+    assert len(t.cells) == n_cells
+    assert codes["WTF_EVENT"] == codes["SHOT"] == codes["NOPE_1"] == t.undefined_code
+    assert codes["RESTART_PENALTY"] == codes["RESTART_GOALKICK"] != t.undefined_code
+    st, _, reason = t.lookup(STATES.index("ERROR"), codes["SHOT"], 0)
+    assert STATES[st] == "UNVALIDATED" and t.reason(reason, "SHOT") == "unknown_event:SHOT"
+
+
+def test_concurrent_lookups_agree_with_serial():
+    from concurrent.futures import ThreadPoolExecutor
+
+    evs = [f"EV_{i % 37}" for i in range(400)] + ["PASS", "RESTART_X", "TACKLE"] * 50
+    sm = PossessionStateMachine()
+    want = [sm._transition(HPFAState.CONTROLLED, e, "success") for e in evs]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        got = list(ex.map(lambda e: PossessionStateMachine()._transition(HPFAState.CONTROLLED, e, "success"), evs))
+    assert got == want
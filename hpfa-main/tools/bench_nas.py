@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NASDetector.evaluate (scalar, event dicts) vs evaluate_columns (numpy columns),
+plus a 50-point (max_dt_s, min_fail_count) sweep vs 50 scalar runs on one match.
+
+Synthetic season slice (N matches x ~3.5k events), deterministic seed.
+Fails (exit 1) if the paths disagree.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from hpfa.analytics.nas import NASDetector
+from hpfa.analytics.nas_columns import evaluate_columns, sweep_columns
+
+
+def synth_match(n: int = 3500, seed: int = 7) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    events: List[Dict[str, Any]] = []
+    ts = 0.0
+    for i in range(n):
+        ts += rnd.choice([0.1, 0.2, 0.3, 0.4, 0.8, 1.5])
+        events.append(
+            {
+                "event_id": f"e{i}",
+                "event_start_time": round(ts, 2),
+                "phase": rnd.choice(["DEFENSIVE", "DEFENSIVE", "TRANSITION", "ATTACK"]),
+                "state_id": "DEAD_BALL" if rnd.random() < 0.05 else "CONTROLLED",
+                "action_type": rnd.choice(["PASS", "TACKLE", "DUEL"]),
+                "outcome": "FAIL" if rnd.random() < 0.6 else "SUCCESS",
+                "zone_id": rnd.choice([1, 2, 3]),
+                "pressure_level": rnd.choice([1.0, 2.5, 4.0, 5.5]),
+                "hsr_flags": {"ring3_dead_ball_veto": rnd.random() < 0.02, "ring4_physics_veto": rnd.random() < 0.02},
+            }
+        )
+    return events
+
+
+def to_arrays(events: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    # typed columns, as loaded from a columnar store
+    return {
+        "event_id": np.array([e["event_id"] for e in events]),
+        "event_start_time": np.array([e["event_start_time"] for e in events], dtype=np.float64),
+        "phase": np.array([e["phase"] for e in events]),
+        "state_id": np.array([e["state_id"] for e in events]),
+        "action_type": np.array([e["action_type"] for e in events]),
+        "outcome": np.array([e["outcome"] for e in events]),
+        "zone_id": np.array([e["zone_id"] for e in events], dtype=np.int64),
+        "pressure_level": np.array([e["pressure_level"] for e in events], dtype=np.float64),
+        "ring3_dead_ball_veto": np.array([e["hsr_flags"]["ring3_dead_ball_veto"] for e in events]),
+        "ring4_physics_veto": np.array([e["hsr_flags"]["ring4_physics_veto"] for e in events]),
+    }
+
+
+def main() -> int:
+    n_matches = 40
+    matches = [synth_match(seed=s) for s in range(n_matches)]
+    arrays = [to_arrays(m) for m in matches]
+    nas = NASDetector()
+
+    t0 = time.perf_counter()
+    scalar = [nas.evaluate(m) for m in matches]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vector = [evaluate_columns(a, nas.max_dt_s, nas.min_fail_count) for a in arrays]
+    t_vector = time.perf_counter() - t0
+
+    same = scalar == vector
+    n_seq = sum(r.nas_sequence_count for r in scalar)
+    print(
+        f"matches={n_matches} events={sum(len(m) for m in matches)} sequences={n_seq} "
+        f"scalar={t_scalar * 1e3:.1f}ms columns={t_vector * 1e3:.1f}ms speedup={t_scalar / t_vector:.1f}x"
+    )
+
+    dts = [round(0.1 * i, 1) for i in range(1, 11)]
+    mins = [2, 3, 4, 5, 6]
+    t0 = time.perf_counter()
+    grid = {(d, m): NASDetector(max_dt_s=d, min_fail_count=m).evaluate(matches[0]) for d in dts for m in mins}
+    t_grid = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    sw = sweep_columns(arrays[0], dts, mins)
+    t_sweep = time.perf_counter() - t0
+    same = same and all(sw.result(d, m) == r for (d, m), r in grid.items())
+    print(f"sweep points={len(grid)} scalar_runs={t_grid * 1e3:.1f}ms sweep={t_sweep * 1e3:.1f}ms")
+
+    print("PARITY:", "PASS" if same else "FAIL")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PossessionStateMachine dict path (update) vs columnar path (run_columns).
+
+Synthetic full match (~3.5k outfield events), deterministic seed.
+Fails (exit 1) if the two paths disagree.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from hpfa.core.state_machine import PossessionStateMachine
+
+
+def synth_match(n: int = 3500, seed: int = 7) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    events: List[Dict[str, Any]] = []
+    ts = 0.0
+    team = 1
+    for i in range(n):
+        ts += rnd.choice([0.3, 0.8, 1.2, 2.0])
+        r = rnd.random()
+        if i == 0 or r < 0.04:
+            e_type = "RESTART_THROWIN"
+        elif r < 0.70:
+            e_type = "PASS"
+        elif r < 0.78:
+            e_type = "DRIBBLE"
+        elif r < 0.86:
+            e_type = "TACKLE"
+        elif r < 0.92:
+            e_type = "INTERCEPTION"
+            team = 3 - team
+        elif r < 0.96:
+            e_type = "LOOSE_BALL"
+        else:
+            e_type = rnd.choice(["OUT", "FOUL"])
+        events.append(
+            {
+                "event_id": f"e{i}",
+                "event_type": e_type,
+                "team_id": team,
+                "event_start_time": round(ts, 2),
+                "outcome": "success" if rnd.random() < 0.85 else "fail",
+            }
+        )
+    return events
+
+
+def main() -> int:
+    events = synth_match()
+    cols = (
+        [e["event_type"] for e in events],
+        [e["team_id"] for e in events],
+        [e["event_start_time"] for e in events],
+        [e["outcome"] for e in events],
+    )
+    reps = 20
+
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        sm = PossessionStateMachine()
+        dict_out = [sm.update(e)[0] for e in events]
+    t_dict = (time.perf_counter() - t0) / reps
+
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        res = PossessionStateMachine().run_columns(*cols)
+    t_cols = (time.perf_counter() - t0) / reps
+
+    same = [o["possession_id"] for o in dict_out] == res.possession_id and [
+        o["sm_reason"] for o in dict_out
+    ] == res.sm_reason
+    print(f"events={len(events)} dict={t_dict * 1e3:.2f}ms columns={t_cols * 1e3:.2f}ms speedup={t_dict / t_cols:.1f}x")
+    print("PARITY:", "PASS" if same else "FAIL")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
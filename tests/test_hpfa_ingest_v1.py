@@ -0,0 +1,216 @@
+import datetime
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pytest
+
+TOOL = Path(__file__).resolve().parents[1] / "tools" / "hpfa_ingest_v1.py"
+MATCH = "m-1"
+
+
+def _load_tool():
+    spec = importlib.util.spec_from_file_location("hpfa_ingest_v1", TOOL)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+ingest = _load_tool()
+
+
+def _write_csv(path, rows):
+    # rows: (start, end, code)
+    lines = ["ID;start;end;code;team;action;half;pos_x;pos_y"]
+    for i, (s, e, code) in enumerate(rows, start=1):
+        lines.append(f"{i};{s};{e};{code};Team A (7);{code.split(' - ')[-1]};1;{i % 100}.5;{i % 60}.25")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _write_xml(path, keys):
+    # keys: (start, end, code); code None = instance without a key
+    parts = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?>", "<file><ALL_INSTANCES>"]
+    for i, (s, e, code) in enumerate(keys, start=1):
+        code_el = f"<code>{code}</code>" if code else ""
+        parts.append(f"<instance><ID>{i}</ID><start>{s}</start><end>{e}</end>{code_el}"
+                     f"<label><group>Half</group><text>1</text></label></instance>")
+    parts.append("</ALL_INSTANCES></file>")
+    path.write_text("\n".join(parts), encoding="utf-8")
+
+
+def _write_xlsx(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Özet"
+    ws.append(["Match report"])
+    ws.append([])
+    ws.append(["Player", "Min", "Pas", "Şut", "Date", None])
+    ws.append(["Ali", 90, 41, 2, datetime.date(2026, 2, 8), "x"])
+    ws.append([None, None, None, None, None, None])
+    ws.append(["Veli", 75, 30, 0, datetime.datetime(2026, 2, 8, 20, 0), None])
+    notes = wb.create_sheet("Notes")
+    notes.append(["only", "three", "cells"])
+    wb.save(path)
+
+
+def _a_rows():
+    rows = [(float(i), float(i) + 2.0, f"{i % 11}. P{i % 11} ({100 + i % 11}) - Pas") for i in range(600)]
+    return rows + [(700.0, 701.5, "9. Dup (109) - Pas")] * 2
+
+
+def _b_rows():
+    return [(1000.0 + i, 1001.0 + i, f"1. Keeper (1) - Kurtarış {i}") for i in range(60)]
+
+
+@pytest.fixture
+def in_dir(tmp_path):
+    d = tmp_path / "in"
+    d.mkdir()
+    a, b = _a_rows(), _b_rows()
+    _write_csv(d / "a.csv", a)
+    _write_csv(d / "b.csv", b)
+    # 40 + 2 of the duplicated key from a.csv, 5 from b.csv, 3 unmatched, 1 without a key
+    keys = a[10:50] + [a[600]] * 3 + b[:5] + [(5000.0, 5001.0, "x - y")] * 3 + [(1.0, 2.0, None)]
+    _write_xml(d / "m.xml", keys)
+    _write_xlsx(d / "s.xlsx")
+    return d
+
+
+def _run(in_dir, out_dir, *args):
+    r = subprocess.run(
+        [sys.executable, str(TOOL), "--match-id", MATCH, "--in-dir", str(in_dir), "--out-dir", str(out_dir), *args],
+        capture_output=True, text=True,
+    )
+    assert r.returncode == 0, r.stderr
+    return json.loads((out_dir / "index.json").read_text(encoding="utf-8"))
+
+
+def _npz(path):
+    # columns + meta; source_mtime_ns is the mtime of the JSONL written in this run
+    with np.load(path) as z:
+        out = {k: z[k].tolist() for k in z.files if k != "__meta__"}
+        meta = json.loads(str(z["__meta__"]))
+    meta.pop("source_mtime_ns")
+    return out, meta
+
+
+def _outputs(out_dir):
+    return {
+        p.name: (_npz(p) if p.suffix == ".npz" else p.read_bytes())
+        for p in sorted(out_dir.iterdir())
+        if p.is_file() and p.name != "index.json"
+    }
+
+
+def _stable_index(index, out_dir):
+    index = dict(index, generated_at=None, cache=None)
+    index["outputs"] = {k: os.path.relpath(v, out_dir) for k, v in index["outputs"].items()}
+    return index
+
+
+def test_cache_hits_misses_and_invalidation(in_dir, tmp_path):
+    out = tmp_path / "out"
+    first = _run(in_dir, out)
+    assert first["cache"]["hits"] == [] and sorted(first["cache"]["misses"]) == ["a.csv", "b.csv", "m.xml", "s.xlsx"]
+    before = _outputs(out)
+
+    second = _run(in_dir, out)
+    assert sorted(second["cache"]["hits"]) == ["a.csv", "b.csv", "m.xml", "s.xlsx"] and second["cache"]["misses"] == []
+    assert _outputs(out) == before
+    assert _stable_index(second, out) == _stable_index(first, out)
+
+    # an edited input misses, the others still hit
+    _write_csv(in_dir / "b.csv", _b_rows()[:55])
+    third = _run(in_dir, out)
+    assert third["cache"]["misses"] == ["b.csv"]
+    assert third["inputs"]["b.csv"]["n_rows"] == 55
+    after = _outputs(out)
+    assert after["canonical_outfield.jsonl"] == before["canonical_outfield.jsonl"]
+    assert after["canonical_gk.jsonl"] != before["canonical_gk.jsonl"]
+
+
+def test_cache_entry_with_missing_object_is_a_miss(in_dir, tmp_path):
+    out = tmp_path / "out"
+    _run(in_dir, out)
+    before = _outputs(out)
+
+    cache = ingest.IngestCache(str(out / ".ingest_cache"))
+    entry = Path(cache.root) / cache.key("csv", str(in_dir / "a.csv"), MATCH)
+    (entry / "canonical.npz").unlink()
+
+    index = _run(in_dir, out)
+    assert index["cache"]["misses"] == ["a.csv"]
+    assert sorted(os.listdir(entry)) == ["canonical.jsonl", "canonical.npz", "keys.bin", "meta.json"]
+    assert _outputs(out) == before
+    assert _run(in_dir, out)["cache"]["misses"] == []
+
+
+def test_cache_entry_without_object_list_is_dropped(tmp_path):
+    cache = ingest.IngestCache(str(tmp_path / "cache"))
+    entry = tmp_path / "cache" / "k"
+    entry.mkdir()
+    (entry / "meta.json").write_text(json.dumps({"nrows": 1}), encoding="utf-8")
+    (entry / "keys.bin").write_bytes(b"")
+    assert cache.get("k", "a.csv") is None
+    assert cache.misses == ["a.csv"] and not entry.exists()
+
+
+def test_pairing_covers_every_instance_and_writes_join_table(in_dir, tmp_path):
+    out = tmp_path / "out"
+    index = _run(in_dir, out, "--no-cache")
+    assert index["cache"] is None
+    n_inst = 40 + 3 + 5 + 3 + 1
+    assert index["pairing"]["m.xml"] == {
+        "n_instances": n_inst,
+        "paired_csv": "a.csv",
+        "sample_intersection": 42,
+        "coverage": round(42 / n_inst, 4),
+        "candidates": {"a.csv": 42, "b.csv": 5},
+        "join_table": "join__m.xml.jsonl",
+    }
+    join = [json.loads(l) for l in (out / "join__m.xml.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [j["instance"] for j in join] == list(range(n_inst))
+    assert [j["xml_id"] for j in join] == list(range(1, n_inst + 1))
+    # csv_row indexes the paired csv; the k-th instance of a repeated key joins its k-th row
+    assert [j["csv_row"] for j in join[:40]] == list(range(10, 50))
+    assert [j["csv_row"] for j in join[40:43]] == [600, 601, None]
+    assert all(j["csv_row"] is None for j in join[43:])
+
+
+def test_jobs_output_equals_serial(in_dir, tmp_path):
+    serial = _run(in_dir, tmp_path / "serial", "--no-cache", "--jobs", "1")
+    parallel = _run(in_dir, tmp_path / "parallel", "--no-cache", "--jobs", "3")
+    assert _outputs(tmp_path / "parallel") == _outputs(tmp_path / "serial")
+    assert _stable_index(parallel, tmp_path / "parallel") == _stable_index(serial, tmp_path / "serial")
+
+
+def test_xlsx_is_streamed_read_only(in_dir, tmp_path, monkeypatch):
+    opened = []
+    load = openpyxl.load_workbook
+
+    def spy(*args, **kwargs):
+        wb = load(*args, **kwargs)
+        opened.append(wb)
+        return wb
+
+    monkeypatch.setattr(ingest.openpyxl, "load_workbook", spy)
+    done = ingest.xlsx_to_jsonl(MATCH, str(in_dir / "s.xlsx"), str(tmp_path))
+    assert len(opened) == 1 and opened[0].read_only
+
+    assert list(done) == ["Özet"]  # "Notes" has no header row
+    out_path, n = done["Özet"]
+    recs = [json.loads(l) for l in Path(out_path).read_text(encoding="utf-8").splitlines()]
+    assert n == 2
+    assert recs == [
+        {"match_id": MATCH, "sheet": "Özet", "Player": "Ali", "Min": 90, "Pas": 41, "Şut": 2,
+         "Date": "2026-02-08T00:00:00", "col6": "x"},
+        {"match_id": MATCH, "sheet": "Özet", "Player": "Veli", "Min": 75, "Pas": 30, "Şut": 0,
+         "Date": "2026-02-08T20:00:00", "col6": None},
+    ]
+    assert ingest.xlsx_to_jsonl(MATCH, str(in_dir / "s.xlsx"), str(tmp_path), sheets={"Notes"}) == {}
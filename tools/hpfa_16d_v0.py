@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
-import os, sys, json, math, re
+import os, sys, math, re
 from collections import defaultdict
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.io.match import load_jsonl
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
 # ---------------------------
 # Config
 # ---------------------------
@@ -18,16 +25,6 @@ DIMS = [
 # ---------------------------
 # Helpers
 # ---------------------------
-def load_jsonl(path):
-    out=[]
-    with open(path,"r",encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: continue
-            try: out.append(json.loads(line))
-            except: pass
-    return out
-
 def s(x): return ("" if x is None else str(x)).strip()
 
 def norm01(val, lo, hi):
@@ -244,13 +241,13 @@ def radar_plot(ax, labels, values, title, placeholder_mask):
         if is_ph:
             ax.plot([angles[i]],[values[i]], marker="x", markersize=6)
 
-def main():
-    if len(sys.argv)!=3:
-        print("USAGE: hpfa_16d_v0.py <match_out_dir> <report_out_dir>")
-        sys.exit(2)
+def draw_radar(plt, labels, values, title, placeholder_mask):
+    # figure drawer (runs in render workers; see hpfa.io.render)
+    ax=plt.subplot(111, polar=True)
+    radar_plot(ax, labels, values, title, placeholder_mask)
 
-    match_out=sys.argv[1]
-    rep_out=sys.argv[2]
+def build(match_out, rep_out):
+    """index.html into rep_out; returns the figure specs (rendered by the caller)."""
     os.makedirs(rep_out, exist_ok=True)
 
     # find stats jsonl in match_out
@@ -282,12 +279,11 @@ def main():
     for r in players:
         by_team[team_name(r)].append(r)
 
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-
     # Build per-player radars
-    out_png=[]
+    specs=[]
+    def radar(fname, labels, vals, title, placeholder):
+        specs.append(FigureSpec(fname, draw_radar, dict(
+            labels=labels, values=vals, title=title, placeholder_mask=placeholder), dpi=DPI, figsize=(7.2,7.2)))
     for team, plist in by_team.items():
         # compute a simple "overall core score" for ordering
         scored=[]
@@ -311,15 +307,8 @@ def main():
                 else:
                     vals.append(float(v))
                     placeholder.append(False)
-            fig=plt.figure(figsize=(7.2,7.2))
-            ax=plt.subplot(111, polar=True)
-            radar_plot(ax, labels, vals, f"16D_v0 Radar — {player_name(pr)} — {team}", placeholder)
             fname=f"16d_player__{team.replace(' ','_')}__{re.sub(r'[^A-Za-z0-9_]+','_',player_name(pr))}.png"
-            path=os.path.join(rep_out,fname)
-            plt.tight_layout()
-            plt.savefig(path, dpi=DPI)
-            plt.close()
-            out_png.append(fname)
+            radar(fname, labels, vals, f"16D_v0 Radar — {player_name(pr)} — {team}", placeholder)
 
         # Team average radar
         team_scores_acc=defaultdict(list)
@@ -340,26 +329,31 @@ def main():
             else:
                 vals.append(sum(vv)/len(vv)); placeholder.append(False)
 
-        fig=plt.figure(figsize=(7.2,7.2))
-        ax=plt.subplot(111, polar=True)
-        radar_plot(ax, labels, vals, f"16D_v0 Team Average — {team}", placeholder)
         fname=f"16d_team_avg__{team.replace(' ','_')}.png"
-        plt.tight_layout()
-        plt.savefig(os.path.join(rep_out,fname), dpi=DPI)
-        plt.close()
-        out_png.append(fname)
+        radar(fname, labels, vals, f"16D_v0 Team Average — {team}", placeholder)
 
-    # index.html
+    # index.html (names in spec order = render order)
     idx=os.path.join(rep_out,"index.html")
     with open(idx,"w",encoding="utf-8") as f:
         f.write('<!doctype html><meta charset="utf-8">')
         f.write('<h2>HPFA 16D_v0 — Radar Dashboard</h2>')
         f.write('<p>X işaretleri: bu maç datasında olmayan boyutlar (placeholder=0.5). Core/Proxy: Technical/Tactical/Physical/Cognitive/DecisionMaking.</p>')
-        for fn in out_png:
+        for fn in [s.name for s in specs]:
             f.write(f'<div style="margin:14px 0;"><div><b>{fn}</b></div><img src="{fn}" style="max-width:100%;"></div>')
 
-    print("OK ✅ 16D_v0 built")
     print("stats_source:", os.path.basename(stats_path))
+    return specs
+
+def main():
+    argv, opts = pop_render_args(sys.argv[1:])
+    if len(argv)!=2:
+        print("USAGE: hpfa_16d_v0.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+        sys.exit(2)
+
+    match_out, rep_out = argv
+    render_figures(build(match_out, rep_out), rep_out, opts)
+    idx=os.path.join(rep_out, "index.html")
+    print("OK ✅ 16D_v0 built")
     print("OUTDIR:", rep_out)
     print("INDEX:", idx)
 
@@ -1,8 +1,25 @@
 #!/usr/bin/env python3
-import argparse, csv, datetime, glob, json, os, re
+import argparse, csv, datetime, glob, hashlib, json, os, re, shutil, sys, unicodedata
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
 from xml.etree import ElementTree as ET
+import numpy as np
 import openpyxl
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.io import event_store
+from hpfa.io.event_store import ColumnBuilder
+
+# ingest code version for the cache key: any edit to this file (or the columnar writer) invalidates cached outputs
+_h = hashlib.sha256()
+for _p in (__file__, event_store.__file__):
+    with open(_p, "rb") as _f:
+        _h.update(_f.read())
+CODE_VERSION = _h.hexdigest()[:16]
+
 PLAYER_ID_RE = re.compile(r"\((\d+)\)")
 TEAM_METRIC_RE = re.compile(r"^(?P<tname>.+?)\s*\((?P<tid>\d+)\)\s*-\s*(?P<metric>.+)$")
 
@@ -29,11 +46,21 @@ def parse_team_id(team_raw: str):
     m = PLAYER_ID_RE.search(team_raw or "")
     return int(m.group(1)) if m else None
 
-def read_csv_rows(path: str, delimiter: str = ";"):
+def iter_csv_rows(path: str, delimiter: str = ";"):
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        yield from csv.DictReader(f, delimiter=delimiter)
+
+def scan_csv(path: str, delimiter: str = ";", n_codes: int = 50):
+    # one pass, no rows kept: header, row count, first codes (stream inference), per-row key hashes (pairing)
     with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
         reader = csv.DictReader(f, delimiter=delimiter)
-        rows = list(reader)
-        return reader.fieldnames or [], rows
+        nrows, codes, hashes = 0, [], array("q")
+        for r in reader:
+            if nrows < n_codes:
+                codes.append(r.get("code") or "")
+            hashes.append(key_hash(event_key(r.get("start"), r.get("end"), r.get("code"))))
+            nrows += 1
+        return reader.fieldnames or [], nrows, codes, hashes
 
 def infer_stream_from_csv(fieldnames, nrows, sample_codes):
     fields = [f.strip() for f in (fieldnames or [])]
@@ -46,11 +73,17 @@ def infer_stream_from_csv(fieldnames, nrows, sample_codes):
         return "gk"
     return "unknown"
 
-def read_xml_instances(path: str):
-    tree = ET.parse(path)
-    root = tree.getroot()
-    insts = []
-    for inst in root.iter("instance"):
+def iter_xml_instances(path: str):
+    # iterparse: each <instance> is read when it closes, then cleared and detached,
+    # so the tree never holds more than the instance being read
+    open_els = []
+    for ev, inst in ET.iterparse(path, events=("start", "end")):
+        if ev == "start":
+            open_els.append(inst)
+            continue
+        open_els.pop()
+        if inst.tag != "instance":
+            continue
         d = {}
         for tag in ["ID", "start", "end", "code", "label"]:
             el = inst.find(tag)
@@ -58,78 +91,129 @@ def read_xml_instances(path: str):
         d["id"] = safe_int(d.get("id"))
         d["start"] = safe_float(d.get("start"))
         d["end"] = safe_float(d.get("end"))
-        insts.append(d)
-    return insts
-
-def sample_event_keys_from_csv(rows, limit=800):
-    keys = set()
-    for r in rows[:limit]:
-        s = safe_float(r.get("start"))
-        e = safe_float(r.get("end"))
-        c = (r.get("code") or "").strip()
-        if s is None or e is None or not c:
-            continue
-        keys.add((round(s, 2), round(e, 2), c))
-    return keys
-
-def sample_event_keys_from_xml(insts, limit=800):
-    keys = set()
-    for d in insts[:limit]:
-        s = safe_float(d.get("start"))
-        e = safe_float(d.get("end"))
-        c = (d.get("code") or "").strip()
-        if s is None or e is None or not c:
-            continue
-        keys.add((round(s, 2), round(e, 2), c))
-    return keys
-
-def pair_xml_to_csv(xml_insts, csv_candidates):
-    xml_keys = sample_event_keys_from_xml(xml_insts, limit=800)
-    best = None
-    for csv_path, rows in csv_candidates:
-        csv_keys = sample_event_keys_from_csv(rows, limit=800)
-        inter = len(xml_keys & csv_keys)
-        if best is None or inter > best["sample_intersection"]:
-            best = {"csv_path": csv_path, "sample_intersection": inter}
-    return best
+        inst.clear()
+        if open_els:
+            open_els[-1].remove(inst)
+        yield d
+
+def read_xml_instances(path: str):
+    return list(iter_xml_instances(path))
+
+def event_key(start, end, code):
+    s = safe_float(start)
+    e = safe_float(end)
+    c = (code or "").strip()
+    if s is None or e is None or not c:
+        return None
+    return (round(s, 2), round(e, 2), c)
+
+def key_hash(k):
+    # stable 63-bit hash of an event_key (str hash() is salted per process); -1 = no key
+    if k is None:
+        return -1
+    return int.from_bytes(hashlib.blake2b(repr(k).encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+def csv_key_index(hashes):
+    # sorted (hash, row) arrays over rows with a key; equal hashes keep row order
+    h = np.frombuffer(hashes, dtype=np.int64) if len(hashes) else np.zeros(0, dtype=np.int64)
+    rows = np.flatnonzero(h >= 0)
+    order = np.argsort(h[rows], kind="stable")
+    return {"h": h[rows][order], "rows": rows[order]}
+
+def join_keys(xml_hashes, idx):
+    # instance -> csv row (-1 = no match); the k-th instance with a key joins the k-th csv row with it
+    xh = np.frombuffer(xml_hashes, dtype=np.int64) if len(xml_hashes) else np.zeros(0, dtype=np.int64)
+    out = np.full(len(xh), -1, dtype=np.int64)
+    valid = np.flatnonzero(xh >= 0)
+    if not len(valid) or not len(idx["h"]):
+        return out
+    order = valid[np.argsort(xh[valid], kind="stable")]
+    sh = xh[order]
+    rank = np.arange(len(sh)) - np.searchsorted(sh, sh, side="left")
+    lo = np.searchsorted(idx["h"], sh, side="left")
+    hit = rank < np.searchsorted(idx["h"], sh, side="right") - lo
+    out[order[hit]] = idx["rows"][lo[hit] + rank[hit]]
+    return out
+
+def xml_records(match_id: str, xml_file: str, insts, hashes, ids):
+    # instance dicts -> output records; key hashes and ids for pairing are collected on the way
+    for d in insts:
+        hashes.append(key_hash(event_key(d.get("start"), d.get("end"), d.get("code"))))
+        ids.append(d.get("id"))
+        yield {"match_id": match_id, "xml_file": xml_file, **d}
+
+def pair_xml_to_csv(xml_hashes, csv_candidates):
+    # full coverage: every instance is joined against every candidate index (csv_candidates: [(csv_path, csv_key_index)])
+    best, scores = None, {}
+    for csv_path, idx in csv_candidates:
+        rows = join_keys(xml_hashes, idx)
+        inter = int((rows >= 0).sum())
+        scores[os.path.basename(csv_path)] = inter
+        if best is None or inter > best["intersection"]:
+            best = {"csv_path": csv_path, "intersection": inter, "rows": rows}
+    return best, scores
+
+def open_fresh(path: str):
+    # unlink first: the old file may be a hardlink into the ingest cache, truncating it would corrupt the cache
+    if os.path.lexists(path):
+        os.remove(path)
+    return open(path, "w", encoding="utf-8")
 
 def write_jsonl(path: str, records):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
+    n = 0
+    with open_fresh(path) as f:
         for rec in records:
             f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            n += 1
+    return n
 
-def xlsx_to_json(path: str):
-    wb = openpyxl.load_workbook(path, data_only=True)
+def xlsx_to_jsonl(match_id: str, path: str, out_dir: str, sheets=None):
+    # read_only streaming: the header is the first of the first 50 rows with >= 5 values, found as rows
+    # arrive; each data row is written as it is read. sheets: optional whitelist (others are never parsed;
+    # compared NFC-normalized, exports mix composed and decomposed Turkish letters)
+    # -> {sheet: (out_path, n_rows)} for sheets with a header, in workbook order
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    if sheets is not None:
+        sheets = {unicodedata.normalize("NFC", s) for s in sheets}
     out = {}
-    for sh in wb.worksheets:
-        rows = list(sh.iter_rows(values_only=True))
-        header_row_idx = None
-        for i, row in enumerate(rows[:50]):
-            non_empty = sum(1 for x in row if x not in (None, ""))
-            if non_empty >= 5:
-                header_row_idx = i
-                break
-        if header_row_idx is None:
-            continue
-        headers = [str(x).strip() if x is not None else "" for x in rows[header_row_idx]]
-        headers = [h if h else f"col{j+1}" for j, h in enumerate(headers)]
-        data = []
-        for row in rows[header_row_idx + 1:]:
-            if all(x in (None, "") for x in row):
+    try:
+        for title in wb.sheetnames:
+            if sheets is not None and unicodedata.normalize("NFC", title) not in sheets:
                 continue
-            rec = {}
-            for j, h in enumerate(headers):
-                val = row[j] if j < len(row) else None
-                if isinstance(val, (datetime.datetime, datetime.date)):
-                    val = val.isoformat()
-                rec[h] = val
-            data.append(rec)
-        out[sh.title] = data
+            out_path = os.path.join(out_dir, f"stats__{os.path.basename(path)}__{title}.jsonl")
+            headers, f, n = None, None, 0
+            try:
+                for i, row in enumerate(wb[title].iter_rows(values_only=True)):
+                    if headers is None:
+                        if i >= 50:
+                            break
+                        if sum(1 for x in row if x not in (None, "")) >= 5:
+                            headers = [str(x).strip() if x is not None else "" for x in row]
+                            headers = [h if h else f"col{j+1}" for j, h in enumerate(headers)]
+                            f = open_fresh(out_path)
+                        continue
+                    if all(x in (None, "") for x in row):
+                        continue
+                    rec = {"match_id": match_id, "sheet": title}
+                    for j, h in enumerate(headers):
+                        val = row[j] if j < len(row) else None
+                        if isinstance(val, (datetime.datetime, datetime.date)):
+                            val = val.isoformat()
+                        rec[h] = val
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    n += 1
+            finally:
+                if f is not None:
+                    f.close()
+            if headers is not None:
+                out[title] = (out_path, n)
+    finally:
+        wb.close()
     return out
 
 def canonical_from_csv(match_id: str, stream: str, rows):
-    recs = []
+    # generator: rows stream through to the writer one at a time
     for r in rows:
         code = (r.get("code") or "").strip() or None
         team_raw = (r.get("team") or "").strip() or None
@@ -158,17 +242,146 @@ def canonical_from_csv(match_id: str, stream: str, rows):
                 rec["team_id"] = int(m.group("tid"))
                 rec["team_raw"] = f"{m.group('tname').strip()} ({m.group('tid')})"
                 rec["metric"] = m.group("metric").strip()
-        recs.append(rec)
-    return recs
+        yield rec
+
+# -----------------------------
+# Per-file jobs (run inline or in worker processes; each writes only its own outputs)
+# -----------------------------
+def csv_scan_job(path: str):
+    fieldnames, nrows, sample_codes, hashes = scan_csv(path, delimiter=";")
+    return fieldnames, nrows, infer_stream_from_csv(fieldnames, nrows, sample_codes), hashes
+
+def npz_path(jsonl_path: str):
+    return os.path.splitext(jsonl_path)[0] + ".npz"
+
+def csv_write_job(match_id: str, stream: str, path: str, out_path: str):
+    # JSONL and the typed columnar copy (hpfa.io.event_store) from the same record stream
+    cols = ColumnBuilder()
+    write_jsonl(out_path, cols.tap(canonical_from_csv(match_id, stream, iter_csv_rows(path, delimiter=";"))))
+    st = os.stat(out_path)
+    cols.save(npz_path(out_path), source_size=st.st_size, source_mtime_ns=st.st_mtime_ns)
+
+def xml_job(match_id: str, path: str, out_dir: str):
+    # one pass: iterparse -> JSONL (+ pairing keys); the instance count names the file afterwards
+    name = os.path.basename(path)
+    part_path = os.path.join(out_dir, f".{name}.jsonl.part")
+    xml_hashes, xml_ids = array("q"), []
+    try:
+        n_inst = write_jsonl(part_path, xml_records(match_id, name, iter_xml_instances(path), xml_hashes, xml_ids))
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    out_path = os.path.join(out_dir, f"xml_{n_inst}__{name}.jsonl")
+    os.replace(part_path, out_path)
+    return out_path, n_inst, xml_hashes, xml_ids
+
+def xlsx_job(match_id: str, path: str, out_dir: str, sheets=None):
+    done = xlsx_to_jsonl(match_id, path, out_dir, sheets)
+    info = {"type":"xlsx","sheets":list(done.keys()),"n_rows_by_sheet":{k:n for k,(_, n) in done.items()}}
+    return info, [out_path for out_path, _ in done.values()]
+
+class InlineExecutor:
+    # --jobs 1: same submit()/Future interface as ProcessPoolExecutor, run in-process
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+# -----------------------------
+# Content-addressed ingest cache
+# -----------------------------
+def file_sha256(path: str):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def link_or_copy(src: str, dst: str):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)  # keeps mtime: a copied JSONL still matches its NPZ
+
+def done_future(value):
+    fut = Future()
+    fut.set_result(value)
+    return fut
+
+class IngestCache:
+    # <root>/<key>/: meta.json (lists its "objects"), keys.bin (int64 key hashes for pairing), output objects.
+    # key = sha256(kind, CODE_VERSION, input sha256, input name, params); outputs are hardlinked in and out.
+    def __init__(self, root: str):
+        self.root = root
+        self.hits, self.misses = [], []
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, kind: str, path: str, *params):
+        payload = json.dumps([kind, CODE_VERSION, file_sha256(path), os.path.basename(path), *params], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, name: str):
+        # -> (object dir, meta, key hashes) or None; records the hit / miss for index.json
+        d = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(d, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            hashes = array("q")
+            with open(os.path.join(d, "keys.bin"), "rb") as f:
+                hashes.frombytes(f.read())
+            objects = meta.get("objects")
+            if not isinstance(objects, list) or not all(os.path.isfile(os.path.join(d, o)) for o in objects):
+                raise ValueError("incomplete entry")
+        except (OSError, ValueError, AttributeError):
+            # missing / partially pruned entry: a miss; drop it so put() can store it again
+            if os.path.isdir(d):
+                shutil.rmtree(d, ignore_errors=True)
+            self.misses.append(name)
+            return None
+        self.hits.append(name)
+        return d, meta, hashes
+
+    def put(self, key: str, meta, hashes, files):
+        # files: {object name: output path just written}; staged then renamed, so readers never see a partial entry
+        tmp = os.path.join(self.root, f".{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for obj, src in files.items():
+            link_or_copy(src, os.path.join(tmp, obj))
+        with open(os.path.join(tmp, "keys.bin"), "wb") as f:
+            f.write(hashes.tobytes())
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(dict(meta, objects=sorted(files)), f, ensure_ascii=False)
+        try:
+            os.rename(tmp, os.path.join(self.root, key))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # stored meanwhile (or unusable): keep the existing entry
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--match-id", required=True)
     ap.add_argument("--in-dir", required=True)
     ap.add_argument("--out-dir", required=True)
+    ap.add_argument("--xlsx-sheets", default=None, help="comma-separated sheet whitelist for xlsx stats (default: all sheets)")
+    ap.add_argument("--jobs", type=int, default=1, help="worker processes for per-file parsing (outputs identical to --jobs 1)")
+    ap.add_argument("--cache-dir", default=None, help="ingest cache (default: <out-dir>/.ingest_cache)")
+    ap.add_argument("--no-cache", action="store_true", help="parse every input, do not read or write the cache")
     args = ap.parse_args()
 
     in_dir, out_dir, match_id = args.in_dir, args.out_dir, args.match_id
+    xlsx_sheets = None if args.xlsx_sheets is None else {s.strip() for s in args.xlsx_sheets.split(",") if s.strip()}
     csv_files = sorted(glob.glob(os.path.join(in_dir, "*.csv")))
     xml_files = sorted(glob.glob(os.path.join(in_dir, "*.xml")))
     xlsx_files = sorted(glob.glob(os.path.join(in_dir, "*.xlsx")))
@@ -177,6 +390,7 @@ def main():
         raise SystemExit("ERROR: No CSV files found in --in-dir")
 
     os.makedirs(out_dir, exist_ok=True)
+    cache = None if args.no_cache else IngestCache(args.cache_dir or os.path.join(out_dir, ".ingest_cache"))
 
     index = {
         "match_id": match_id,
@@ -186,59 +400,122 @@ def main():
         "outputs": {},
     }
 
-    csv_cache = {}
-    written_streams = set()
+    # workers parse and write per-file outputs; index.json, output naming and pairing stay here,
+    # in serial order, so the result does not depend on --jobs
+    # cache hits are linked in here and only misses are submitted
+    with (ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else InlineExecutor()) as ex:
+        csv_hits, csv_scans = {}, []
+        for p in csv_files:
+            key = cache.key("csv", p, match_id) if cache else None
+            hit = cache.get(key, os.path.basename(p)) if cache else None
+            if hit:
+                obj_dir, meta, hashes = csv_hits[p] = hit
+                csv_scans.append((key, done_future((meta["fieldnames"], meta["nrows"], meta["stream"], hashes))))
+            else:
+                csv_scans.append((key, ex.submit(csv_scan_job, p)))
+
+        xml_futs = []
+        for xp in xml_files:
+            key = cache.key("xml", xp, match_id) if cache else None
+            hit = cache.get(key, os.path.basename(xp)) if cache else None
+            if hit:
+                obj_dir, meta, hashes = hit
+                out_path = os.path.join(out_dir, f"xml_{meta['n_instances']}__{os.path.basename(xp)}.jsonl")
+                link_or_copy(os.path.join(obj_dir, "xml.jsonl"), out_path)
+                xml_futs.append((key, False, done_future((out_path, meta["n_instances"], hashes, meta["ids"]))))
+            else:
+                xml_futs.append((key, True, ex.submit(xml_job, match_id, xp, out_dir)))
 
-    for p in csv_files:
-        fieldnames, rows = read_csv_rows(p, delimiter=";")
-        csv_cache[p] = (fieldnames, rows)
-        sample_codes = [(r.get("code") or "") for r in rows[:50]]
-        stream = infer_stream_from_csv(fieldnames, len(rows), sample_codes)
+        xlsx_futs = []
+        for xp in xlsx_files:
+            key = cache.key("xlsx", xp, match_id, sorted(xlsx_sheets) if xlsx_sheets is not None else None) if cache else None
+            hit = cache.get(key, os.path.basename(xp)) if cache else None
+            if hit:
+                obj_dir, meta, _ = hit
+                out_paths = [os.path.join(out_dir, name) for name in meta["outputs"]]
+                for j, out_path in enumerate(out_paths):
+                    link_or_copy(os.path.join(obj_dir, f"{j}.jsonl"), out_path)
+                xlsx_futs.append((key, False, done_future((meta["info"], out_paths))))
+            else:
+                xlsx_futs.append((key, True, ex.submit(xlsx_job, match_id, xp, out_dir, xlsx_sheets)))
 
-        index["inputs"][os.path.basename(p)] = {"type":"csv","stream":stream,"n_rows":len(rows),"columns":fieldnames}
+        csv_keys = {}
+        csv_writes = []
+        written_streams = set()
+        for p, (key, fut) in zip(csv_files, csv_scans):
+            # pass 1 (scan) decides the stream, pass 2 streams rows -> records -> JSONL
+            fieldnames, nrows, stream, hashes = fut.result()
+            csv_keys[p] = csv_key_index(hashes)
 
-        recs = canonical_from_csv(match_id, stream, rows)
-        out_name = f"canonical_{stream}.jsonl"
-        out_path = os.path.join(out_dir, out_name)
-        if stream in written_streams:
-            stem = os.path.splitext(os.path.basename(p))[0].replace(" ", "_")
-            out_path = os.path.join(out_dir, f"canonical_{stream}__{stem}.jsonl")
-        written_streams.add(stream)
+            index["inputs"][os.path.basename(p)] = {"type":"csv","stream":stream,"n_rows":nrows,"columns":fieldnames}
 
-        write_jsonl(out_path, recs)
-        index["outputs"][os.path.basename(out_path)] = out_path
+            out_name = f"canonical_{stream}.jsonl"
+            out_path = os.path.join(out_dir, out_name)
+            if stream in written_streams:
+                stem = os.path.splitext(os.path.basename(p))[0].replace(" ", "_")
+                out_path = os.path.join(out_dir, f"canonical_{stream}__{stem}.jsonl")
+            written_streams.add(stream)
 
-    if xml_files:
-        csv_candidates = [(p, csv_cache[p][1]) for p in csv_files]
-        for xp in xml_files:
-            insts = read_xml_instances(xp)
-            best = pair_xml_to_csv(insts, csv_candidates)
-            index["pairing"][os.path.basename(xp)] = {
-                "n_instances": len(insts),
-                "paired_csv": os.path.basename(best["csv_path"]) if best else None,
-                "sample_intersection": best["sample_intersection"] if best else None,
-            }
-            out = [{"match_id": match_id, "xml_file": os.path.basename(xp), **d} for d in insts]
-            out_path = os.path.join(out_dir, f"xml_{len(insts)}__{os.path.basename(xp)}.jsonl")
-            write_jsonl(out_path, out)
+            if p in csv_hits:
+                link_or_copy(os.path.join(csv_hits[p][0], "canonical.jsonl"), out_path)
+                link_or_copy(os.path.join(csv_hits[p][0], "canonical.npz"), npz_path(out_path))
+            else:
+                meta = {"fieldnames": fieldnames, "nrows": nrows, "stream": stream}
+                csv_writes.append((key, meta, hashes, out_path, ex.submit(csv_write_job, match_id, stream, p, out_path)))
             index["outputs"][os.path.basename(out_path)] = out_path
+            index["outputs"][os.path.basename(npz_path(out_path))] = npz_path(out_path)
 
-    for xp in xlsx_files:
-        data = xlsx_to_json(xp)
-        index["inputs"][os.path.basename(xp)] = {"type":"xlsx","sheets":list(data.keys()),"n_rows_by_sheet":{k:len(v) for k,v in data.items()}}
-        for sh, rows in data.items():
-            out_path = os.path.join(out_dir, f"stats__{os.path.basename(xp)}__{sh}.jsonl")
-            write_jsonl(out_path, [{"match_id": match_id, "sheet": sh, **r} for r in rows])
+        csv_candidates = [(p, csv_keys[p]) for p in csv_files]
+        for xp, (key, miss, fut) in zip(xml_files, xml_futs):
+            name = os.path.basename(xp)
+            out_path, n_inst, xml_hashes, xml_ids = fut.result()
+            if cache and miss:
+                cache.put(key, {"n_instances": n_inst, "ids": xml_ids}, xml_hashes, {"xml.jsonl": out_path})
+            best, scores = pair_xml_to_csv(xml_hashes, csv_candidates)
             index["outputs"][os.path.basename(out_path)] = out_path
 
+            # instance -> row join table against the paired csv (csv_row = row in that csv / its canonical JSONL)
+            join_path = os.path.join(out_dir, f"join__{name}.jsonl")
+            write_jsonl(join_path, (
+                {"instance": i, "xml_id": xid, "csv_row": (r if r >= 0 else None)}
+                for i, (xid, r) in enumerate(zip(xml_ids, best["rows"].tolist()))
+            ))
+            index["outputs"][os.path.basename(join_path)] = join_path
+            index["pairing"][name] = {
+                "n_instances": n_inst,
+                "paired_csv": os.path.basename(best["csv_path"]),
+                "sample_intersection": best["intersection"],  # key kept from the sampled pairing; now the full count
+                "coverage": round(best["intersection"] / n_inst, 4) if n_inst else None,
+                "candidates": scores,
+                "join_table": os.path.basename(join_path),
+            }
+
+        for xp, (key, miss, fut) in zip(xlsx_files, xlsx_futs):
+            info, out_paths = fut.result()
+            if cache and miss:
+                meta = {"info": info, "outputs": [os.path.basename(o) for o in out_paths]}
+                cache.put(key, meta, array("q"), {f"{j}.jsonl": o for j, o in enumerate(out_paths)})
+            index["inputs"][os.path.basename(xp)] = info
+            for out_path in out_paths:
+                index["outputs"][os.path.basename(out_path)] = out_path
+
+        for key, meta, hashes, out_path, fut in csv_writes:
+            fut.result()
+            if cache:
+                cache.put(key, meta, hashes, {"canonical.jsonl": out_path, "canonical.npz": npz_path(out_path)})
+
+    index["cache"] = {"dir": cache.root, "code_version": CODE_VERSION, "hits": cache.hits, "misses": cache.misses} if cache else None
+
     with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
         json.dump(index, f, ensure_ascii=False, indent=2)
 
     print("OK ✅")
     print("OUT:", out_dir)
+    if cache:
+        print("CACHE:", f"hits={len(cache.hits)} misses={len(cache.misses)}")
     print("PAIRING:")
     for k,v in index["pairing"].items():
-        print("-", k, "->", v.get("paired_csv"), "inter=", v.get("sample_intersection"))
+        print("-", k, "->", v.get("paired_csv"), "inter=", v.get("sample_intersection"), "coverage=", v.get("coverage"))
 
 if __name__ == "__main__":
     main()
@@ -1,60 +1,38 @@
 #!/usr/bin/env python3
-import os, sys, json, math
+import os, sys, math
 from collections import defaultdict, Counter
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.analytics.aggregates import match_aggregates
+from hpfa.io.match import load_match
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
 PASS_OK = {"Paslar adresi bulanlar"}
 
-def load_jsonl(path):
-    out=[]
-    with open(path,"r",encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: continue
-            try: out.append(json.loads(line))
-            except: pass
-    return out
-
-def s(x): return (x or "").strip()
-
-def tsec(x):
-    try: return float(x)
-    except: return None
-
-def safe_xy(r):
-    try:
-        x=r.get("x"); y=r.get("y")
-        if x is None or y is None: return None
-        x=float(x); y=float(y)
-        if math.isnan(x) or math.isnan(y): return None
-        return x,y
-    except: return None
-
-def team_of(r):
-    return s(r.get("team_raw") or r.get("team") or "UNKNOWN_TEAM")
-
-def action_of(r):
-    return s(r.get("action") or "")
-
-def player_of(r):
-    code=s(r.get("code") or "")
-    if not code: return None
-    left=code.split(" - ")[0].strip()
-    if ". " in left:
-        left=left.split(". ",1)[1].strip()
-    return left or None
-
-def ensure_mpl():
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    return plt
-
-def save(plt, outdir, name, dpi=280):
-    p=os.path.join(outdir,name)
-    plt.tight_layout()
-    plt.savefig(p, dpi=dpi)
-    plt.close()
-    return name
+FIG = dict(dpi=280, figsize=(10,6))
+
+# figure drawers (run in render workers; see hpfa.io.render)
+def draw_avg_positions(plt, xs, ys, ss, labs, title):
+    plt.scatter(xs, ys, s=ss, alpha=0.75)
+    for x,y,p in zip(xs,ys,labs):
+        plt.text(x, y, p, fontsize=8, ha="center", va="center")
+    plt.title(title)
+    plt.xlabel("x"); plt.ylabel("y")
+
+def draw_pass_network(plt, edges, nodes, title):
+    from matplotlib import cm
+    # draw edges
+    for x1,y1,x2,y2,lw,c in edges:
+        plt.plot([x1,x2],[y1,y2], linewidth=lw, color=cm.coolwarm(c), alpha=0.75)
+    # draw nodes
+    for x,y,s,p in nodes:
+        plt.scatter([x],[y], s=s, alpha=0.9)
+        plt.text(x, y, p, fontsize=8, ha="center", va="center")
+    plt.title(title)
+    plt.xlabel("x"); plt.ylabel("y")
 
 def write_index(outdir, items):
     p=os.path.join(outdir,"index.html")
@@ -69,49 +47,41 @@ def write_index(outdir, items):
         f.write('</ul>')
     return p
 
-def main():
-    if len(sys.argv)!=3:
-        print("USAGE: hpfa_passnet_v1.py <match_out_dir> <report_out_dir>")
-        sys.exit(2)
-
-    match_out=sys.argv[1]
-    outdir=sys.argv[2]
+def build(match_out, outdir):
+    """index.html into outdir; returns the figure specs (rendered by the caller)."""
     os.makedirs(outdir, exist_ok=True)
 
     src=os.path.join(match_out,"canonical_outfield.jsonl")
     if not os.path.exists(src):
         raise SystemExit(f"ERROR missing: {src}")
 
-    ev=load_jsonl(src)
-    if not ev:
+    md=load_match(src)
+    if not md.n:
         raise SystemExit("ERROR: canonical_outfield empty")
 
-    plt=ensure_mpl()
-
-    # split by team
-    teams=sorted({team_of(r) for r in ev})
-    by_team=defaultdict(list)
-    for r in ev:
-        by_team[team_of(r)].append(r)
+    # normalized columns from the shared loader (hpfa.io.match) + shared aggregates
+    agg=match_aggregates(md)
+    players=md.player.tolist()
+    actions=md.action.tolist()
+    halves=md.half.tolist()
+    xy_of=agg.xy_of
+    t_of=[0.0 if math.isnan(t) else t for t in md.t_start.tolist()]
+    teams=agg.teams
 
     items=[]
+    specs=[]
 
     for t in teams:
-        rows=by_team[t]
-        rows_sorted=sorted(
-            [(tsec(r.get("t_start")) or 0.0, r) for r in rows],
-            key=lambda z:z[0]
-        )
+        rows_sorted=agg.rows_by_time[t]  # stable by t_start, missing time as 0.0
 
         # avg positions per player (using all events with xy)
         pos_sum=defaultdict(lambda: [0.0,0.0,0])  # x,y,n
-        touches=Counter()
+        touches=agg.touches[t]  # in rows_sorted order: most_common ties = first touch
 
-        for tt,r in rows_sorted:
-            p=player_of(r)
-            xy=safe_xy(r)
+        for i in rows_sorted:
+            p=players[i]
+            xy=xy_of[i]
             if not p: continue
-            touches[p]+=1
             if xy:
                 pos_sum[p][0]+=xy[0]
                 pos_sum[p][1]+=xy[1]
@@ -124,22 +94,23 @@ def main():
                 avg_pos[p]=(sx/n, sy/n)
 
         # build edges from PASS_OK sequence proxy
-        passes=[(tt,r) for tt,r in rows_sorted if action_of(r) in PASS_OK and player_of(r)]
+        passes=[i for i in rows_sorted if actions[i] in PASS_OK and players[i]]
         edges=Counter()
         prog_sum=defaultdict(float)  # (u,v)->sum dx
         prog_n=defaultdict(int)
 
         for i in range(len(passes)-1):
-            t1,r1=passes[i]
-            t2,r2=passes[i+1]
+            r1=passes[i]
+            r2=passes[i+1]
+            t1=t_of[r1]; t2=t_of[r2]
             if (t2-t1) < 0 or (t2-t1) > 8:
                 continue
-            u=player_of(r1); v=player_of(r2)
+            u=players[r1]; v=players[r2]
             if not u or not v or u==v:
                 continue
             edges[(u,v)] += 1
 
-            xy1=safe_xy(r1); xy2=safe_xy(r2)
+            xy1=xy_of[r1]; xy2=xy_of[r2]
             if xy1 and xy2:
                 dx=xy2[0]-xy1[0]
                 prog_sum[(u,v)] += dx
@@ -150,7 +121,6 @@ def main():
         top_set=set(top_players)
 
         # --- FIG 1: Average Positions + involvement ---
-        plt.figure(figsize=(10,6))
         xs=[]; ys=[]; ss=[]; labs=[]
         for p in top_players:
             if p not in avg_pos: continue
@@ -158,18 +128,13 @@ def main():
             xs.append(x); ys.append(y)
             ss.append(40 + 6*touches[p])
             labs.append(p)
-        plt.scatter(xs, ys, s=ss, alpha=0.75)
-        for x,y,p in zip(xs,ys,labs):
-            plt.text(x, y, p, fontsize=8, ha="center", va="center")
-        plt.title(f"E2 — Avg Positions (proxy) + involvement — {t}")
-        plt.xlabel("x"); plt.ylabel("y")
-        fn=save(plt, outdir, f"01_avg_positions__{t.replace(' ','_')}.png")
+        fn=f"01_avg_positions__{t.replace(' ','_')}.png"
+        specs.append(FigureSpec(fn, draw_avg_positions, dict(
+            xs=xs, ys=ys, ss=ss, labs=labs, title=f"E2 — Avg Positions (proxy) + involvement — {t}"), **FIG))
         items.append({"title":f"Avg positions + involvement — {t}", "file":fn})
 
         # --- FIG 2: Passing Network (sequence proxy) ---
         # Node positions = avg_pos. Edge width = count. Edge color = mean dx (progressive)
-        import numpy as np
-        from matplotlib import cm
 
         # collect edges among top players
         E=[((u,v),w) for (u,v),w in edges.items() if u in top_set and v in top_set and u in avg_pos and v in avg_pos]
@@ -187,28 +152,32 @@ def main():
             if abs(vmax-vmin) < 1e-9:
                 vmin, vmax = vmin-1.0, vmax+1.0
 
-            plt.figure(figsize=(10,6))
-            # draw edges
+            # edges: (x1,y1,x2,y2,width,color in 0..1); nodes: (x,y,size,label)
+            segs=[]
             for (u,v),w in E:
                 x1,y1=avg_pos[u]; x2,y2=avg_pos[v]
                 lw=0.6 + 3.6*(w/maxw)
                 pm=prog_mean[(u,v)]
-                c=cm.coolwarm((pm - vmin)/(vmax - vmin))
-                plt.plot([x1,x2],[y1,y2], linewidth=lw, color=c, alpha=0.75)
-
-            # draw nodes
-            for p in top_players:
-                if p not in avg_pos: continue
-                x,y=avg_pos[p]
-                plt.scatter([x],[y], s=60+5*touches[p], alpha=0.9)
-                plt.text(x, y, p, fontsize=8, ha="center", va="center")
-
-            plt.title(f"E2 — Pass Network (sequence proxy). Edge color=mean Δx, width=count — {t}")
-            plt.xlabel("x"); plt.ylabel("y")
-            fn=save(plt, outdir, f"02_pass_network__{t.replace(' ','_')}.png")
+                segs.append((x1,y1,x2,y2,lw,(pm - vmin)/(vmax - vmin)))
+            nodes=[(*avg_pos[p], 60+5*touches[p], p) for p in top_players if p in avg_pos]
+
+            fn=f"02_pass_network__{t.replace(' ','_')}.png"
+            specs.append(FigureSpec(fn, draw_pass_network, dict(
+                edges=segs, nodes=nodes, title=f"E2 — Pass Network (sequence proxy). Edge color=mean Δx, width=count — {t}"), **FIG))
             items.append({"title":f"Pass network (Δx color, count width) — {t}", "file":fn})
 
-    idx=write_index(outdir, items)
+    write_index(outdir, items)
+    return specs
+
+def main():
+    argv, opts = pop_render_args(sys.argv[1:])
+    if len(argv)!=2:
+        print("USAGE: hpfa_passnet_v1.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+        sys.exit(2)
+
+    match_out, outdir = argv
+    render_figures(build(match_out, outdir), outdir, opts)
+    idx=os.path.join(outdir, "index.html")
     print("OK ✅ passnet_v1 built")
     print("OUT:", outdir)
     print("INDEX:", idx)
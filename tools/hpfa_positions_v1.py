@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
-import os, sys, json, math, hashlib
+import os, sys, hashlib
 from collections import defaultdict, Counter
 import numpy as np
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.analytics.aggregates import match_aggregates
+from hpfa.io.match import load_match
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
 PITCH_L=105.0
 PITCH_W=68.0
 
@@ -19,55 +27,10 @@ KEEP_ACTIONS = {
   "Geri Kazanılan Toplar",
 }
 
-def load_jsonl(p):
-  out=[]
-  with open(p,"r",encoding="utf-8") as f:
-    for line in f:
-      line=line.strip()
-      if not line: continue
-      try: out.append(json.loads(line))
-      except: pass
-  return out
-
-def s(x): return (x or "").strip()
-
-def player_of(r):
-  code=s(r.get("code") or "")
-  if not code: return None
-  left=code.split(" - ")[0].strip()
-  if ". " in left: left=left.split(". ",1)[1].strip()
-  return left or None
-
-def team_of(r):
-  return s(r.get("team_raw") or r.get("team") or "UNKNOWN_TEAM")
-
-def action_of(r):
-  return s(r.get("action") or "")
-
-def half_of(r):
-  try:
-    h=r.get("half")
-    return int(h) if h is not None else None
-  except:
-    return None
-
-def safe_xy(r):
-  try:
-    x=r.get("x"); y=r.get("y")
-    if x is None or y is None: return None
-    x=float(x); y=float(y)
-    if math.isnan(x) or math.isnan(y): return None
-    return x,y
-  except:
-    return None
-
-def norm_xy_event(r, x, y):
-  # already 105x68 in your data; keep it strict anyway
+def clamp_xy(x, y):
+  # x, y: loader's 105x68 coordinates (2nd half already flipped); keep it strict anyway
   x = max(0.0, min(PITCH_L, x))
   y = max(0.0, min(PITCH_W, y))
-  # 2nd half flip to align direction
-  if half_of(r)==2:
-    x = PITCH_L - x
   return x,y
 
 def jitter_for_name(name, scale=0.9):
@@ -78,12 +41,6 @@ def jitter_for_name(name, scale=0.9):
   jy=(b-0.5)*2*scale
   return jx, jy
 
-def ensure_mpl():
-  import matplotlib
-  matplotlib.use("Agg")
-  import matplotlib.pyplot as plt
-  return plt
-
 def draw_pitch(plt):
   # outline
   plt.plot([0,105],[0,0],linewidth=1)
@@ -94,12 +51,14 @@ def draw_pitch(plt):
   plt.plot([52.5,52.5],[0,68],linewidth=1,alpha=0.6)
   plt.xlim(0,105); plt.ylim(0,68)
 
-def savefig(plt, outdir, name, dpi=320):
-  p=os.path.join(outdir,name)
-  plt.tight_layout()
-  plt.savefig(p,dpi=dpi)
-  plt.close()
-  return name
+def draw_positions(plt, xs, ys, ss, labs, title):
+  # figure drawer (runs in render workers; see hpfa.io.render)
+  draw_pitch(plt)
+  for x2,y2,p in zip(xs,ys,labs):
+    plt.text(x2, y2, p, fontsize=8, ha="center", va="center")
+  plt.scatter(xs, ys, s=ss, alpha=0.8)
+  plt.title(title)
+  plt.xlabel("x (m)"); plt.ylabel("y (m)")
 
 def write_index(outdir, items):
   p=os.path.join(outdir,"index.html")
@@ -114,48 +73,38 @@ def write_index(outdir, items):
     f.write('</ul>')
   return p
 
-def main():
-  if len(sys.argv)!=3:
-    print("USAGE: hpfa_positions_v1.py <match_out_dir> <report_out_dir>")
-    sys.exit(2)
-
-  match_out=sys.argv[1]
-  outdir=sys.argv[2]
+def build(match_out, outdir):
+  """index.html into outdir; returns the figure specs (rendered by the caller)."""
   os.makedirs(outdir, exist_ok=True)
 
   src=os.path.join(match_out,"canonical_outfield.jsonl")
   if not os.path.exists(src):
     raise SystemExit(f"ERROR missing: {src}")
 
-  ev=load_jsonl(src)
-  plt=ensure_mpl()
+  md=load_match(src)
 
-  by_team=defaultdict(list)
-  for r in ev:
-    by_team[team_of(r)].append(r)
+  cols=list(md.rows("player","action","has_xy","x105","y68"))
+  agg=match_aggregates(md)  # per-team row indices, shared with the other builders
 
   items=[]
-  for team, rows in sorted(by_team.items()):
+  specs=[]
+  for team in agg.teams:
+    rows=[cols[i] for i in agg.rows[team]]
     pts=defaultdict(list)   # player -> list[(x,y)]
     touches=Counter()
 
-    for r in rows:
-      p=player_of(r)
+    for p,a,ok,x,y in rows:
       if not p: continue
-      a=action_of(r)
       if a and a not in KEEP_ACTIONS: 
         continue
-      xy=safe_xy(r)
-      if not xy: 
+      if not ok: 
         continue
-      x,y = norm_xy_event(r, xy[0], xy[1])
+      x,y = clamp_xy(x, y)
       pts[p].append((x,y))
       touches[p]+=1
 
     top=[p for p,_ in touches.most_common(11)]
-    plt.figure(figsize=(10,6))
-    draw_pitch(plt)
-    xs=[]; ys=[]; ss=[]
+    xs=[]; ys=[]; ss=[]; labs=[]
     for p in top:
       arr=pts.get(p,[])
       if len(arr)<3: 
@@ -166,15 +115,25 @@ def main():
       x2=max(0,min(105,x+jx)); y2=max(0,min(68,y+jy))
       xs.append(x2); ys.append(y2)
       ss.append(50 + 4*min(touches[p],120))
-      plt.text(x2, y2, p, fontsize=8, ha="center", va="center")
+      labs.append(p)
 
-    plt.scatter(xs, ys, s=ss, alpha=0.8)
-    plt.title(f"Median action-locations (filtered) — {team}")
-    plt.xlabel("x (m)"); plt.ylabel("y (m)")
-    fn=savefig(plt, outdir, f"01_positions_median__{team.replace(' ','_')}.png")
+    fn=f"01_positions_median__{team.replace(' ','_')}.png"
+    specs.append(FigureSpec(fn, draw_positions, dict(
+      xs=xs, ys=ys, ss=ss, labs=labs, title=f"Median action-locations (filtered) — {team}"), dpi=320, figsize=(10,6)))
     items.append({"title": f"Median positions — {team}", "file": fn})
 
-  idx=write_index(outdir, items)
+  write_index(outdir, items)
+  return specs
+
+def main():
+  argv, opts = pop_render_args(sys.argv[1:])
+  if len(argv)!=2:
+    print("USAGE: hpfa_positions_v1.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+    sys.exit(2)
+
+  match_out, outdir = argv
+  render_figures(build(match_out, outdir), outdir, opts)
+  idx=os.path.join(outdir, "index.html")
   print("OK ✅ positions_v1 built")
   print("OUT:", outdir)
   print("INDEX:", idx)
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
-import os, sys, json, math, hashlib
+import os, sys, hashlib
 from collections import defaultdict, Counter
 import numpy as np
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.io.match import load_match
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
 # Source pitch (your truth)
 PITCH_L = 105.0
 PITCH_W = 68.0
@@ -27,55 +34,20 @@ META_ACTIONS = {
   "Start of the 1st half","Halftime","Start of the 2nd half","End of the match"
 }
 
-def load_jsonl(p):
-  out=[]
-  if not os.path.exists(p): return out
-  with open(p,"r",encoding="utf-8") as f:
-    for line in f:
-      line=line.strip()
-      if not line: continue
-      try: out.append(json.loads(line))
-      except: pass
-  return out
-
-def s(x): return (x or "").strip()
-
-def team_of(r):
-  t = s(r.get("team_raw") or r.get("team") or "")
+def team_of(t):
   if not t: return None
   up=t.upper()
   if up in {"UNKNOWN_TEAM","UNKNOWN","NULL","NONE"}: return None
   return t
 
-def action_of(r): return s(r.get("action") or "")
-
-def half_of(r):
-  try:
-    h=r.get("half")
-    return int(h) if h is not None else None
-  except:
-    return None
-
-def player_of(r):
-  code=s(r.get("code") or "")
-  if not code: return None
-  left=code.split(" - ")[0].strip()
-  if ". " in left:
-    left=left.split(". ",1)[1].strip()
-  return left or None
-
-def safe_xy(r):
-  try:
-    x=r.get("x"); y=r.get("y")
-    if x is None or y is None: return None
-    x=float(x); y=float(y)
-    if math.isnan(x) or math.isnan(y): return None
-    # strict clamp to 105x68
-    x=max(0.0,min(PITCH_L,x))
-    y=max(0.0,min(PITCH_W,y))
-    return x,y
-  except:
-    return None
+def load_rows(p):
+  # (team, action, player, half, xy) per event from the shared loader; xy strict-clamped to 105x68
+  if not os.path.exists(p): return []
+  md=load_match(p)
+  return [
+    (team_of(t), a, pl, h, (max(0.0,min(PITCH_L,x)), max(0.0,min(PITCH_W,y))) if ok else None)
+    for t,a,pl,h,ok,x,y in md.rows("team_raw","action","player","half","has_xy","x","y")
+  ]
 
 def to_100x50(x, y):
   return (x / PITCH_L) * OUT_L, (y / PITCH_W) * OUT_W
@@ -86,12 +58,6 @@ def jitter_for_name(name, scale=0.85):
   b=int(h[8:16],16)/0xffffffff
   return (a-0.5)*2*scale, (b-0.5)*2*scale
 
-def ensure_mpl():
-  import matplotlib
-  matplotlib.use("Agg")
-  import matplotlib.pyplot as plt
-  return plt
-
 def draw_pitch_100x50(plt):
   # outline
   plt.plot([0,OUT_L],[0,0],linewidth=1)
@@ -102,12 +68,14 @@ def draw_pitch_100x50(plt):
   plt.plot([OUT_L/2, OUT_L/2],[0,OUT_W],linewidth=1,alpha=0.6)
   plt.xlim(0,OUT_L); plt.ylim(0,OUT_W)
 
-def savefig(plt, outdir, name, dpi=340):
-  p=os.path.join(outdir,name)
-  plt.tight_layout()
-  plt.savefig(p,dpi=dpi)
-  plt.close()
-  return name
+def draw_positions(plt, xs, ys, ss, labs, title):
+  # figure drawer (runs in render workers; see hpfa.io.render)
+  draw_pitch_100x50(plt)
+  for x,y,p in zip(xs,ys,labs):
+    plt.text(x, y, p, fontsize=8, ha="center", va="center")
+  plt.scatter(xs, ys, s=ss, alpha=0.84)
+  plt.title(title)
+  plt.xlabel("x (0–100)"); plt.ylabel("y (0–50)")
 
 def write_index(outdir, items, info_lines):
   p=os.path.join(outdir,"index.html")
@@ -127,9 +95,7 @@ def write_index(outdir, items, info_lines):
 
 def choose_top2_teams(out_ev):
   c=Counter()
-  for r in out_ev:
-    t=team_of(r)
-    a=action_of(r)
+  for t,a,_,_,_ in out_ev:
     if not t: continue
     if a in META_ACTIONS: continue
     c[t]+=1
@@ -138,13 +104,10 @@ def choose_top2_teams(out_ev):
 def decide_flip_for_team(rows):
   # Use ONLY KEEP_ACTIONS to decide orientation (avoid defensive bias)
   xs1=[]; xs2=[]
-  for r in rows:
-    a=action_of(r)
+  for _,a,_,h,xy in rows:
     if a in META_ACTIONS: continue
     if a and a not in KEEP_ACTIONS: continue
-    xy=safe_xy(r)
     if not xy: continue
-    h=half_of(r)
     if h==1: xs1.append(xy[0])
     elif h==2: xs2.append(xy[0])
   if len(xs1)<40 or len(xs2)<40:
@@ -155,8 +118,7 @@ def decide_flip_for_team(rows):
   flip = d1 < d0
   return flip, f"m1={m1:.1f}, m2={m2:.1f}, d0={d0:.1f}, d1={d1:.1f}"
 
-def norm_xy_team(r, x, y, flip_second_half):
-  h=half_of(r)
+def norm_xy_team(h, x, y, flip_second_half):
   if flip_second_half and h==2:
     x = PITCH_L - x
   return x, y
@@ -164,19 +126,16 @@ def norm_xy_team(r, x, y, flip_second_half):
 def collect_positions(rows, flip_second_half):
   pts=defaultdict(list)
   touches=Counter()
-  for r in rows:
-    a=action_of(r)
+  for _,a,p,h,xy in rows:
     if a in META_ACTIONS: 
       continue
     if a and a not in KEEP_ACTIONS:
       continue
-    p=player_of(r)
     if not p: 
       continue
-    xy=safe_xy(r)
     if not xy:
       continue
-    x,y = norm_xy_team(r, xy[0], xy[1], flip_second_half)
+    x,y = norm_xy_team(h, xy[0], xy[1], flip_second_half)
     x,y = to_100x50(x,y)
     pts[p].append((x,y))
     touches[p]+=1
@@ -186,35 +145,28 @@ def collect_gk_positions(gk_rows, flip_second_half):
   # GK stream may not have actions in KEEP_ACTIONS; keep all with xy for GK
   pts=defaultdict(list)
   touches=Counter()
-  for r in gk_rows:
-    if action_of(r) in META_ACTIONS:
+  for _,a,p,h,xy in gk_rows:
+    if a in META_ACTIONS:
       continue
-    p=player_of(r)
     if not p: 
       continue
-    xy=safe_xy(r)
     if not xy: 
       continue
-    x,y = norm_xy_team(r, xy[0], xy[1], flip_second_half)
+    x,y = norm_xy_team(h, xy[0], xy[1], flip_second_half)
     x,y = to_100x50(x,y)
     pts[p].append((x,y))
     touches[p]+=1
   return pts, touches
 
-def main():
-  if len(sys.argv)!=3:
-    print("USAGE: hpfa_positions_v3_100x50.py <match_out_dir> <report_out_dir>")
-    sys.exit(2)
-
-  match_out=sys.argv[1]
-  outdir=sys.argv[2]
+def build(match_out, outdir):
+  """index.html into outdir; returns the figure specs (rendered by the caller)."""
   os.makedirs(outdir, exist_ok=True)
 
   outfield_path=os.path.join(match_out,"canonical_outfield.jsonl")
   if not os.path.exists(outfield_path):
     raise SystemExit(f"ERROR missing: {outfield_path}")
 
-  out_ev=load_jsonl(outfield_path)
+  out_ev=load_rows(outfield_path)
   top2=choose_top2_teams(out_ev)
   if len(top2)!=2:
     raise SystemExit(f"ERROR: expected 2 teams, found: {top2}")
@@ -222,17 +174,17 @@ def main():
   # filter to top2 teams only
   by_team=defaultdict(list)
   for r in out_ev:
-    t=team_of(r)
+    t=r[0]
     if not t or t not in top2:
       continue
     by_team[t].append(r)
 
   # GK stream (optional)
   gk_path=os.path.join(match_out,"canonical_gk.jsonl")
-  gk_ev=load_jsonl(gk_path)
+  gk_ev=load_rows(gk_path)
   gk_by_team=defaultdict(list)
   for r in gk_ev:
-    t=team_of(r)
+    t=r[0]
     if not t or t not in top2:
       continue
     gk_by_team[t].append(r)
@@ -245,8 +197,8 @@ def main():
     flip_cfg[t]=flip
     info.append(f"<b>{t}</b>: flip_second_half={flip} ({reason})")
 
-  plt=ensure_mpl()
   items=[]
+  specs=[]
 
   for t in top2:
     pts, touches = collect_positions(by_team[t], flip_cfg[t])
@@ -266,10 +218,7 @@ def main():
     # choose 11 outfield + 1 GK = 12 max
     top_players=[p for p,_ in touches.most_common(12)]
 
-    plt.figure(figsize=(10,6))
-    draw_pitch_100x50(plt)
-
-    xs=[]; ys=[]; ss=[]
+    xs=[]; ys=[]; ss=[]; labs=[]
     for p in top_players:
       arr=pts.get(p,[])
       if len(arr)<3:
@@ -280,17 +229,27 @@ def main():
       x2=max(0,min(OUT_L,x+jx)); y2=max(0,min(OUT_W,y+jy))
       xs.append(x2); ys.append(y2)
       ss.append(55 + 4*min(touches[p],120))
-      plt.text(x2, y2, p, fontsize=8, ha="center", va="center")
+      labs.append(p)
 
-    plt.scatter(xs, ys, s=ss, alpha=0.84)
-    plt.title(f"Median attacking action-locations (100×50) — {t}")
-    plt.xlabel("x (0–100)"); plt.ylabel("y (0–50)")
-    fn=savefig(plt, outdir, f"01_positions_attack_median__{t.replace(' ','_')}.png")
+    fn=f"01_positions_attack_median__{t.replace(' ','_')}.png"
+    specs.append(FigureSpec(fn, draw_positions, dict(
+      xs=xs, ys=ys, ss=ss, labs=labs, title=f"Median attacking action-locations (100×50) — {t}"), dpi=340, figsize=(10,6)))
     items.append({"title": f"Attacking median positions — {t}", "file": fn})
 
-  idx=write_index(outdir, items, info)
-  print("OK ✅ positions_v3_100x50 built")
   print("Teams:", top2)
+  write_index(outdir, items, info)
+  return specs
+
+def main():
+  argv, opts = pop_render_args(sys.argv[1:])
+  if len(argv)!=2:
+    print("USAGE: hpfa_positions_v3_100x50.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+    sys.exit(2)
+
+  match_out, outdir = argv
+  render_figures(build(match_out, outdir), outdir, opts)
+  idx=os.path.join(outdir, "index.html")
+  print("OK ✅ positions_v3_100x50 built")
   print("OUT:", outdir)
   print("INDEX:", idx)
 
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
-import os, sys, json, math, hashlib
+import os, sys, hashlib
 from collections import defaultdict, Counter
 import numpy as np
 
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.io.match import load_match
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
 PITCH_L=105.0; PITCH_W=68.0
 OUT_L=100.0; OUT_W=50.0
 
@@ -23,44 +30,17 @@ KEEP_ACTIONS = {
 
 META_ACTIONS={"Start of the 1st half","Halftime","Start of the 2nd half","End of the match"}
 
-def load_jsonl(p):
-  out=[]
-  with open(p,"r",encoding="utf-8") as f:
-    for line in f:
-      line=line.strip()
-      if not line: continue
-      try: out.append(json.loads(line))
-      except: pass
-  return out
-
-def s(x): return (x or "").strip()
-
-def team_of(r):
-  t=s(r.get("team_raw") or r.get("team") or "")
+def team_of(t):
   if not t or t.upper() in {"UNKNOWN_TEAM","UNKNOWN","NULL","NONE"}: return None
   return t
 
-def action_of(r): return s(r.get("action") or "")
-
-def half_of(r):
-  try:
-    h=r.get("half"); return int(h) if h is not None else None
-  except: return None
-
-def player_of(r):
-  code=s(r.get("code") or "")
-  if not code: return None
-  left=code.split(" - ")[0].strip()
-  if ". " in left: left=left.split(". ",1)[1].strip()
-  return left or None
-
-def safe_xy(r):
-  try:
-    x=float(r.get("x")); y=float(r.get("y"))
-    if math.isnan(x) or math.isnan(y): return None
-    x=max(0.0,min(PITCH_L,x)); y=max(0.0,min(PITCH_W,y))
-    return x,y
-  except: return None
+def load_rows(p):
+  # (team, action, player, half, xy) per event from the shared loader; xy clamped to 105x68
+  md=load_match(p)
+  return [
+    (team_of(t), a, pl, h, (max(0.0,min(PITCH_L,x)), max(0.0,min(PITCH_W,y))) if ok else None)
+    for t,a,pl,h,ok,x,y in md.rows("team_raw","action","player","half","has_xy","x","y")
+  ]
 
 def to_100x50(x,y):
   return (x/PITCH_L)*OUT_L, (y/PITCH_W)*OUT_W
@@ -72,22 +52,19 @@ def jitter(name, scale=0.85):
   b=int(h[8:16],16)/0xffffffff
   return (a-0.5)*2*scale, (b-0.5)*2*scale
 
-def ensure_mpl():
-  import matplotlib
-  matplotlib.use("Agg")
-  import matplotlib.pyplot as plt
-  return plt
-
 def draw_pitch(plt):
   plt.plot([0,OUT_L],[0,0],lw=1); plt.plot([0,OUT_L],[OUT_W,OUT_W],lw=1)
   plt.plot([0,0],[0,OUT_W],lw=1); plt.plot([OUT_L,OUT_L],[0,OUT_W],lw=1)
   plt.plot([OUT_L/2,OUT_L/2],[0,OUT_W],lw=1,alpha=0.6)
   plt.xlim(0,OUT_L); plt.ylim(0,OUT_W)
 
-def savefig(plt,outdir,name,dpi=340):
-  p=os.path.join(outdir,name)
-  plt.tight_layout(); plt.savefig(p,dpi=dpi); plt.close()
-  return name
+def draw_positions(plt, xs, ys, ss, labs, title):
+  # figure drawer (runs in render workers; see hpfa.io.render)
+  draw_pitch(plt)
+  for x,y,p in zip(xs,ys,labs):
+    plt.text(x, y, p, fontsize=8, ha="center", va="center")
+  plt.scatter(xs, ys, s=ss, alpha=0.84)
+  plt.title(title)
 
 def write_index(outdir, items, info):
   p=os.path.join(outdir,"index.html")
@@ -104,8 +81,7 @@ def write_index(outdir, items, info):
 
 def choose_top2_teams(ev):
   c=Counter()
-  for r in ev:
-    t=team_of(r); a=action_of(r)
+  for t,a,_,_,_ in ev:
     if not t or a in META_ACTIONS: continue
     c[t]+=1
   return [t for t,_ in c.most_common(2)]
@@ -113,13 +89,10 @@ def choose_top2_teams(ev):
 def decide_flip(rows):
   # Decide flip using SHOT-like actions (most reliable direction signal)
   xs1=[]; xs2=[]
-  for r in rows:
-    a=action_of(r)
+  for _,a,_,h,pt in rows:
     if a in META_ACTIONS: continue
     if a not in {"İsabetli Şut","İsabetsiz Şut","Gol","Top Taşıma"}: continue
-    pt=safe_xy(r)
     if not pt: continue
-    h=half_of(r)
     if h==1: xs1.append(pt[0])
     elif h==2: xs2.append(pt[0])
   if len(xs1)<20 or len(xs2)<20:
@@ -129,21 +102,17 @@ def decide_flip(rows):
   flip=d1<d0
   return flip, f"m1={m1:.1f},m2={m2:.1f},d0={d0:.1f},d1={d1:.1f}"
 
-def main():
-  if len(sys.argv)!=3:
-    print("USAGE: hpfa_positions_v4_100x50.py <match_out_dir> <report_out_dir>")
-    sys.exit(2)
-
-  match_out=sys.argv[1]; outdir=sys.argv[2]
+def build(match_out, outdir):
+  """index.html into outdir; returns the figure specs (rendered by the caller)."""
   os.makedirs(outdir, exist_ok=True)
 
-  ev=load_jsonl(os.path.join(match_out,"canonical_outfield.jsonl"))
+  ev=load_rows(os.path.join(match_out,"canonical_outfield.jsonl"))
   top2=choose_top2_teams(ev)
   if len(top2)!=2: raise SystemExit(f"Need 2 teams, got {top2}")
 
   by=defaultdict(list)
   for r in ev:
-    t=team_of(r)
+    t=r[0]
     if t in top2: by[t].append(r)
 
   flip_cfg={}; info=[]
@@ -152,24 +121,21 @@ def main():
     flip_cfg[t]=flip
     info.append(f"<b>{t}</b>: flip_second_half={flip} ({reason})")
 
-  plt=ensure_mpl()
   items=[]
+  specs=[]
   for t in top2:
     pts=defaultdict(list); touches=Counter()
-    for r in by[t]:
-      a=action_of(r)
+    for _,a,p,h,pt in by[t]:
       if a in META_ACTIONS or a not in KEEP_ACTIONS: continue
-      p=player_of(r); pt=safe_xy(r)
       if not p or not pt: continue
       x,y=pt
-      if flip_cfg[t] and half_of(r)==2:
+      if flip_cfg[t] and h==2:
         x=PITCH_L-x
       x,y=to_100x50(x,y)
       pts[p].append((x,y)); touches[p]+=1
 
     top=[p for p,_ in touches.most_common(11)]  # outfield 11
-    plt.figure(figsize=(10,6)); draw_pitch(plt)
-    xs=[]; ys=[]; ss=[]
+    xs=[]; ys=[]; ss=[]; labs=[]
     for p in top:
       arr=pts.get(p,[])
       if len(arr)<3: continue
@@ -178,13 +144,24 @@ def main():
       jx,jy=jitter(p,0.9)
       x=max(0,min(OUT_L,x+jx)); y=max(0,min(OUT_W,y+jy))
       xs.append(x); ys.append(y); ss.append(55+4*min(touches[p],120))
-      plt.text(x,y,p,fontsize=8,ha="center",va="center")
-    plt.scatter(xs,ys,s=ss,alpha=0.84)
-    plt.title(f"Median actor-locations (no passes) — {t}")
-    fn=savefig(plt,outdir,f"01_positions_actor__{t.replace(' ','_')}.png")
+      labs.append(p)
+    fn=f"01_positions_actor__{t.replace(' ','_')}.png"
+    specs.append(FigureSpec(fn, draw_positions, dict(
+      xs=xs, ys=ys, ss=ss, labs=labs, title=f"Median actor-locations (no passes) — {t}"), dpi=340, figsize=(10,6)))
     items.append({"title":f"Positions (actor-only) — {t}","file":fn})
 
-  idx=write_index(outdir,items,info)
+  write_index(outdir,items,info)
+  return specs
+
+def main():
+  argv, opts = pop_render_args(sys.argv[1:])
+  if len(argv)!=2:
+    print("USAGE: hpfa_positions_v4_100x50.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+    sys.exit(2)
+
+  match_out, outdir = argv
+  render_figures(build(match_out, outdir), outdir, opts)
+  idx=os.path.join(outdir, "index.html")
   print("OK ✅ positions_v4 built")
   print("OUT:", outdir)
   print("INDEX:", idx)
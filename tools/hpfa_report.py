@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+hpfa report — all match report builders in one process
+
+  hpfa_report.py <all|name[,name...]> <match_out_dir> [<report_root>]
+                 [--jobs N] [--render-cache DIR | --no-render-cache]
+
+One load_match() and one match_aggregates() pass shared by every selected
+builder (matplotlib imported once), then one render pass (one pool for all
+figures of all reports, one render cache). Report dirs keep the names of the
+separate tools' runs: <report_root>/report_v1, report_v2, report_<name> for
+the others; report_root defaults to the match out dir.
+positions_v5_100x50 runs with --match-id <match dir name> --flip-second-half.
+
+A failing builder (its own error exit or a *_FAIL_CLOSED error) is reported and
+skipped, the others still render; exit 1 if any failed.
+"""
+import os, sys, time, importlib
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(TOOLS), "hpfa-main"))
+sys.path.insert(0, TOOLS)
+from hpfa.io.render import pop_render_args, render_reports
+
+BUILDERS = ["report_v1", "report_v2", "passnet_v1", "passnet_105x68_v2",
+            "positions_v1", "positions_v2_auto", "positions_v3_100x50", "positions_v4_100x50",
+            "positions_v5_100x50", "16d_v0"]
+
+USAGE = ("USAGE: hpfa_report.py <all|name[,name...]> <match_out_dir> [<report_root>] "
+         "[--jobs N] [--render-cache DIR | --no-render-cache]\n  names: " + ", ".join(BUILDERS))
+
+def report_dir(root, name):
+    return os.path.join(root, name if name.startswith("report_") else f"report_{name}")
+
+def run_builder(name, match_out, outdir):
+    mod = importlib.import_module(f"hpfa_{name}")
+    if name == "positions_v5_100x50":
+        match_id = os.path.basename(os.path.normpath(match_out))
+        canon = os.path.join(match_out, "canonical_outfield.jsonl")
+        return mod.build(match_id, canon, outdir, flip_second_half=True)
+    return mod.build(match_out, outdir)
+
+def main():
+    argv, opts = pop_render_args(sys.argv[1:])
+    if len(argv) not in (2, 3):
+        print(USAGE)
+        sys.exit(2)
+
+    sel, match_out = argv[0], argv[1]
+    root = argv[2] if len(argv) == 3 else match_out
+    names = BUILDERS if sel == "all" else [n.strip() for n in sel.split(",") if n.strip()]
+    bad = [n for n in names if n not in BUILDERS]
+    if bad or not names:
+        print("ERROR unknown report:", ", ".join(bad) or sel)
+        print(USAGE)
+        sys.exit(2)
+    if not os.path.isdir(match_out):
+        print("ERROR missing:", match_out)
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    batches = []; done = []; failed = []
+    for name in names:
+        outdir = report_dir(root, name)
+        try:
+            specs = run_builder(name, match_out, outdir)
+        except SystemExit as e:
+            # the builders keep their CLI error handling (print + sys.exit / SystemExit(msg))
+            failed.append(name)
+            print(f"FAIL {name}:", e.code)
+            continue
+        except ValueError as e:
+            if "_FAIL_CLOSED:" not in str(e):
+                raise
+            failed.append(name)
+            print(f"FAIL {name}:", e)
+            continue
+        batches.append((specs, outdir))
+        done.append(name)
+    t1 = time.perf_counter()
+
+    for name, (specs, outdir), pngs in zip(done, batches, render_reports(batches, opts)):
+        print(f"OK ✅ {name}: {len(pngs)} figures -> {outdir}")
+    t2 = time.perf_counter()
+
+    print(f"REPORTS: {len(done)}/{len(names)}  build {t1-t0:.1f}s  render {t2-t1:.1f}s")
+    if failed:
+        print("FAILED:", ", ".join(failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,46 @@
 #!/usr/bin/env python3
-import os, sys, json, math
-from collections import Counter, defaultdict
-
-# ---- robust keyword sets (TR+EN) ----
-KW_SHOT = ("şut", "shot", "vuruş", "kafa vuruş", "volley")
-KW_TURNOVER = ("top kayb", "loss", "miscontrol", "bad control", "hata", "turnover")
-KW_REGAIN = ("top kazan", "recovery", "interception", "tackle", "ball win", "kapma", "pas arası")
-KW_SETPIECE = ("korner", "corner", "freekick", "serbest vuruş", "taç", "throw", "penalt", "penalty")
-
-def s(x): return (x or "").strip().lower()
-
-def load_jsonl(path):
-    out = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: continue
-            try:
-                out.append(json.loads(line))
-            except Exception:
-                continue
-    return out
-
-def is_kw(text, kws):
-    t = s(text)
-    return any(k in t for k in kws)
-
-def get_team(rec):
-    return rec.get("team_raw") or rec.get("team") or ""
-
-def get_action(rec):
-    return rec.get("action") or rec.get("code") or ""
-
-def minute_bucket(t):
-    if t is None: return None
-    try:
-        return int(float(t) // 60)
-    except:
-        return None
+import os, sys
+from collections import Counter
+
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.analytics.aggregates import match_aggregates
+from hpfa.analytics.keywords import REGAIN, SHOT, TURNOVER, kw_masks, phase_proxy
+from hpfa.analytics.latency import next_event_latency
+from hpfa.io.match import load_match
+from hpfa.io.render import FigureSpec, pop_render_args, render_figures
+
+# ---- figure drawers (run in render workers; see hpfa.io.render) ----
+def draw_bars(plt, labs, vals, title):
+    plt.bar(labs, vals)
+    plt.title(title)
+    plt.xticks(rotation=30, ha="right")
 
-def safe_xy(rec):
-    x, y = rec.get("x"), rec.get("y")
-    try:
-        if x is None or y is None: return None
-        x = float(x); y = float(y)
-        if math.isnan(x) or math.isnan(y): return None
-        return x, y
-    except:
-        return None
-
-def classify_phase(rec):
-    a = get_action(rec)
-    c = rec.get("code") or ""
-    blob = f"{a} {c}"
-    if is_kw(blob, KW_SETPIECE):
-        return "F5/F6"
-    if is_kw(blob, KW_TURNOVER):
-        return "F3"
-    if is_kw(blob, KW_REGAIN):
-        return "F4"
-    # possession phases (F1/F2) need ball-ownership; we mark as "OPEN"
-    return "OPEN"
+def draw_line(plt, xs, ys, title, xlabel, ylabel):
+    plt.plot(xs, ys)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+
+def draw_scatter(plt, pts, size, title):
+    if pts:
+        xs = [x for x,_ in pts]; ys = [y for _,y in pts]
+        plt.scatter(xs, ys, s=size)
+    plt.title(title)
+    plt.xlabel("x")
+    plt.ylabel("y")
 
-def main():
-    if len(sys.argv) != 3:
-        print("USAGE: hpfa_report_v1.py <match_out_dir> <report_out_dir>")
-        sys.exit(2)
+def draw_hist(plt, vals, bins, title):
+    if vals:
+        plt.hist(vals, bins=bins)
+    plt.title(title)
+    plt.xlabel("seconds")
+    plt.ylabel("count")
 
-    match_out = sys.argv[1]
-    rep_out = sys.argv[2]
+def build(match_out, rep_out):
+    """Metrics + CSVs into rep_out; returns the figure specs (rendered by the caller)."""
     os.makedirs(rep_out, exist_ok=True)
 
     outfield_path = os.path.join(match_out, "canonical_outfield.jsonl")
@@ -76,78 +48,43 @@ def main():
         print("ERROR: missing", outfield_path)
         sys.exit(1)
 
-    events = load_jsonl(outfield_path)
-    if not events:
+    md = load_match(outfield_path)
+    if not md.n:
         print("ERROR: canonical_outfield.jsonl empty/unreadable")
         sys.exit(1)
 
+    # normalized columns from the shared loader (hpfa.io.match) + shared aggregates
+    agg = match_aggregates(md)
+    actions, codes, teams = md.action.tolist(), md.code.tolist(), md.team_raw.tolist()
+    ts, xy_of = md.t_start.tolist(), agg.xy_of
+    # keyword families of action (or code when there is no action) + code, cached per distinct blob
+    kws = kw_masks(f"{a or c} {c}" for a, c in zip(actions, codes)).tolist()
+
     # --- metrics ---
     phase_counts = Counter()
     action_counts = Counter()
-    per_minute = Counter()
+    per_minute = agg.per_minute
     shots_xy = []
     tov_xy = []
 
-    # prep for regain delta
-    # store per-team chronological list
-    by_team = defaultdict(list)
-
-    for r in events:
-        phase = classify_phase(r)
+    for i in range(md.n):
+        kw = kws[i]
+        phase = phase_proxy(kw)
         phase_counts[phase] += 1
 
-        a = s(r.get("action") or "")
+        a = actions[i].lower()
         if a: action_counts[a] += 1
 
-        mb = minute_bucket(r.get("t_start"))
-        if mb is not None: per_minute[mb] += 1
-
-        blob = f"{get_action(r)} {r.get('code') or ''}"
-        xy = safe_xy(r)
+        xy = xy_of[i]
         if xy:
-            if is_kw(blob, KW_SHOT): shots_xy.append(xy)
-            if is_kw(blob, KW_TURNOVER): tov_xy.append(xy)
-
-        team = get_team(r)
-        if team:
-            by_team[team].append(r)
-
-    # regain deltas (same team: turnover -> next regain within 30s)
-    regain_deltas = []
-    for team, lst in by_team.items():
-        lst = sorted(lst, key=lambda x: (x.get("t_start") is None, x.get("t_start")))
-        # build indices of regain events
-        regain_times = []
-        for rr in lst:
-            blob = f"{get_action(rr)} {rr.get('code') or ''}"
-            if is_kw(blob, KW_REGAIN) and rr.get("t_start") is not None:
-                try: regain_times.append(float(rr["t_start"]))
-                except: pass
-        if not regain_times:
-            continue
-        regain_times.sort()
-
-        for rr in lst:
-            blob = f"{get_action(rr)} {rr.get('code') or ''}"
-            if not is_kw(blob, KW_TURNOVER): 
-                continue
-            if rr.get("t_start") is None:
-                continue
-            try:
-                t0 = float(rr["t_start"])
-            except:
-                continue
-            # find first regain time after t0
-            t1 = None
-            for t in regain_times:
-                if t >= t0:
-                    t1 = t
-                    break
-            if t1 is None: 
-                continue
-            dt = t1 - t0
-            if 0 <= dt <= 30:
-                regain_deltas.append(dt)
+            if kw & SHOT: shots_xy.append(xy)
+            if kw & TURNOVER: tov_xy.append(xy)
+
+    # regain deltas (same team: turnover -> first regain at or after it, kept if within 30s)
+    tov = [bool(t) and bool(k & TURNOVER) for k, t in zip(kws, teams)]
+    reg = [bool(t) and bool(k & REGAIN) for k, t in zip(kws, teams)]
+    lat = next_event_latency(ts, tov, reg, groups=teams)
+    regain_deltas = [dt for dts in lat.by_group(0, 30).values() for dt in dts.tolist()]
 
     # ---- write CSV summaries ----
     def write_csv(path, rows, header):
@@ -169,70 +106,41 @@ def main():
     # ---- plots (matplotlib) ----
     try:
         import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
     except Exception as e:
         print("NO_PLOTS (matplotlib import failed):", e)
         print("CSVs written:", phase_csv, top_actions_csv, timeline_csv)
         sys.exit(0)
 
-    # 1) Phase distribution
-    plt.figure()
     labs = [k for k,_ in sorted(phase_counts.items(), key=lambda x: (-x[1], x[0]))]
-    vals = [phase_counts[k] for k in labs]
-    plt.bar(labs, vals)
-    plt.title("Phase buckets (F3/F4/F5F6/OPEN)")
-    plt.xticks(rotation=30, ha="right")
-    plt.tight_layout()
-    plt.savefig(os.path.join(rep_out, "01_phase_distribution.png"), dpi=160)
-    plt.close()
-
-    # 2) Events per minute
-    plt.figure()
     mins = sorted(per_minute)
-    vals = [per_minute[m] for m in mins]
-    plt.plot(mins, vals)
-    plt.title("Event intensity (events/min)")
-    plt.xlabel("Minute")
-    plt.ylabel("Events")
-    plt.tight_layout()
-    plt.savefig(os.path.join(rep_out, "02_events_per_minute.png"), dpi=160)
-    plt.close()
-
-    # 3) Turnover scatter
-    plt.figure()
-    if tov_xy:
-        xs = [x for x,_ in tov_xy]; ys = [y for _,y in tov_xy]
-        plt.scatter(xs, ys, s=8)
-    plt.title("Turnover locations (proxy)")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.tight_layout()
-    plt.savefig(os.path.join(rep_out, "03_turnovers_xy.png"), dpi=160)
-    plt.close()
-
-    # 4) Shot scatter
-    plt.figure()
-    if shots_xy:
-        xs = [x for x,_ in shots_xy]; ys = [y for _,y in shots_xy]
-        plt.scatter(xs, ys, s=10)
-    plt.title("Shot locations (proxy)")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.tight_layout()
-    plt.savefig(os.path.join(rep_out, "04_shots_xy.png"), dpi=160)
-    plt.close()
-
-    # 5) Regain delta histogram
-    plt.figure()
-    if regain_deltas:
-        plt.hist(regain_deltas, bins=30)
-    plt.title("Regain Δt (turnover -> next regain, same team, <=30s)")
-    plt.xlabel("seconds")
-    plt.ylabel("count")
-    plt.tight_layout()
-    plt.savefig(os.path.join(rep_out, "05_regain_dt_hist.png"), dpi=160)
-    plt.close()
+    specs = [
+        # 1) Phase distribution
+        FigureSpec("01_phase_distribution.png", draw_bars, dict(
+            labs=labs, vals=[phase_counts[k] for k in labs], title="Phase buckets (F3/F4/F5F6/OPEN)"), dpi=160),
+        # 2) Events per minute
+        FigureSpec("02_events_per_minute.png", draw_line, dict(
+            xs=mins, ys=[per_minute[m] for m in mins], title="Event intensity (events/min)",
+            xlabel="Minute", ylabel="Events"), dpi=160),
+        # 3) Turnover scatter
+        FigureSpec("03_turnovers_xy.png", draw_scatter, dict(
+            pts=tov_xy, size=8, title="Turnover locations (proxy)"), dpi=160),
+        # 4) Shot scatter
+        FigureSpec("04_shots_xy.png", draw_scatter, dict(
+            pts=shots_xy, size=10, title="Shot locations (proxy)"), dpi=160),
+        # 5) Regain delta histogram
+        FigureSpec("05_regain_dt_hist.png", draw_hist, dict(
+            vals=regain_deltas, bins=30, title="Regain Δt (turnover -> next regain, same team, <=30s)"), dpi=160),
+    ]
+    return specs
+
+def main():
+    argv, opts = pop_render_args(sys.argv[1:])
+    if len(argv) != 2:
+        print("USAGE: hpfa_report_v1.py <match_out_dir> <report_out_dir> [--jobs N] [--render-cache DIR | --no-render-cache]")
+        sys.exit(2)
+
+    match_out, rep_out = argv
+    render_figures(build(match_out, rep_out), rep_out, opts)
 
     print("REPORT OK ✅")
     print("OUTDIR:", rep_out)
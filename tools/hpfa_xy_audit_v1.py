@@ -1,32 +1,12 @@
 #!/usr/bin/env python3
-import os, sys, json, math
+import os, sys
 from collections import defaultdict
 
-def load_jsonl(p):
-    out=[]
-    with open(p,"r",encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: continue
-            try: out.append(json.loads(line))
-            except: pass
-    return out
-
-def s(x): return (x or "").strip()
-
-def player_of(r):
-    code=s(r.get("code") or "")
-    if not code: return None
-    left=code.split(" - ")[0].strip()
-    if ". " in left: left=left.split(". ",1)[1].strip()
-    return left or None
-
-def xy(r):
-    try:
-        x=float(r.get("x")); y=float(r.get("y"))
-        if math.isnan(x) or math.isnan(y): return None
-        return x,y
-    except: return None
+try:
+    import hpfa  # installed SSOT package
+except ImportError:  # bare checkout: fall back to hpfa-main, after everything else
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpfa-main"))
+from hpfa.io.match import load_match
 
 PASS="Paslar adresi bulanlar"
 CARRY="Top Taşıma"
@@ -34,18 +14,15 @@ SHOT_OK={"İsabetli Şut","İsabetsiz Şut","Gol"}
 
 def main():
     src=sys.argv[1]
-    ev=load_jsonl(src)
+    md=load_match(src)
 
     by=defaultdict(lambda: {"pass":[], "carry":[], "shot":[]})
-    for r in ev:
-        p=player_of(r)
+    for p,a,ok,x in md.rows("player","action","has_xy","x"):
         if not p: continue
-        a=s(r.get("action"))
-        pt=xy(r)
-        if not pt: continue
-        if a==PASS: by[p]["pass"].append(pt[0])
-        elif a==CARRY: by[p]["carry"].append(pt[0])
-        elif a in SHOT_OK: by[p]["shot"].append(pt[0])
+        if not ok: continue
+        if a==PASS: by[p]["pass"].append(x)
+        elif a==CARRY: by[p]["carry"].append(x)
+        elif a in SHOT_OK: by[p]["shot"].append(x)
 
     def med(xs):
         xs=sorted(xs)